@@ -5,17 +5,30 @@ from __future__ import annotations
 import logging
 import contextlib
 from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
 
 from .aiocloudweather import CloudWeatherListener
-from .aiocloudweather.proxy import DataSink
+from .aiocloudweather.sink import DataSink
+from .aiocloudweather.snapshot import SnapshotConfig
 from .aiocloudweather.utils import LimitedSizeQueue, DiagnosticsLogHandler
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
-
-from .const import CONF_DNS_SERVERS, CONF_WEATHERCLOUD_PROXY, CONF_WUNDERGROUND_PROXY, DOMAIN
-from .web import WeathercloudReceiver, WundergroundReceiver
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from .const import (
+    CONF_DNS_SERVERS,
+    CONF_WEATHERCLOUD_PROXY,
+    CONF_WUNDERGROUND_PROXY,
+    DOMAIN,
+    FORWARD_QUEUE_SIZE,
+    FORWARD_WORKERS,
+    SNAPSHOT_INTERVAL,
+    SNAPSHOT_MAX_AGE,
+)
+from .web import EcowittReceiver, WeathercloudReceiver, WundergroundReceiver
 from .entity import CloudWeatherEntity
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
@@ -34,6 +47,11 @@ class RuntimeData:
 CloudWeatherProxyConfigEntry = ConfigEntry[RuntimeData]
 
 
+def _snapshot_path(hass: HomeAssistant, entry: ConfigEntry) -> str:
+    """Return the path of the station snapshot of `entry`."""
+    return hass.config.path(STORAGE_DIR, f"{DOMAIN}.{entry.entry_id}.snapshot")
+
+
 @dataclass
 class DomainData:
     """Domain-wide data for Cloud Weather Proxy."""
@@ -54,8 +72,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: CloudWeatherProxyConfigE
     _LOGGER.debug("Setting up Cloud Weather Proxy with %s and %s",
                   proxies, dns_servers)
     cloudweather = CloudWeatherListener(
-        proxy_sinks=proxies, dns_servers=dns_servers
+        proxy_sinks=proxies,
+        dns_servers=dns_servers,
+        forward_queue_size=FORWARD_QUEUE_SIZE,
+        forward_workers=FORWARD_WORKERS,
+        snapshot=SnapshotConfig(
+            path=_snapshot_path(hass, entry),
+            interval=SNAPSHOT_INTERVAL,
+            max_age=SNAPSHOT_MAX_AGE,
+        ),
     )
+    # Known before the platforms are set up, so the sensors exist at once
+    await cloudweather.restore_snapshot()
 
     # Store per-entry runtime data
     entry.runtime_data = RuntimeData(listener=cloudweather)
@@ -79,6 +107,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: CloudWeatherProxyConfigE
 
     hass.http.register_view(WundergroundReceiver(cloudweather))
     hass.http.register_view(WeathercloudReceiver(cloudweather))
+    hass.http.register_view(EcowittReceiver(cloudweather))
 
     return True
 
@@ -106,3 +135,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: CloudWeatherProxyConfig
             hass.data.pop(DOMAIN)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the station snapshot of a deleted config entry."""
+    path = Path(_snapshot_path(hass, entry))
+    await hass.async_add_executor_job(partial(path.unlink, missing_ok=True))
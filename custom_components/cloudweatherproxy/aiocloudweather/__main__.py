@@ -2,21 +2,42 @@
 
 from __future__ import annotations
 
+import argparse
 import asyncio
+import contextlib
 from dataclasses import Field, fields
+import json
 import logging
+import multiprocessing
+import os
+from pathlib import Path
+import signal
 import sys
+import time
+from typing import TYPE_CHECKING
 
 from .server import CloudWeatherListener
-from .proxy import DataSink
+from .sink import DataSink
 from .station import Sensor, WeatherStation
 
+if TYPE_CHECKING:
+    from .sharedvalues import SharedValuesTable
+
+# pylint: disable=import-outside-toplevel
+
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds a worker has to stop gracefully before it is killed
+WORKER_STOP_TIMEOUT = 10.0
+
 
 def usage():
     """Show CLI usage."""
-    _LOGGER.info("Usage: %s port", sys.argv[0])
+    _LOGGER.info(
+        "Usage: %s port [--workers N] [--slots N] [--record DATABASE]", sys.argv[0]
+    )
+    _LOGGER.info("       %s loadgen target [options]", sys.argv[0])
+    _LOGGER.info("       %s values shared-memory-name [station]", sys.argv[0])
 
 
 async def my_handler(station: WeatherStation) -> None:
@@ -35,29 +56,175 @@ async def my_handler(station: WeatherStation) -> None:
     # print(f"{str(station)}")
 
 
-async def run_server(cloudweather_ws: CloudWeatherListener) -> None:
-    """Run server in endless mode."""
-    await cloudweather_ws.start()
-    while True:
-        await asyncio.sleep(100000)
+async def run_server(
+    port: int, table: SharedValuesTable | None = None, record: str | None = None
+) -> None:
+    """Run a listener until SIGINT or SIGTERM.
+
+    Its datasets are published to `table` and recorded to the SQLite
+    database `record` if given. On a signal the listener and the recorder
+    are stopped, so forwards are drained and pending readings written.
+    """
+    # Created on the running loop, the proxy session requires one
+    cloudweather_ws = CloudWeatherListener(
+        port=port, proxy_sinks=[DataSink.WUNDERGROUND], reuse_port=table is not None
+    )
+    cloudweather_ws.new_dataset_cb.append(my_handler)
+    if table is not None:
+
+        async def publish(station: WeatherStation) -> None:
+            table.write(station)
+
+        cloudweather_ws.new_dataset_cb.append(publish)
+    recorder = None
+    if record is not None:
+        from .recorder import RecorderConfig, SQLiteRecorder
+
+        recorder = SQLiteRecorder(RecorderConfig(path=record))
+        cloudweather_ws.new_dataset_cb.append(recorder.record)
+
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+    signals = (signal.SIGINT, signal.SIGTERM)
+    for signum in signals:
+        # Not supported on Windows, Ctrl+C interrupts the loop there
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(signum, stopping.set)
+
+    try:
+        await cloudweather_ws.start()
+        await stopping.wait()
+    finally:
+        for signum in signals:
+            with contextlib.suppress(NotImplementedError):
+                loop.remove_signal_handler(signum)
+        await cloudweather_ws.stop()
+        if recorder is not None:
+            await recorder.stop()
+
+
+def run_worker(
+    port: int, table: SharedValuesTable | None = None, record: str | None = None
+) -> None:
+    """Run a listener until interrupted."""
+    try:
+        asyncio.run(run_server(port, table, record))
+    except KeyboardInterrupt:
+        pass
+    except Exception as err:  # pylint: disable=broad-except
+        _LOGGER.exception("Server error: %s", err)
+
+
+def worker_database(record: str, idx: int) -> str:
+    """Return the recorder database of worker `idx`, `data.db` -> `data-1.db`.
+
+    Every worker has its own writer, a shared file would make them contend
+    for the SQLite write lock.
+    """
+    path = Path(record)
+    return str(path.with_name(f"{path.stem}-{idx}{path.suffix}"))
+
+
+def run_workers(port: int, workers: int, slots: int, record: str | None) -> None:
+    """Fork `workers` listeners sharing the port and a latest-values table.
+
+    Each worker records to its own database derived from `record`.
+    """
+    from .sharedvalues import SharedValuesTable
+
+    context = multiprocessing.get_context("fork")
+    table = SharedValuesTable.create(slots, context.Lock())
+    _LOGGER.info("Publishing the latest values to shared memory %s", table.name)
+    processes = [
+        context.Process(
+            target=run_worker,
+            args=(port, table, record and worker_database(record, idx)),
+            name=f"cloudweather-worker-{idx}",
+        )
+        for idx in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    # Stopping the parent stops the workers and removes the table
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Ask the workers to stop gracefully, kill the ones that do not
+        for process in processes:
+            if process.pid is not None and process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+        deadline = time.monotonic() + WORKER_STOP_TIMEOUT
+        for process in processes:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                _LOGGER.warning("Killing worker %s, it did not stop", process.name)
+                process.kill()
+                process.join()
+        table.close()
+
+
+def print_values(argv: list[str]) -> None:
+    """Print the latest values of a running multi-worker listener as JSON."""
+    from .sharedvalues import SharedValuesTable
+
+    parser = argparse.ArgumentParser(prog="aiocloudweather values")
+    parser.add_argument("name", help="shared memory name logged by the listener")
+    parser.add_argument("station", nargs="?")
+    args = parser.parse_args(argv)
+
+    table = SharedValuesTable.attach(args.name)
+    try:
+        values = table.read(args.station) if args.station else table.snapshot()
+    finally:
+        table.close()
+    print(json.dumps(values, indent=2))  # noqa: T201
 
 
 def main() -> None:
     """Run main."""
+    logging.basicConfig(level=logging.INFO)
     if len(sys.argv) < 2:
         usage()
         sys.exit(1)
 
-    _LOGGER.info("Firing up webserver to listen on port %s", sys.argv[1])
-    cloudweather_server = CloudWeatherListener(
-        port=int(sys.argv[1]), proxy_sinks=[DataSink.WUNDERGROUND]
+    if sys.argv[1] == "loadgen":
+        from .loadgen import main as loadgen
+
+        loadgen(sys.argv[2:])
+        return
+    if sys.argv[1] == "values":
+        print_values(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(prog="aiocloudweather")
+    parser.add_argument("port", type=int)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="listener processes sharing the port with SO_REUSEPORT",
     )
+    parser.add_argument(
+        "--slots", type=int, default=1024, help="stations in the latest-values table"
+    )
+    parser.add_argument(
+        "--record",
+        metavar="DATABASE",
+        help="record every reading to a SQLite database, one per worker",
+    )
+    args = parser.parse_args()
 
-    cloudweather_server.new_dataset_cb.append(my_handler)
-    try:
-        asyncio.run(run_server(cloudweather_server))
-    except Exception as err:  # pylint: disable=broad-except
-        _LOGGER.exception("Server error: %s", err)
+    _LOGGER.info(
+        "Firing up %d webserver(s) to listen on port %s", args.workers, args.port
+    )
+    if args.workers > 1:
+        run_workers(args.port, args.workers, args.slots, args.record)
+    else:
+        run_worker(args.port, record=args.record)
     _LOGGER.info("Exiting")
 
 
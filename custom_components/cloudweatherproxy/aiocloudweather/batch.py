@@ -0,0 +1,121 @@
+"""Batch unit conversions on columns of values, e.g. for backfills and replays.
+
+Every conversion is a single arithmetic kernel applied to a whole column:
+with NumPy installed a column is converted by one vectorized expression,
+otherwise element by element into an `array("d")`. The backend is chosen
+once when this module is imported. The kernels perform the same float
+operations in the same order as the scalar functions in `conversion`, and
+`convert_columns` applies the parse plan's own fused conversions, so batch
+and scalar results are identical.
+
+Unlike the scalar functions these never delegate to Home Assistant's
+helpers. The module is not imported by the listener itself.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+from .conversion import (
+    UnitConversion,
+    fahrenheit_to_celsius,
+    in_to_mm,
+    inhg_to_hpa,
+    mph_to_ms,
+)
+from .station import ParsePlan, _from_tenths
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+# A NumPy array, an array("d") or any other iterable of numbers
+Column = Any
+
+_Kernel = Callable[[Any], Any]
+
+# Must mirror the fallback formulas of the scalar functions exactly
+_KERNELS: dict[Callable[[Any], Any], _Kernel] = {
+    fahrenheit_to_celsius: lambda values: (values - 32) * 5.0 / 9.0,
+    inhg_to_hpa: lambda values: values * 33.864,
+    in_to_mm: lambda values: values * 25.4,
+    mph_to_ms: lambda values: values * 0.44704,
+    _from_tenths: lambda values: values / 10,
+}
+
+
+def _numpy_batch(kernel: _Kernel) -> Callable[[Column], Column]:
+    """Vectorize `kernel`, returning arrays of the input's kind."""
+
+    def convert(values: Column) -> Column:
+        if isinstance(values, np.ndarray):
+            return kernel(values.astype(np.float64, copy=False))
+        if isinstance(values, array) and values.typecode == "d":
+            column = np.frombuffer(values, dtype=np.float64)
+        else:
+            column = np.fromiter(values, dtype=np.float64)
+        result = array("d")
+        result.frombytes(kernel(column).tobytes())
+        return result
+
+    return convert
+
+
+def _python_batch(kernel: _Kernel) -> Callable[[Column], Column]:
+    """Apply `kernel` element by element into an `array("d")`."""
+
+    def convert(values: Iterable[float]) -> Column:
+        return array("d", [kernel(float(value)) for value in values])
+
+    return convert
+
+
+_batch = _numpy_batch if np is not None else _python_batch
+
+BATCH_CONVERSIONS: dict[Callable[[Any], Any], Callable[[Column], Column]] = {
+    scalar: _batch(kernel) for scalar, kernel in _KERNELS.items()
+}
+
+fahrenheit_to_celsius_batch = BATCH_CONVERSIONS[fahrenheit_to_celsius]
+inhg_to_hpa_batch = BATCH_CONVERSIONS[inhg_to_hpa]
+in_to_mm_batch = BATCH_CONVERSIONS[in_to_mm]
+mph_to_ms_batch = BATCH_CONVERSIONS[mph_to_ms]
+_identity_batch = _batch(lambda values: values)
+
+
+def convert_columns(
+    plan: ParsePlan, columns: Mapping[str, Column]
+) -> dict[str, Column]:
+    """Convert columns of raw request arguments like `WeatherStation.from_*`.
+
+    Args:
+        plan: The vendor's parse plan, e.g. `WUNDERGROUND_PLAN`.
+        columns: Values per request argument, e.g. {"tempf": [...]}.
+
+    Returns:
+        The converted values per `WeatherStation` sensor name, in the units
+        of the plan entries. Unknown arguments are ignored.
+
+    """
+    converted: dict[str, Column] = {}
+    for entry in plan.sensors:
+        values = columns.get(entry.arg)
+        if values is None:
+            continue
+        if entry.factor != 1:
+            factor = entry.factor
+            values = _batch(lambda column, factor=factor: column * factor)(values)
+        if entry.conversion is None:
+            converted[entry.sensor_name] = _identity_batch(values)
+            continue
+        batch = BATCH_CONVERSIONS.get(entry.conversion)
+        if batch is None and isinstance(entry.conversion, UnitConversion):
+            # Fused conversions are plain arithmetic and take columns as is
+            batch = _batch(entry.conversion)
+        if batch is None:
+            raise ValueError(f"No batch conversion for {entry.conversion}")
+        converted[entry.sensor_name] = batch(values)
+    return converted
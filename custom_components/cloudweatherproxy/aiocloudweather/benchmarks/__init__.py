@@ -0,0 +1,5 @@
+"""Benchmarks for the aiocloudweather hot path.
+
+Run from `custom_components/cloudweatherproxy`, e.g.
+`python -m aiocloudweather.benchmarks.parse`.
+"""
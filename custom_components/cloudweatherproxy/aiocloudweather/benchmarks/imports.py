@@ -0,0 +1,74 @@
+"""Measure the import time of the package against a budget.
+
+Imports the package in fresh interpreters with `-X importtime` and reports
+the median self time of every `aiocloudweather` module, the time spent in
+the package's own modules and the total including dependencies such as
+aiohttp. Exits with status 1 if the package's own modules exceed the
+budget, so it can guard the cold start in CI.
+
+Run from `custom_components/cloudweatherproxy`:
+`python -m aiocloudweather.benchmarks.imports --budget-ms 40`
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+
+PACKAGE = "aiocloudweather"
+ROOT = Path(__file__).parent.parent.parent
+
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    """Return the self and cumulative import time in us of every module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main() -> None:
+    """Run the benchmark and enforce the budget."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default=PACKAGE)
+    parser.add_argument("--runs", type=int, default=9)
+    parser.add_argument("--budget-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    # The first run compiles the byte code and warms the file system cache
+    import_times(args.module)
+    runs = [import_times(args.module) for _ in range(args.runs)]
+
+    modules = sorted({name for run in runs for name in run if name.startswith(PACKAGE)})
+    own = statistics.median(
+        sum(times[0] for name, times in run.items() if name.startswith(PACKAGE))
+        for run in runs
+    )
+    total = statistics.median(run[args.module][1] for run in runs)
+
+    print(f"{'module':<32}{'self ms':>10}")  # noqa: T201
+    for name in modules:
+        self_ms = statistics.median(run[name][0] for run in runs if name in run)
+        print(f"{name:<32}{self_ms / 1000:>10.2f}")  # noqa: T201
+    print(f"package modules: {own / 1000:.2f}ms (budget {args.budget_ms:.2f}ms)")  # noqa: T201
+    print(f"total with dependencies: {total / 1000:.2f}ms")  # noqa: T201
+    if own / 1000 > args.budget_ms:
+        print("import time budget exceeded")  # noqa: T201
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Report the memory retained per station snapshot.
+
+Snapshots are parsed from the captured requests in `tests/data` and kept
+alive the way `CloudWeatherListener.last_values` keeps them.
+"""
+
+from __future__ import annotations
+
+from dataclasses import fields
+import sys
+import tracemalloc
+
+from ..station import Sensor, WeatherStation
+from .parse import load_samples, planned_weathercloud, planned_wunderground
+
+
+def retained_bytes(factory, samples: list, copies: int = 10) -> float:
+    """Return the traced bytes retained per snapshot built by `factory`."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        retained = [factory(sample) for sample in samples * copies]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    # The list holding the snapshots is not part of a snapshot
+    return (after - before - sys.getsizeof(retained)) / len(retained)
+
+
+def shallow_breakdown(station: WeatherStation) -> dict[str, int]:
+    """Return the shallow size of the station, its sensors and their values."""
+    sensors: list[Sensor] = [
+        value
+        for value in (getattr(station, field.name) for field in fields(station))
+        if isinstance(value, Sensor)
+    ]
+    return {
+        "station": sys.getsizeof(station),
+        "sensors": len(sensors),
+        "sensor objects": sum(sys.getsizeof(sensor) for sensor in sensors),
+        "sensor values": sum(sys.getsizeof(sensor.value) for sensor in sensors),
+    }
+
+
+def main() -> None:
+    """Print the bytes per retained snapshot for both vendors."""
+    wunderground, weathercloud = load_samples()
+    for vendor, factory, samples in (
+        ("wunderground", planned_wunderground, wunderground),
+        ("weathercloud", planned_weathercloud, weathercloud),
+    ):
+        print(f"{vendor}: {retained_bytes(factory, samples):.0f} bytes per snapshot")  # noqa: T201
+        for name, size in shallow_breakdown(factory(samples[0])).items():
+            print(f"  {name:<16}{size:>8}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Benchmark per-request parse time of the precompiled parse plans.
+
+The reflective implementation that rebuilt the `arg -> Field` map and
+resolved type hints on every request is kept here as the baseline.
+"""
+
+from __future__ import annotations
+
+from dataclasses import fields
+from pathlib import Path
+import timeit
+from typing import Any, get_type_hints
+from urllib.parse import parse_qsl, urlsplit
+
+from ..const import DEGREE, PERCENTAGE
+from ..station import (
+    IMPERIAL_TO_METRIC,
+    WEATHERCLOUD_PLAN,
+    WUNDERGROUND_PLAN,
+    Sensor,
+    WeathercloudRawSensor,
+    WeatherStation,
+    WeatherstationVendor,
+    WundergroundRawSensor,
+)
+from ..utils import cast_value
+
+DATA_DIR = Path(__file__).parent.parent / "tests" / "data"
+
+
+def load_samples() -> tuple[list[dict[str, str]], list[list[str]]]:
+    """Load the captured Wunderground queries and Weathercloud paths."""
+    wunderground = [
+        dict(parse_qsl(urlsplit(line.strip()).query))
+        for line in (DATA_DIR / "wunderground").read_text().splitlines()
+        if line.strip()
+    ]
+    weathercloud = [
+        line.strip().split("/v01/set/", 1)[1].split("/")
+        for line in (DATA_DIR / "weathercloud").read_text().splitlines()
+        if line.strip()
+    ]
+    return wunderground, weathercloud
+
+
+def _reflective_cast(raw_cls: type, data: dict[str, Any]) -> dict[str, Any]:
+    dfields = {
+        f.metadata["arg"]: f for f in fields(raw_cls) if "arg" in f.metadata
+    }
+    type_hints = get_type_hints(raw_cls)
+    return {
+        field.name: cast_value(type_hints[field.name], data[arg])
+        for arg, field in dfields.items()
+        if arg in data
+    }
+
+
+def reflective_wunderground(data: dict[str, Any]) -> WeatherStation:
+    """Parse a Wunderground query the way it was done before parse plans."""
+    raw = WundergroundRawSensor(**_reflective_cast(WundergroundRawSensor, data))
+    sensor_data = {}
+    for sensor_field in fields(raw):
+        if sensor_field.name in ("station_id", "station_key"):
+            continue
+        value = getattr(raw, sensor_field.name)
+        if value is None:
+            continue
+        value = value * sensor_field.metadata.get("factor", 1)
+        unit = sensor_field.metadata.get("unit")
+        conversion_func = IMPERIAL_TO_METRIC.get(unit)  # type: ignore[arg-type]
+        name = sensor_field.metadata.get("alternative_for", sensor_field.name)
+        if conversion_func:
+            value = conversion_func(value)
+            unit = conversion_func.unit
+        sensor_data[name] = Sensor(
+            name=name, value=value, unit=str(unit) if unit else "")
+    return WeatherStation(
+        station_id=raw.station_id,
+        station_key=raw.station_key,
+        vendor=WeatherstationVendor.WUNDERGROUND,
+        **sensor_data,
+    )
+
+
+def reflective_weathercloud(segments: list[str]) -> WeatherStation:
+    """Parse a Weathercloud path the way it was done before parse plans."""
+    data = dict(zip(segments[::2], segments[1::2]))
+    raw = WeathercloudRawSensor(**_reflective_cast(WeathercloudRawSensor, data))
+    sensor_data = {}
+    for sensor_field in fields(raw):
+        if sensor_field.name in ("station_id", "station_key"):
+            continue
+        value = getattr(raw, sensor_field.name)
+        if value is None:
+            continue
+        unit = sensor_field.metadata.get("unit")
+        if unit not in [PERCENTAGE, DEGREE]:
+            value = float(value) / 10
+        sensor_data[sensor_field.name] = Sensor(
+            name=sensor_field.name, value=value, unit=str(unit) if unit else "")
+    return WeatherStation(
+        station_id=str(raw.station_id),
+        station_key=str(raw.station_key),
+        vendor=WeatherstationVendor.WEATHERCLOUD,
+        **sensor_data,
+    )
+
+
+def planned_wunderground(data: dict[str, Any]) -> WeatherStation:
+    """Parse a Wunderground query through the precompiled plan."""
+    return WeatherStation.from_wunderground(
+        WundergroundRawSensor(**WUNDERGROUND_PLAN.cast_args(data)))
+
+
+def planned_weathercloud(segments: list[str]) -> WeatherStation:
+    """Parse a Weathercloud path through the precompiled plan."""
+    data = dict(zip(segments[::2], segments[1::2]))
+    return WeatherStation.from_weathercloud(
+        WeathercloudRawSensor(**WEATHERCLOUD_PLAN.cast_args(data)))
+
+
+def per_request_us(func, samples: list, number: int) -> float:
+    """Return the best-of-five mean time per parsed sample in microseconds."""
+    runs = timeit.repeat(
+        lambda: [func(sample) for sample in samples], number=number, repeat=5)
+    return min(runs) / (number * len(samples)) * 1e6
+
+
+def main() -> None:
+    """Print per-request parse times before and after parse plans."""
+    wunderground, weathercloud = load_samples()
+    number = 20
+    rows = [
+        ("wunderground", reflective_wunderground,
+         planned_wunderground, wunderground),
+        ("weathercloud", reflective_weathercloud,
+         planned_weathercloud, weathercloud),
+    ]
+    print(f"{'vendor':<14}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")  # noqa: T201
+    for vendor, before, after, samples in rows:
+        assert before(samples[0]) == after(samples[0])
+        before_us = per_request_us(before, samples, number)
+        after_us = per_request_us(after, samples, number)
+        print(  # noqa: T201
+            f"{vendor:<14}{before_us:>14.2f}{after_us:>14.2f}{before_us / after_us:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""Replay captured station requests against the handler at fixed concurrency.
+
+The URLs in `tests/data` are replayed together with mutated variants of
+them (other station IDs, jittered readings, dropped and unknown fields)
+by `concurrency` tasks calling `CloudWeatherListener.handler` directly.
+Every scenario is run without forwarding and with both sinks forwarding
+to a local stub upstream, inline and through the forward queue.
+
+Reported per scenario: requests/s, latency percentiles and, from a
+separate sequential pass under tracemalloc, the transient peak and the
+retained memory per request.
+
+Run from `custom_components/cloudweatherproxy`:
+`python -m aiocloudweather.benchmarks.replay --concurrency 1 16 64`
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+import random
+import time
+import tracemalloc
+from urllib.parse import parse_qsl, urlencode
+
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+
+from ..proxy import CloudWeatherProxy, DataSink
+from ..server import CloudWeatherListener
+from ..timing import PercentileSketch
+from .snapshot import load_urls
+
+_SINKS = [DataSink.WUNDERGROUND, DataSink.WEATHERCLOUD]
+# Requests replayed before measuring, and measured under tracemalloc, capped
+# by a quarter and the remainder of short runs respectively
+_WARMUP = 200
+_MEMORY_REQUESTS = 500
+
+
+def _jitter(value: str, rng: random.Random) -> str:
+    """Return `value` changed by up to 5% if it is numeric."""
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    if value.lstrip("-").isdigit():
+        return str(round(number * rng.uniform(0.95, 1.05)))
+    return f"{number * rng.uniform(0.95, 1.05):.2f}"
+
+
+def mutate(url: str, rng: random.Random, stations: int) -> str:
+    """Return a synthetic variant of a captured station request URL."""
+    station = f"bench{rng.randrange(stations)}"
+    if "?" in url:
+        path, query = url.split("?", 1)
+        pairs = [
+            (key, station if key == "ID" else _jitter(value, rng))
+            for key, value in parse_qsl(query, keep_blank_values=True)
+        ]
+        if rng.random() < 0.1:
+            pairs.pop(rng.randrange(2, len(pairs)))
+        if rng.random() < 0.1:
+            pairs.append(("softwaretype", "bench"))
+        return f"{path}?{urlencode(pairs)}"
+
+    prefix, dataset = url.split("/v01/set/", 1)
+    segments = dataset.split("/")
+    pairs = [
+        (key, station if key == "wid" else _jitter(value, rng))
+        for key, value in zip(segments[::2], segments[1::2])
+    ]
+    if rng.random() < 0.1:
+        pairs.pop(rng.randrange(2, len(pairs)))
+    if rng.random() < 0.1:
+        pairs.append(("ver", "bench"))
+    return f"{prefix}/v01/set/" + "/".join(
+        part for pair in pairs for part in pair
+    )
+
+
+def workload(count: int, stations: int, seed: int = 0) -> list[str]:
+    """Return `count` URLs, captured ones first, then mutated variants."""
+    rng = random.Random(seed)
+    captured = load_urls()
+    urls = captured[:count]
+    while len(urls) < count:
+        urls.append(mutate(rng.choice(captured), rng, stations))
+    return urls
+
+
+@dataclass
+class Result:
+    """Outcome of a benchmark scenario."""
+
+    requests: int
+    elapsed: float
+    latency: dict[str, float]
+    peak_bytes: float
+    retained_bytes: float
+
+    @property
+    def rate(self) -> float:
+        """Requests per second."""
+        return self.requests / self.elapsed
+
+
+async def _replay(
+    listener: CloudWeatherListener, urls: list[str], concurrency: int
+) -> tuple[float, PercentileSketch]:
+    """Replay `urls` with `concurrency` tasks, returning the elapsed time."""
+    requests = iter([make_mocked_request("GET", url) for url in urls])
+    sketch = PercentileSketch(max(len(urls), 1))
+
+    async def worker(requests: Iterator[web.Request]) -> None:
+        for request in requests:
+            start = time.perf_counter()
+            await listener.handler(request)
+            sketch.record(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(requests) for _ in range(concurrency)))
+    return time.perf_counter() - start, sketch
+
+
+async def _memory(
+    listener: CloudWeatherListener, urls: list[str]
+) -> tuple[float, float]:
+    """Return the mean transient peak and retained bytes per request."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        peak = 0
+        for url in urls:
+            # Requests are built outside the measurement and freed afterwards
+            request = make_mocked_request("GET", url)
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            await listener.handler(request)
+            peak += tracemalloc.get_traced_memory()[1] - before
+            del request
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return peak / len(urls), retained / len(urls)
+
+
+async def run_scenario(
+    make_listener: Callable[[], CloudWeatherListener],
+    urls: list[str],
+    concurrency: int,
+) -> Result:
+    """Benchmark a fresh listener from `make_listener` on `urls`."""
+    warmup = min(_WARMUP, len(urls) // 4)
+    listener = make_listener()
+    try:
+        # Warm up the parse plans, connection pool and station state
+        await _replay(listener, urls[:warmup], concurrency)
+        elapsed, sketch = await _replay(listener, urls, concurrency)
+    finally:
+        await listener.stop()
+    listener = make_listener()
+    try:
+        await _replay(listener, urls[:warmup], 1)
+        peak, retained = await _memory(
+            listener, urls[warmup:warmup + _MEMORY_REQUESTS]
+        )
+    finally:
+        await listener.stop()
+    return Result(
+        requests=len(urls),
+        elapsed=elapsed,
+        latency=sketch.percentiles(),
+        peak_bytes=peak,
+        retained_bytes=retained,
+    )
+
+
+async def start_stub_upstream() -> tuple[web.AppRunner, str]:
+    """Start a local upstream accepting every forward, return its base URL."""
+
+    async def accept(request: web.Request) -> web.Response:
+        return web.Response(text="success")
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", accept)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def _forwarding_listener(
+    upstream: str, forward_queue_size: int
+) -> Callable[[], CloudWeatherListener]:
+    """Return a factory of listeners forwarding both sinks to `upstream`."""
+
+    def make() -> CloudWeatherListener:
+        listener = CloudWeatherListener(
+            forward_queue_size=forward_queue_size, derive_metrics=True
+        )
+        listener.proxy_sinks = list(_SINKS)
+        listener.proxy_enabled = True
+        listener.proxy = CloudWeatherProxy(
+            list(_SINKS),
+            ["127.0.0.1"],
+            upstream_urls=dict.fromkeys(_SINKS, upstream),
+        )
+        return listener
+
+    return make
+
+
+async def run(requests: int, stations: int, concurrency: list[int]) -> None:
+    """Print the results of every scenario and concurrency."""
+    urls = workload(requests, stations)
+    runner, upstream = await start_stub_upstream()
+    scenarios: dict[str, Callable[[], CloudWeatherListener]] = {
+        "no upstream": CloudWeatherListener,
+        "stub inline": _forwarding_listener(upstream, 0),
+        "stub queued": _forwarding_listener(upstream, 1000),
+    }
+    print(  # noqa: T201
+        f"{'scenario':<14}{'conc':>6}{'req/s':>10}{'p50 us':>9}{'p95 us':>9}"
+        f"{'p99 us':>9}{'peak B/req':>12}{'kept B/req':>12}"
+    )
+    try:
+        for name, make_listener in scenarios.items():
+            for tasks in concurrency:
+                result = await run_scenario(make_listener, urls, tasks)
+                latency = {key: value * 1e6 for key, value in result.latency.items()}
+                print(  # noqa: T201
+                    f"{name:<14}{tasks:>6}{result.rate:>10.0f}"
+                    f"{latency['p50']:>9.0f}{latency['p95']:>9.0f}"
+                    f"{latency['p99']:>9.0f}"
+                    f"{result.peak_bytes:>12.0f}{result.retained_bytes:>12.0f}"
+                )
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--stations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    args = parser.parse_args()
+    if args.requests < 1:
+        parser.error("--requests must be at least 1")
+    asyncio.run(run(args.requests, args.stations, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark handler throughput with and without copying the stored dataset.
+
+The handler used to keep `deepcopy(dataset)` as the latest value of a
+station. Datasets are immutable snapshots now and are stored by reference;
+the copying variant is reproduced here as the baseline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from copy import deepcopy
+from pathlib import Path
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+
+from ..server import CloudWeatherListener
+
+DATA_DIR = Path(__file__).parent.parent / "tests" / "data"
+
+
+class CopyingListener(CloudWeatherListener):
+    """Listener that deep copies every dataset like the old handler did."""
+
+    async def handler(self, request: web.BaseRequest) -> web.Response:
+        """Handle the request and store a deep copy of the dataset."""
+        response = await super().handler(request)
+        for station_id, dataset in self.last_values.items():
+            self.last_values[station_id] = deepcopy(dataset)
+        return response
+
+
+def load_urls() -> list[str]:
+    """Load the captured station request URLs."""
+    return [
+        line.strip()
+        for name in ("wunderground", "weathercloud")
+        for line in (DATA_DIR / name).read_text().splitlines()
+        if line.strip()
+    ]
+
+
+async def requests_per_second(
+    listener: CloudWeatherListener, urls: list[str], rounds: int
+) -> float:
+    """Return the best handler throughput over five repetitions."""
+    requests = [make_mocked_request("GET", url) for url in urls]
+    best = 0.0
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for request in requests:
+                await listener.handler(request)
+        elapsed = time.perf_counter() - start
+        best = max(best, rounds * len(requests) / elapsed)
+    return best
+
+
+async def run() -> None:
+    """Print handler throughput with and without the deep copy."""
+    urls = load_urls()
+    rounds = 20
+    with_copy = await requests_per_second(CopyingListener(), urls, rounds)
+    by_reference = await requests_per_second(CloudWeatherListener(), urls, rounds)
+    print(f"{'variant':<16}{'requests/s':>12}")  # noqa: T201
+    print(f"{'deepcopy':<16}{with_copy:>12.0f}")  # noqa: T201
+    print(f"{'by reference':<16}{by_reference:>12.0f}")  # noqa: T201
+    print(f"speedup: {by_reference / with_copy:.2f}x")  # noqa: T201
+
+
+def main() -> None:
+    """Run the benchmark."""
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,36 @@
 """A list of all the unit conversions. Many are just approximations."""
 
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import cache
+import importlib
+import sys
+from typing import Any
+
 from .const import (
+    UnitOfIrradiance,
     UnitOfPrecipitationDepth,
     UnitOfPressure,
     UnitOfSpeed,
     UnitOfTemperature,
+    UnitOfVolumetricFlux,
 )
 
-# Prefer Home Assistant's unit conversion helpers when running inside HA.
-try:
-    from homeassistant.util.unit_conversion import (
-        fahrenheit_to_celsius as _ha_fahrenheit_to_celsius,
-        inhg_to_hpa as _ha_inhg_to_hpa,
-        in_to_mm as _ha_in_to_mm,
-        mph_to_ms as _ha_mph_to_ms,
-    )
-except Exception:
-    _ha_fahrenheit_to_celsius = None
-    _ha_inhg_to_hpa = None
-    _ha_in_to_mm = None
-    _ha_mph_to_ms = None
+
+@cache
+def _ha_converter(name: str) -> Callable[[float], float] | None:
+    """Return Home Assistant's unit conversion helper `name`.
+
+    Only looked up when running inside Home Assistant, i.e. when it has
+    already been imported, so the standalone listener never pays for it.
+    """
+    if "homeassistant" not in sys.modules:
+        return None
+    try:
+        module = importlib.import_module("homeassistant.util.unit_conversion")
+    except Exception:
+        return None
+    return getattr(module, name, None)
 
 
 def unit(output_unit):
@@ -36,8 +47,9 @@ def unit(output_unit):
 @unit(UnitOfTemperature.CELSIUS)
 def fahrenheit_to_celsius(temp_f: float) -> float:
     """Convert Fahrenheit to Celsius."""
-    if _ha_fahrenheit_to_celsius is not None:
-        return _ha_fahrenheit_to_celsius(temp_f)
+    ha_converter = _ha_converter("fahrenheit_to_celsius")
+    if ha_converter is not None:
+        return ha_converter(temp_f)
 
     return (temp_f - 32) * 5.0 / 9.0
 
@@ -45,8 +57,9 @@ def fahrenheit_to_celsius(temp_f: float) -> float:
 @unit(UnitOfPressure.HPA)
 def inhg_to_hpa(pressure: float) -> float:
     """Convert inches of mercury (inHg) to hectopascals (hPa)."""
-    if _ha_inhg_to_hpa is not None:
-        return _ha_inhg_to_hpa(pressure)
+    ha_converter = _ha_converter("inhg_to_hpa")
+    if ha_converter is not None:
+        return ha_converter(pressure)
 
     return pressure * 33.864
 
@@ -54,8 +67,9 @@ def inhg_to_hpa(pressure: float) -> float:
 @unit(UnitOfPrecipitationDepth.MILLIMETERS)
 def in_to_mm(length: float) -> float:
     """Convert inches to millimeters (mm)."""
-    if _ha_in_to_mm is not None:
-        return _ha_in_to_mm(length)
+    ha_converter = _ha_converter("in_to_mm")
+    if ha_converter is not None:
+        return ha_converter(length)
 
     return length * 25.4
 
@@ -63,7 +77,152 @@ def in_to_mm(length: float) -> float:
 @unit(UnitOfSpeed.METERS_PER_SECOND)
 def mph_to_ms(speed: float) -> float:
     """Convert miles per hour (mph) to meters per second (m/s)."""
-    if _ha_mph_to_ms is not None:
-        return _ha_mph_to_ms(speed)
+    ha_converter = _ha_converter("mph_to_ms")
+    if ha_converter is not None:
+        return ha_converter(speed)
 
     return speed * 0.44704
+
+
+# Conversion graph: every unit is an exact affine transform into the base
+# unit of its family, value_base = value * scale + offset, with scale and
+# offset given as integer ratios. Any pair of units of the same family is
+# fused into a single affine transform and rounded to floats only once.
+_Ratio = tuple[int, int]
+_ONE: _Ratio = (1, 1)
+_ZERO: _Ratio = (0, 1)
+
+_TO_BASE: dict[str, tuple[_Ratio, _Ratio]] = {
+    # °C
+    UnitOfTemperature.CELSIUS: (_ONE, _ZERO),
+    UnitOfTemperature.FAHRENHEIT: ((5, 9), (-160, 9)),
+    UnitOfTemperature.KELVIN: (_ONE, (-27315, 100)),
+    # Pa
+    UnitOfPressure.PA: (_ONE, _ZERO),
+    UnitOfPressure.HPA: ((100, 1), _ZERO),
+    UnitOfPressure.KPA: ((1000, 1), _ZERO),
+    UnitOfPressure.BAR: ((100000, 1), _ZERO),
+    UnitOfPressure.CBAR: ((1000, 1), _ZERO),
+    UnitOfPressure.MBAR: ((100, 1), _ZERO),
+    UnitOfPressure.MMHG: ((133322387415, 10**9), _ZERO),
+    # The factor of `inhg_to_hpa`, so converted readings do not change
+    UnitOfPressure.INHG: ((33864, 10), _ZERO),
+    UnitOfPressure.PSI: ((6894757293168361, 10**12), _ZERO),
+    # m/s, Beaufort is converted to m/s by `_NONLINEAR` first
+    UnitOfSpeed.METERS_PER_SECOND: (_ONE, _ZERO),
+    UnitOfSpeed.BEAUFORT: (_ONE, _ZERO),
+    UnitOfSpeed.FEET_PER_SECOND: ((3048, 10000), _ZERO),
+    UnitOfSpeed.KILOMETERS_PER_HOUR: ((1000, 3600), _ZERO),
+    UnitOfSpeed.KNOTS: ((1852, 3600), _ZERO),
+    UnitOfSpeed.MILES_PER_HOUR: ((44704, 100000), _ZERO),
+    # mm
+    UnitOfPrecipitationDepth.MILLIMETERS: (_ONE, _ZERO),
+    UnitOfPrecipitationDepth.CENTIMETERS: ((10, 1), _ZERO),
+    UnitOfPrecipitationDepth.INCHES: ((254, 10), _ZERO),
+    # mm/h
+    UnitOfVolumetricFlux.MILLIMETERS_PER_HOUR: (_ONE, _ZERO),
+    UnitOfVolumetricFlux.MILLIMETERS_PER_DAY: ((1, 24), _ZERO),
+    UnitOfVolumetricFlux.INCHES_PER_HOUR: ((254, 10), _ZERO),
+    UnitOfVolumetricFlux.INCHES_PER_DAY: ((254, 240), _ZERO),
+    # W/m²
+    UnitOfIrradiance.WATTS_PER_SQUARE_METER: (_ONE, _ZERO),
+    UnitOfIrradiance.BTUS_PER_HOUR_SQUARE_FOOT: ((315459075, 10**8), _ZERO),
+}
+
+# The unit each family is normalized to
+METRIC_UNITS: dict[type, str] = {
+    UnitOfTemperature: UnitOfTemperature.CELSIUS,
+    UnitOfPressure: UnitOfPressure.HPA,
+    UnitOfSpeed: UnitOfSpeed.METERS_PER_SECOND,
+    UnitOfPrecipitationDepth: UnitOfPrecipitationDepth.MILLIMETERS,
+    UnitOfVolumetricFlux: UnitOfVolumetricFlux.MILLIMETERS_PER_HOUR,
+    UnitOfIrradiance: UnitOfIrradiance.WATTS_PER_SQUARE_METER,
+}
+
+_FAMILY: dict[str, type] = {
+    unit: family for family in METRIC_UNITS for unit in family  # type: ignore[attr-defined]
+}
+
+
+def _beaufort_to_ms(beaufort: Any) -> Any:
+    """Convert Beaufort to m/s using the empirical formula."""
+    return 0.836 * beaufort**1.5
+
+
+def _ms_to_beaufort(speed: Any) -> Any:
+    """Convert m/s to the nearest Beaufort number."""
+    return round((speed / 0.836) ** (2 / 3))
+
+
+# Units that are not affine: (into the base unit, out of the base unit)
+_NONLINEAR: dict[str, tuple[Callable[[Any], Any], Callable[[Any], Any]]] = {
+    UnitOfSpeed.BEAUFORT: (_beaufort_to_ms, _ms_to_beaufort),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class UnitConversion:
+    """A fused conversion from `source` to `unit`.
+
+    Affine pairs are `value * scale + offset`, which works on floats and
+    NumPy arrays alike. Beaufort adds a lookup step before or after it.
+    """
+
+    source: str
+    unit: str
+    scale: float = 1.0
+    offset: float = 0.0
+    before: Callable[[Any], Any] | None = None
+    after: Callable[[Any], Any] | None = None
+
+    def __call__(self, value: Any) -> Any:
+        """Convert `value`."""
+        if self.before is not None:
+            value = self.before(value)
+        value = value * self.scale + self.offset
+        if self.after is not None:
+            value = self.after(value)
+        return value
+
+
+@cache
+def converter(source: str, target: str) -> UnitConversion:
+    """Return the fused conversion from `source` to `target`.
+
+    Raises:
+        ValueError: If a unit is unknown or the units measure different things.
+
+    """
+    family = _FAMILY.get(source)
+    if family is None or _FAMILY.get(target) is not family:
+        raise ValueError(f"Cannot convert {source} to {target}")
+
+    if source == target:
+        return UnitConversion(source, target)
+    (sn, sd), (on, od) = _TO_BASE[source]
+    (tn, td), (pn, pd) = _TO_BASE[target]
+    # scale = s / t, offset = (o - p) / t; integer true division rounds once
+    return UnitConversion(
+        source=source,
+        unit=target,
+        scale=(sn * td) / (sd * tn),
+        offset=((on * pd - pn * od) * td) / (od * pd * tn),
+        before=_NONLINEAR[source][0] if source in _NONLINEAR else None,
+        after=_NONLINEAR[target][1] if target in _NONLINEAR else None,
+    )
+
+
+def to_metric(source: str | None) -> UnitConversion | None:
+    """Return the conversion of `source` to the metric unit of its family.
+
+    None if `source` is already metric or not a convertible unit.
+    """
+    family = _FAMILY.get(source) if source else None
+    if family is None or source == METRIC_UNITS[family]:
+        return None
+    return converter(source, METRIC_UNITS[family])  # type: ignore[arg-type]
+
+
+def convert(value: float, source: str, target: str) -> float:
+    """Convert `value` from `source` to `target`."""
+    return converter(source, target)(value)
@@ -0,0 +1,114 @@
+"""Metrics derived incrementally from the packets of a station.
+
+Many stations only report the cumulative daily rain and the instantaneous
+wind speed. `DerivedMetrics` keeps running sums and monotonic deques per
+station so the rain rate, the wind speed average and the gust maximum are
+updated in amortized O(1) per packet.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any
+
+from .const import UnitOfVolumetricFlux
+from .station import Sensor, WeatherStation
+
+RAIN_RATE_UNIT = str(UnitOfVolumetricFlux.MILLIMETERS_PER_HOUR)
+
+
+class DerivedMetrics:
+    """Derived metrics of a single station.
+
+    Derived values never replace values reported by the station itself.
+    """
+
+    def __init__(
+        self,
+        rain_window: float = 600,
+        wind_average_window: float = 120,
+        gust_window: float = 600,
+    ) -> None:
+        """Initialize the engine with its window lengths in seconds."""
+        self.rain_window = rain_window
+        self.wind_average_window = wind_average_window
+        self.gust_window = gust_window
+
+        # Rain accumulated since start, immune to the daily counter reset
+        self._rain_total = 0.0
+        self._last_daily_rain: float | None = None
+        self._rain: deque[tuple[float, float]] = deque()
+
+        self._wind: deque[tuple[float, float]] = deque()
+        self._wind_sum = 0.0
+
+        # Gust candidates with decreasing speeds, the head is the maximum
+        self._gusts: deque[tuple[float, float]] = deque()
+
+    def _rain_rate(self, now: float, daily_rain: float) -> float:
+        """Update the rain accumulation and return the rain rate in mm/h."""
+        last = self._last_daily_rain
+        if last is not None:
+            # The daily counter drops back to zero at midnight
+            self._rain_total += daily_rain - last if daily_rain >= last else daily_rain
+        self._last_daily_rain = daily_rain
+
+        rain = self._rain
+        rain.append((now, self._rain_total))
+        # Keep a single sample at or before the start of the window as baseline
+        since = now - self.rain_window
+        while len(rain) > 1 and rain[1][0] <= since:
+            rain.popleft()
+
+        start, baseline = rain[0]
+        elapsed = max(now - start, self.rain_window)
+        return (self._rain_total - baseline) * 3600 / elapsed
+
+    def _wind_average(self, now: float, speed: float) -> float:
+        """Update the running wind sum and return the average speed."""
+        wind = self._wind
+        wind.append((now, speed))
+        self._wind_sum += speed
+        since = now - self.wind_average_window
+        while wind[0][0] < since:
+            self._wind_sum -= wind.popleft()[1]
+        return self._wind_sum / len(wind)
+
+    def _gust_maximum(self, now: float, gust: float) -> float:
+        """Update the gust deque and return the maximum inside the window."""
+        gusts = self._gusts
+        while gusts and gusts[-1][1] <= gust:
+            gusts.pop()
+        gusts.append((now, gust))
+        since = now - self.gust_window
+        while gusts[0][0] < since:
+            gusts.popleft()
+        return gusts[0][1]
+
+    def update(self, station: WeatherStation, now: float) -> dict[str, Any]:
+        """Feed a packet and return the derived sensors missing from it.
+
+        The result can be passed to `dataclasses.replace` on `station`.
+        """
+        derived: dict[str, Any] = {}
+        if station.dailyrain is not None:
+            rate = self._rain_rate(now, float(station.dailyrain.value))
+            # Stations report their rain rate as `rain`
+            if station.rain is None:
+                derived["rainrate"] = Sensor(
+                    name="rainrate", value=rate, unit=RAIN_RATE_UNIT)
+
+        windspeed = station.windspeed
+        if windspeed is not None:
+            average = self._wind_average(now, float(windspeed.value))
+            if station.windspeedavg is None:
+                derived["windspeedavg"] = Sensor(
+                    name="windspeedavg", value=average, unit=windspeed.unit)
+
+        gust = station.windgustspeed or windspeed
+        if gust is not None:
+            maximum = self._gust_maximum(now, float(gust.value))
+            if station.windgustspeed10m is None:
+                derived["windgustspeed10m"] = Sensor(
+                    name="windgustspeed10m", value=maximum, unit=gust.unit)
+        return derived
@@ -0,0 +1,117 @@
+"""Background forwarding of station requests to their upstream sinks."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import contextlib
+import logging
+
+from .sink import DataSink, ForwardRequest
+from .utils import LimitedSizeQueue
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ForwardQueue:
+    """Bounded forwarding queue drained by a pool of worker tasks.
+
+    Requests are queued so the station can be answered right away. When the
+    queue is full the oldest pending request is dropped in favour of the new
+    one. Workers are started lazily on the first `put()` so the queue also
+    works when the listener is driven by Home Assistant views.
+    """
+
+    def __init__(
+        self,
+        forward: Callable[[DataSink, ForwardRequest], Awaitable[bool]],
+        maxsize: int = 100,
+        workers: int = 2,
+    ) -> None:
+        """Initialize the forwarding queue.
+
+        Args:
+            forward: Coroutine forwarding a single request, returns whether
+                the upstream accepted it.
+            maxsize: Maximum number of pending requests.
+            workers: Number of worker tasks draining the queue.
+
+        """
+        self._forward = forward
+        self.queue: LimitedSizeQueue = LimitedSizeQueue(maxsize=maxsize)
+        self.workers: int = max(1, workers)
+        self._tasks: list[asyncio.Task[None]] = []
+
+        self.forwarded: int = 0
+        self.failed: int = 0
+
+    @property
+    def depth(self) -> int:
+        """Number of requests waiting to be forwarded."""
+        return self.queue.qsize()
+
+    @property
+    def dropped(self) -> int:
+        """Number of requests dropped because the queue was full."""
+        return self.queue.dropped
+
+    def put(self, sink: DataSink, request: ForwardRequest) -> None:
+        """Queue `request` for forwarding to `sink` without waiting."""
+        if not self._tasks:
+            self.start()
+        self.queue.put_nowait((sink, request))
+
+    def start(self) -> None:
+        """Start the worker tasks."""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"cloudweather-forward-{idx}")
+            for idx in range(self.workers)
+        ]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Drain the pending requests and stop the workers.
+
+        Requests still queued after `timeout` seconds are discarded.
+        """
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            _LOGGER.warning(
+                "Discarding %d pending forwards on shutdown", self.queue.qsize()
+            )
+
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _worker(self) -> None:
+        """Forward queued requests until cancelled."""
+        while True:
+            sink, request = await self.queue.get()
+            try:
+                if await self._forward(sink, request):
+                    self.forwarded += 1
+                else:
+                    self.failed += 1
+            except Exception as err:  # pylint: disable=broad-except
+                self.failed += 1
+                _LOGGER.warning("CloudWeather forward worker error: %s", err)
+            finally:
+                self.queue.task_done()
+
+    def stats(self) -> dict[str, int]:
+        """Return the queue counters."""
+        return {
+            "depth": self.depth,
+            "dropped": self.dropped,
+            "forwarded": self.forwarded,
+            "failed": self.failed,
+            "workers": len(self._tasks),
+        }
@@ -0,0 +1,264 @@
+"""Load generator simulating many weather stations posting to a listener.
+
+Every virtual station reports a slowly drifting, diurnally varying signal
+in either the Wunderground query string or the Weathercloud path format
+at its own interval. All stations share one keep-alive connection pool;
+the achieved rate, errors and latency percentiles are reported
+periodically and at the end.
+
+Usage: `python -m aiocloudweather loadgen http://127.0.0.1:49199 --stations 100`
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import math
+import random
+import time
+from urllib.parse import urlencode
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+
+from .timing import PercentileSketch
+
+WUNDERGROUND = "wunderground"
+WEATHERCLOUD = "weathercloud"
+
+
+@dataclass
+class VirtualStation:
+    """A simulated station with a drifting metric sensor signal."""
+
+    station_id: str
+    format: str
+    interval: float
+    rng: random.Random
+    temperature: float = 15.0
+    humidity: float = 70.0
+    pressure: float = 1013.0
+    wind_direction: float = 180.0
+    wind_speed: float = 2.0
+    daily_rain: float = 0.0
+    rain_rate: float = 0.0
+
+    def step(self, now: float) -> None:
+        """Advance the signal by one posting interval at unix time `now`."""
+        rng = self.rng
+        # Mean reverting random walks around a diurnal temperature cycle
+        daytime = math.sin((now % 86400) / 86400 * 2 * math.pi - math.pi / 2)
+        self.temperature += 0.1 * (15 + 8 * daytime - self.temperature)
+        self.temperature += rng.gauss(0, 0.1)
+        self.humidity = min(100.0, max(5.0, self.humidity + rng.gauss(0, 0.5)))
+        self.pressure += 0.01 * (1013 - self.pressure) + rng.gauss(0, 0.05)
+        self.wind_direction = (self.wind_direction + rng.gauss(0, 10)) % 360
+        self.wind_speed = max(0.0, self.wind_speed + rng.gauss(0, 0.3))
+        if self.rain_rate or rng.random() < 0.01:
+            self.rain_rate = max(0.0, self.rain_rate + rng.gauss(0, 0.5))
+        self.daily_rain += self.rain_rate * self.interval / 3600
+
+    @property
+    def dew_point(self) -> float:
+        """Magnus approximation of the dew point in °C."""
+        gamma = math.log(self.humidity / 100) + 17.62 * self.temperature / (
+            243.12 + self.temperature
+        )
+        return 243.12 * gamma / (17.62 - gamma)
+
+    @property
+    def solar_radiation(self) -> float:
+        """Solar radiation in W/m² following the time of day."""
+        hour = datetime.now(timezone.utc).hour
+        return max(0.0, 800 * math.sin((hour - 6) / 12 * math.pi))
+
+    def path(self) -> str:
+        """Return the request path and query of the current readings."""
+        gust = self.wind_speed * 1.5
+        if self.format == WUNDERGROUND:
+            query = {
+                "ID": self.station_id,
+                "PASSWORD": "loadgen",
+                "dateutc": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+                "tempf": f"{self.temperature * 9 / 5 + 32:.1f}",
+                "dewptf": f"{self.dew_point * 9 / 5 + 32:.1f}",
+                "humidity": f"{self.humidity:.0f}",
+                "baromin": f"{self.pressure / 33.8639:.2f}",
+                "winddir": f"{self.wind_direction:.0f}",
+                "windspeedmph": f"{self.wind_speed * 2.23694:.1f}",
+                "windgustmph": f"{gust * 2.23694:.1f}",
+                "rainin": f"{self.rain_rate / 25.4:.2f}",
+                "dailyrainin": f"{self.daily_rain / 25.4:.2f}",
+                "solarRadiation": f"{self.solar_radiation:.1f}",
+                "UV": f"{self.solar_radiation / 100:.0f}",
+            }
+            return f"/weatherstation/updateweatherstation.php?{urlencode(query)}"
+
+        # Weathercloud transmits tenths of metric units
+        values = {
+            "wid": self.station_id,
+            "key": "loadgen",
+            "temp": round(self.temperature * 10),
+            "dew": round(self.dew_point * 10),
+            "hum": round(self.humidity),
+            "bar": round(self.pressure * 10),
+            "wdir": round(self.wind_direction),
+            "wspd": round(self.wind_speed * 10),
+            "wspdhi": round(gust * 10),
+            "rain": round(self.daily_rain * 10),
+            "rainrate": round(self.rain_rate * 10),
+            "solarrad": round(self.solar_radiation * 10),
+            "uvi": round(self.solar_radiation / 10),
+        }
+        return "/v01/set/" + "/".join(f"{key}/{value}" for key, value in values.items())
+
+
+@dataclass
+class LoadStats:
+    """Outcome counters and latencies of the sent requests."""
+
+    sent: int = 0
+    ok: int = 0
+    errors: Counter[str] = field(default_factory=Counter)
+    latency: PercentileSketch = field(default_factory=lambda: PercentileSketch(8192))
+
+    def record(self, error: str | None, elapsed: float) -> None:
+        """Record a response, `error` is None for a success."""
+        self.sent += 1
+        self.latency.record(elapsed)
+        if error is None:
+            self.ok += 1
+        else:
+            self.errors[error] += 1
+
+    def summary(self, elapsed: float) -> str:
+        """Return a one-line report over `elapsed` seconds."""
+        latency = " ".join(
+            f"{name}={value * 1000:.1f}ms"
+            for name, value in self.latency.percentiles().items()
+        )
+        errors = ", ".join(f"{name}: {count}" for name, count in self.errors.items())
+        return (
+            f"sent={self.sent} rate={self.sent / elapsed:.1f}/s ok={self.ok} "
+            f"errors={sum(self.errors.values())}{f' ({errors})' if errors else ''} "
+            f"{latency}"
+        )
+
+
+def make_stations(
+    count: int,
+    interval: float,
+    wunderground_share: float = 0.5,
+    seed: int = 0,
+) -> list[VirtualStation]:
+    """Create `count` stations mixing both formats with varied start values."""
+    rng = random.Random(seed)
+    return [
+        VirtualStation(
+            station_id=f"loadgen{index:05d}",
+            format=WUNDERGROUND if rng.random() < wunderground_share else WEATHERCLOUD,
+            interval=interval,
+            rng=random.Random(rng.random()),
+            temperature=rng.uniform(0, 30),
+            humidity=rng.uniform(30, 95),
+            pressure=rng.uniform(990, 1030),
+            wind_direction=rng.uniform(0, 360),
+            wind_speed=rng.uniform(0, 8),
+        )
+        for index in range(count)
+    ]
+
+
+async def _run_station(
+    session: ClientSession,
+    target: str,
+    station: VirtualStation,
+    stats: LoadStats,
+    deadline: float,
+) -> None:
+    """Post the readings of `station` every interval until `deadline`."""
+    loop = asyncio.get_running_loop()
+    # Spread the stations evenly over the first interval
+    next_post = loop.time() + station.rng.uniform(0, station.interval)
+    while next_post < deadline:
+        await asyncio.sleep(next_post - loop.time())
+        station.step(time.time())
+        start = time.perf_counter()
+        error: str | None = None
+        try:
+            async with session.get(target + station.path()) as response:
+                await response.read()
+                if response.status >= 400:
+                    error = str(response.status)
+        except (ClientError, asyncio.TimeoutError) as err:
+            error = type(err).__name__
+        stats.record(error, time.perf_counter() - start)
+        # Keep the schedule instead of drifting by the request latency
+        next_post += station.interval
+
+
+async def run_loadgen(
+    target: str,
+    stations: list[VirtualStation],
+    duration: float,
+    connections: int = 100,
+    report_interval: float = 10.0,
+) -> LoadStats:
+    """Simulate `stations` against `target` for `duration` seconds."""
+    loop = asyncio.get_running_loop()
+    stats = LoadStats()
+    target = target.rstrip("/")
+    start = loop.time()
+    connector = TCPConnector(limit=connections, keepalive_timeout=60)
+    async with ClientSession(
+        connector=connector, timeout=ClientTimeout(total=30)
+    ) as session:
+        tasks = [
+            asyncio.create_task(
+                _run_station(session, target, station, stats, start + duration)
+            )
+            for station in stations
+        ]
+        done = asyncio.gather(*tasks)
+        while not done.done():
+            await asyncio.wait([done], timeout=report_interval)
+            if not done.done():
+                print(stats.summary(loop.time() - start))  # noqa: T201
+        await done
+    return stats
+
+
+def main(argv: list[str]) -> None:
+    """Run the load generator with the command line arguments `argv`."""
+    parser = argparse.ArgumentParser(prog="aiocloudweather loadgen")
+    parser.add_argument("target", help="listener base URL, e.g. http://127.0.0.1:49199")
+    parser.add_argument("--stations", type=int, default=10)
+    parser.add_argument("--interval", type=float, default=16.0, help="seconds")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds")
+    parser.add_argument("--wunderground-share", type=float, default=0.5)
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--report-interval", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    stations = make_stations(
+        args.stations, args.interval, args.wunderground_share, args.seed
+    )
+    expected = len(stations) / args.interval
+    print(  # noqa: T201
+        f"Simulating {len(stations)} stations ({expected:.1f} req/s) "
+        f"against {args.target} for {args.duration:.0f}s"
+    )
+    started = time.monotonic()
+    stats = asyncio.run(
+        run_loadgen(
+            args.target,
+            stations,
+            args.duration,
+            args.connections,
+            args.report_interval,
+        )
+    )
+    print(stats.summary(time.monotonic() - started))  # noqa: T201
@@ -0,0 +1,201 @@
+"""Lightweight OpenMetrics instrumentation for the standalone listener.
+
+Recording a sample is a dict lookup and an integer or float addition on
+tuple label keys; no locking is needed as everything runs on the event
+loop, and all string formatting is deferred to `MetricsRegistry.render`,
+i.e. to the time the `/metrics` endpoint is scraped.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+import math
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value: object) -> str:
+    """Escape a label value."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(
+    names: tuple[str, ...], values: Iterable[object], extra: str = ""
+) -> str:
+    """Format a label set, `extra` is appended verbatim."""
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    """Format a sample value."""
+    if math.isfinite(value) and value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing counter per label set."""
+
+    __slots__ = ("documentation", "label_names", "name", "values")
+
+    def __init__(
+        self, name: str, documentation: str, label_names: tuple[str, ...] = ()
+    ) -> None:
+        """Initialize the counter."""
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.values: dict[tuple[object, ...], float] = {}
+
+    def inc(self, labels: tuple[object, ...] = (), amount: float = 1) -> None:
+        """Increase the counter of `labels` by `amount`."""
+        values = self.values
+        values[labels] = values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        """Render the counter in the OpenMetrics text format."""
+        lines = [
+            f"# TYPE {self.name} counter",
+            f"# HELP {self.name} {self.documentation}",
+        ]
+        lines.extend(
+            f"{self.name}_total{_labels(self.label_names, labels)} {_number(value)}"
+            for labels, value in self.values.items()
+        )
+        return lines
+
+
+class Histogram:
+    """Histogram with fixed buckets per label set."""
+
+    __slots__ = ("buckets", "documentation", "label_names", "name", "series")
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Initialize the histogram."""
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        # Per label set: non-cumulative bucket counts (+Inf last), then sum
+        self.series: dict[tuple[object, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, labels: tuple[object, ...] = ()) -> None:
+        """Record a sample."""
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def render(self) -> list[str]:
+        """Render the histogram in the OpenMetrics text format."""
+        lines = [
+            f"# TYPE {self.name} histogram",
+            f"# HELP {self.name} {self.documentation}",
+        ]
+        for labels, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _labels(self.label_names, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_str = _labels(self.label_names, labels)
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+            lines.append(f"{self.name}_sum{label_str} {_number(total[0])}")
+        return lines
+
+
+class Gauge:
+    """Gauge whose values are read from a callback at scrape time."""
+
+    __slots__ = ("documentation", "label_names", "name", "read")
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        read: Callable[[], dict[tuple[object, ...], float]],
+        label_names: tuple[str, ...] = (),
+    ) -> None:
+        """Initialize the gauge."""
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.read = read
+
+    def render(self) -> list[str]:
+        """Render the gauge in the OpenMetrics text format."""
+        lines = [
+            f"# TYPE {self.name} gauge",
+            f"# HELP {self.name} {self.documentation}",
+        ]
+        lines.extend(
+            f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+            for labels, value in self.read().items()
+        )
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self.metrics: list[Counter | Histogram | Gauge] = []
+
+    def counter(
+        self, name: str, documentation: str, label_names: tuple[str, ...] = ()
+    ) -> Counter:
+        """Create and register a counter."""
+        metric = Counter(name, documentation, label_names)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram."""
+        metric = Histogram(name, documentation, label_names, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        read: Callable[[], dict[tuple[object, ...], float]],
+        label_names: tuple[str, ...] = (),
+    ) -> Gauge:
+        """Create and register a gauge read at scrape time."""
+        metric = Gauge(name, documentation, read, label_names)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the OpenMetrics text format."""
+        lines: list[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
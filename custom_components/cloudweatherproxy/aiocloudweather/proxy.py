@@ -1,36 +1,327 @@
 """Proxy for forwarding data to the CloudWeather APIs."""
 
-from enum import Enum
+import asyncio
+from collections.abc import Callable, Iterator
+import contextlib
+from dataclasses import dataclass
 import logging
-from aiohttp import web, TCPConnector, ClientSession, ClientResponse
-from urllib.parse import parse_qsl, urlencode
-from aiohttp.resolver import AsyncResolver
+import time
+from types import SimpleNamespace
+from typing import Any
+from aiohttp import (
+    web,
+    ClientResponse,
+    ClientSession,
+    ClientTimeout,
+    TCPConnector,
+    TraceConfig,
+    TraceConnectionCreateEndParams,
+    TraceConnectionCreateStartParams,
+    TraceConnectionReuseconnParams,
+)
+from yarl import URL
+
+from .resolver import CachingResolver
+from .sink import WEATHERCLOUD_PREFIX, DataSink, ForwardRequest
 
 _LOGGER = logging.getLogger(__name__)
 
+UPSTREAM_URLS: dict[DataSink, str] = {
+    DataSink.WUNDERGROUND: "https://rtupdate.wunderground.com",
+    DataSink.WEATHERCLOUD: "https://api.weathercloud.net",
+}
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Configuration of the upstream connection pool.
+
+    Timeouts are in seconds. DNS answers are cached for their TTL, but at
+    most `dns_cache_ttl` seconds. With `prewarm` the proxy opens
+    `prewarm_connections` connections to every enabled sink on `start()`
+    and sends a HEAD probe over them every `prewarm_interval` seconds, which
+    has to stay below `keepalive_timeout` to keep them open.
+    """
+
+    limit: int = 20
+    limit_per_host: int = 4
+    keepalive_timeout: float = 60.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 10.0
+    total_timeout: float = 15.0
+    dns_cache_ttl: int = 300
+    prewarm: bool = False
+    prewarm_connections: int = 1
+    prewarm_interval: float = 30.0
+
+
+@dataclass
+class PoolStats:
+    """Connection statistics of a sink."""
+
+    handshakes: int = 0
+    handshake_time: float = 0.0
+    reused: int = 0
+    probes: int = 0
+    probe_failures: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics including the reuse ratio and mean handshake time."""
+        connections = self.handshakes + self.reused
+        return {
+            "handshakes": self.handshakes,
+            "reused": self.reused,
+            "reuse_ratio": self.reused / connections if connections else 0.0,
+            "mean_handshake_time": (
+                self.handshake_time / self.handshakes if self.handshakes else 0.0
+            ),
+            "probes": self.probes,
+            "probe_failures": self.probe_failures,
+        }
+
+
+class ForwardRateLimiter:
+    """Minimum forward interval per sink with latest-wins coalescing.
 
-class DataSink(Enum):
-    """Data sinks for the CloudWeather API."""
+    Each (sink, station) pair may be forwarded once per interval. Samples
+    arriving inside the interval replace the pending one, and the newest
+    sample is released through the callback once the window opens.
+    """
 
-    WUNDERGROUND = "wunderground"
-    WEATHERCLOUD = "weathercloud"
+    def __init__(self, min_intervals: dict[DataSink, float] | None = None) -> None:
+        """Initialize the rate limiter with the minimum interval per sink in seconds."""
+        self.min_intervals: dict[DataSink, float] = min_intervals or {}
+        self._last_forward: dict[tuple[DataSink, str], float] = {}
+        self._pending: dict[tuple[DataSink, str], ForwardRequest] = {}
+        self._timers: dict[tuple[DataSink, str], asyncio.TimerHandle] = {}
+        self.coalesced: int = 0
+
+    def admit(
+        self,
+        sink: DataSink,
+        station_id: str,
+        request: ForwardRequest,
+        release: Callable[[DataSink, ForwardRequest], Any],
+    ) -> bool:
+        """Return whether `request` may be forwarded right away.
+
+        Otherwise it becomes the pending sample of the station and is passed
+        to `release` when the interval has elapsed.
+        """
+        interval = self.min_intervals.get(sink)
+        if not interval:
+            return True
+
+        key = (sink, station_id)
+        now = time.monotonic()
+        last = self._last_forward.get(key)
+        if key in self._timers:
+            # A sample is already waiting for this window, the newest one wins
+            self.coalesced += 1
+        elif last is None or now - last >= interval:
+            self._last_forward[key] = now
+            return True
+        else:
+            self._timers[key] = asyncio.get_running_loop().call_later(
+                last + interval - now, self._release, key, release
+            )
+        self._pending[key] = request
+        return False
+
+    def _release(
+        self,
+        key: tuple[DataSink, str],
+        release: Callable[[DataSink, ForwardRequest], Any],
+    ) -> None:
+        """Release the pending sample of a station."""
+        self._timers.pop(key, None)
+        request = self._pending.pop(key, None)
+        if request is None:
+            return
+        self._last_forward[key] = time.monotonic()
+        release(key[0], request)
+
+    def cancel(self) -> None:
+        """Cancel all pending releases."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        self._pending.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return the rate limiter counters."""
+        return {"coalesced": self.coalesced, "pending": len(self._pending)}
 
 
 class CloudWeatherProxy:
     """Proxy for forwarding data to the CloudWeather API."""
 
-    def __init__(self, proxied_sinks: list[DataSink], dns_servers: list[str]):
-        """Initialize CloudWeatherProxy."""
-        resolver = AsyncResolver(nameservers=dns_servers)
+    def __init__(
+        self,
+        proxied_sinks: list[DataSink],
+        dns_servers: list[str],
+        min_forward_intervals: dict[DataSink, float] | None = None,
+        upstream_urls: dict[DataSink, str] | None = None,
+        pool: PoolConfig | None = None,
+    ):
+        """Initialize CloudWeatherProxy.
+
+        `upstream_urls` overrides the base URL of sinks, e.g. to point them
+        to a local stub in benchmarks. `pool` tunes the upstream connections.
+        """
         self.proxied_sinks = proxied_sinks
-        self.session = ClientSession(connector=TCPConnector(resolver=resolver))
+        self.upstream_urls = {**UPSTREAM_URLS, **(upstream_urls or {})}
+        self.pool: PoolConfig = pool or PoolConfig()
+        self.resolver = CachingResolver(dns_servers, max_ttl=self.pool.dns_cache_ttl)
+        self.pool_stats: dict[DataSink, PoolStats] = {
+            sink: PoolStats() for sink in DataSink
+        }
+        self.session = ClientSession(
+            connector=TCPConnector(
+                resolver=self.resolver,
+                # The resolver caches by TTL and refreshes ahead of expiry
+                use_dns_cache=False,
+                limit=self.pool.limit,
+                limit_per_host=self.pool.limit_per_host,
+                keepalive_timeout=self.pool.keepalive_timeout,
+            ),
+            timeout=ClientTimeout(
+                total=self.pool.total_timeout,
+                connect=self.pool.connect_timeout,
+                sock_read=self.pool.read_timeout,
+            ),
+            trace_configs=[self._trace_config()],
+        )
+        self.rate_limiter = ForwardRateLimiter(min_forward_intervals)
+        self._prewarm_task: asyncio.Task[None] | None = None
+        self.warmed: bool = False
+        self.in_flight: int = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def _trace_config(self) -> TraceConfig:
+        """Collect the connection statistics of every sink.
+
+        Requests pass their sink as `trace_request_ctx`; others are ignored.
+        """
+
+        def stats_of(ctx: SimpleNamespace) -> PoolStats | None:
+            sink = ctx.trace_request_ctx
+            return self.pool_stats.get(sink) if sink is not None else None
+
+        async def on_create_start(
+            session: ClientSession,
+            ctx: SimpleNamespace,
+            params: TraceConnectionCreateStartParams,
+        ) -> None:
+            ctx.connect_start = time.perf_counter()
+
+        async def on_create_end(
+            session: ClientSession,
+            ctx: SimpleNamespace,
+            params: TraceConnectionCreateEndParams,
+        ) -> None:
+            if (stats := stats_of(ctx)) is not None:
+                stats.handshakes += 1
+                stats.handshake_time += time.perf_counter() - ctx.connect_start
+
+        async def on_reuse(
+            session: ClientSession,
+            ctx: SimpleNamespace,
+            params: TraceConnectionReuseconnParams,
+        ) -> None:
+            if (stats := stats_of(ctx)) is not None:
+                stats.reused += 1
+
+        trace_config = TraceConfig()
+        trace_config.on_connection_create_start.append(on_create_start)
+        trace_config.on_connection_create_end.append(on_create_end)
+        trace_config.on_connection_reuseconn.append(on_reuse)
+        return trace_config
+
+    def start(self) -> None:
+        """Start keeping the upstream connections warm, if enabled."""
+        if not self.pool.prewarm or self._prewarm_task is not None:
+            return
+        self._prewarm_task = asyncio.create_task(
+            self._prewarm(), name="cloudweather-prewarm"
+        )
+
+    @contextlib.contextmanager
+    def track(self) -> Iterator[None]:
+        """Mark a forward as in flight until its response has been read."""
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if not self.in_flight:
+                self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for the forwards in flight.
+
+        Returns whether all of them completed.
+        """
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def _probe(self, sink: DataSink) -> None:
+        """Send a HEAD request to the upstream of `sink` over a pooled connection."""
+        stats = self.pool_stats[sink]
+        stats.probes += 1
+        try:
+            async with self.session.head(
+                self.upstream_urls[sink], trace_request_ctx=sink
+            ):
+                pass
+        except Exception as err:  # pylint: disable=broad-except
+            stats.probe_failures += 1
+            _LOGGER.debug("CloudWeather prewarm probe of %s failed: %s", sink, err)
+
+    async def warm(self) -> None:
+        """Open `prewarm_connections` connections to every enabled sink."""
+        # Concurrent probes of a sink each need their own connection
+        await asyncio.gather(
+            *(
+                self._probe(sink)
+                for sink in self.proxied_sinks
+                for _ in range(self.pool.prewarm_connections)
+            )
+        )
+        self.warmed = True
+
+    async def _prewarm(self) -> None:
+        """Warm up unless already done, then periodically probe the connections."""
+        if not self.warmed:
+            await self.warm()
+        while True:
+            await asyncio.sleep(self.pool.prewarm_interval)
+            await self.warm()
+
+    def get_pool_stats(self) -> dict[str, dict[str, Any]]:
+        """Get the connection statistics of the enabled sinks."""
+        return {
+            sink.value: self.pool_stats[sink].as_dict() for sink in self.proxied_sinks
+        }
 
     async def close(self):
         """Close the session."""
+        self.rate_limiter.cancel()
+        if self._prewarm_task is not None:
+            self._prewarm_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._prewarm_task
+            self._prewarm_task = None
         if not self.session.closed:
             await self.session.close()
+            await self.resolver.close()
 
-    async def forward_wunderground(self, request: web.Request) -> ClientResponse:
+    async def forward_wunderground(self, request: ForwardRequest) -> ClientResponse:
         """Forward Wunderground data to their API."""
         if not request.query_string:
             _LOGGER.error(
@@ -39,21 +330,24 @@ class CloudWeatherProxy:
             raise web.HTTPBadRequest(
                 text="Missing query string for Wunderground request")
 
-        pairs = parse_qsl(request.query_string, keep_blank_values=True)
-        query_string = urlencode(pairs, doseq=True)
-
         url = (
-            f"https://rtupdate.wunderground.com/weatherstation/updateweatherstation.php?{query_string}"
+            f"{self.upstream_urls[DataSink.WUNDERGROUND]}"
+            f"/weatherstation/updateweatherstation.php?{request.upstream_query}"
         )
         _LOGGER.debug("Forwarding Wunderground data: %s", url)
-        return await self.session.get(url)
+        # Already encoded, yarl must not quote it a second time
+        return await self.session.get(
+            URL(url, encoded=True), trace_request_ctx=DataSink.WUNDERGROUND
+        )
 
-    async def forward_weathercloud(self, request: web.Request) -> ClientResponse:
+    async def forward_weathercloud(self, request: ForwardRequest) -> ClientResponse:
         """Forward WeatherCloud data to their API."""
-        new_path = request.path[request.path.index("/v01/set"):]
+        new_path = request.weathercloud_path
+        if not new_path:
+            raise ValueError(f"Not a WeatherCloud request: {request.path}")
         # If there's no dataset in the path (e.g. just /v01/set) and no
         # query string, nothing useful can be forwarded.
-        path_after = new_path[len("/v01/set"):]
+        path_after = new_path[len(WEATHERCLOUD_PREFIX):]
         if (not path_after or path_after == "/") and not request.query_string:
             _LOGGER.error(
                 "WeatherCloud request missing payload: %s", request.path
@@ -61,15 +355,15 @@ class CloudWeatherProxy:
             raise web.HTTPBadRequest(
                 text="Missing path payload for WeatherCloud request")
 
-        url = f"https://api.weathercloud.net{new_path}"
+        url = f"{self.upstream_urls[DataSink.WEATHERCLOUD]}{new_path}"
         if request.query_string:
-            pairs = parse_qsl(request.query_string, keep_blank_values=True)
-            query_string = urlencode(pairs, doseq=True)
-            url = f"{url}?{query_string}"
+            url = f"{url}?{request.upstream_query}"
         _LOGGER.debug("Forwarding WeatherCloud data: %s", url)
-        return await self.session.get(url)
+        return await self.session.get(
+            URL(url, encoded=True), trace_request_ctx=DataSink.WEATHERCLOUD
+        )
 
-    async def forward(self, sink: DataSink, request: web.Request) -> ClientResponse:
+    async def forward(self, sink: DataSink, request: ForwardRequest) -> ClientResponse:
         """Forward data to the CloudWeather API."""
         if (
             sink == DataSink.WUNDERGROUND
@@ -0,0 +1,294 @@
+"""Write-behind recorder of every sensor reading to a local SQLite database.
+
+Subscribe `SQLiteRecorder.record` to `CloudWeatherListener.new_dataset_cb`
+to keep the full-resolution history outside of Home Assistant. The
+callback only queues the readings of a dataset; a dedicated thread owns
+the write connection and inserts them in a single transaction once
+`batch_size` rows are pending or `flush_interval` seconds passed. The
+database uses WAL journaling, so range queries read concurrently with the
+writer. Readings older than `retention` seconds are pruned periodically.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Future
+from dataclasses import dataclass
+import logging
+import math
+from pathlib import Path
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from .station import SENSOR_FIELDS, WeatherStation
+
+_LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS readings (
+        station TEXT NOT NULL,
+        sensor TEXT NOT NULL,
+        ts REAL NOT NULL,
+        value REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS readings_series ON readings (station, sensor, ts)",
+    "CREATE INDEX IF NOT EXISTS readings_ts ON readings (ts)",
+)
+_INSERT = "INSERT INTO readings (station, sensor, ts, value) VALUES (?, ?, ?, ?)"
+
+# Asks the writer thread to flush and exit
+_STOP = object()
+
+Reading = tuple[str, str, float, float]
+
+
+@dataclass(frozen=True)
+class RecorderConfig:
+    """Configuration of the SQLite recorder."""
+
+    path: str
+    batch_size: int = 500
+    flush_interval: float = 5.0
+    retention: float = 30 * 24 * 3600
+    prune_interval: float = 3600.0
+    # Datasets waiting for the writer, newer ones are dropped beyond this
+    max_pending: int = 10000
+
+
+def readings(station: WeatherStation, timestamp: float) -> list[Reading]:
+    """Return the numeric sensor values of `station` at wall-clock `timestamp`."""
+    rows = []
+    for name in SENSOR_FIELDS:
+        sensor = getattr(station, name)
+        if sensor is None:
+            continue
+        try:
+            value = float(sensor.value)
+        except (TypeError, ValueError):
+            continue
+        if not math.isnan(value):
+            rows.append((station.station_id, name, timestamp, value))
+    return rows
+
+
+class SQLiteRecorder:
+    """Records the sensor values of every dataset on a writer thread.
+
+    The thread is started lazily on the first `record()` so the recorder
+    also works when the listener is driven by Home Assistant views.
+    """
+
+    def __init__(self, config: RecorderConfig) -> None:
+        """Initialize the recorder writing to `config.path`."""
+        self.config = config
+        self.path = Path(config.path)
+        self._queue: queue.Queue[Any] = queue.Queue(config.max_pending)
+        self._thread: threading.Thread | None = None
+
+        # Updated by the writer thread, read for the statistics only
+        self.recorded: int = 0
+        self.dropped: int = 0
+        self.flushes: int = 0
+        self.failures: int = 0
+        self.pruned: int = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the write connection to the database, creating its schema."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # Durable enough in WAL mode, a power loss only loses the last batch
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with connection:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+        return connection
+
+    # Writer thread
+
+    def _run(self) -> None:
+        """Insert queued readings in batches until stopped."""
+        config = self.config
+        try:
+            connection = self._connect()
+        except (OSError, sqlite3.Error) as err:
+            _LOGGER.error("Cannot open the recorder database %s: %s", self.path, err)
+            self._drain_failed()
+            return
+
+        batch: list[Reading] = []
+        deadline = math.inf
+        next_prune = time.monotonic()
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= next_prune:
+                    self._prune(connection)
+                    next_prune = now + config.prune_interval
+                try:
+                    item = self._queue.get(
+                        timeout=max(min(deadline, next_prune) - now, 0)
+                    )
+                except queue.Empty:
+                    item = None
+
+                if isinstance(item, list):
+                    if not batch:
+                        deadline = time.monotonic() + config.flush_interval
+                    batch.extend(item)
+                    if len(batch) < config.batch_size:
+                        continue
+                elif item is None and time.monotonic() < deadline:
+                    continue
+
+                # Full batch, flush interval elapsed, flush request or stop
+                self._insert(connection, batch)
+                batch = []
+                deadline = math.inf
+                if isinstance(item, Future):
+                    item.set_result(None)
+                elif item is _STOP:
+                    return
+        finally:
+            connection.close()
+
+    def _drain_failed(self) -> None:
+        """Discard the queue after the database could not be opened."""
+        while True:
+            item = self._queue.get()
+            if isinstance(item, list):
+                self.dropped += len(item)
+            elif isinstance(item, Future):
+                item.set_result(None)
+            elif item is _STOP:
+                return
+
+    def _insert(self, connection: sqlite3.Connection, batch: list[Reading]) -> None:
+        """Insert `batch` in a single transaction."""
+        if not batch:
+            return
+        try:
+            with connection:
+                connection.executemany(_INSERT, batch)
+        except sqlite3.Error as err:
+            self.failures += 1
+            self.dropped += len(batch)
+            _LOGGER.warning("Failed to record %d readings: %s", len(batch), err)
+            return
+        self.recorded += len(batch)
+        self.flushes += 1
+
+    def _prune(self, connection: sqlite3.Connection) -> None:
+        """Delete the readings past the retention."""
+        try:
+            with connection:
+                cursor = connection.execute(
+                    "DELETE FROM readings WHERE ts < ?",
+                    (time.time() - self.config.retention,),
+                )
+        except sqlite3.Error as err:
+            _LOGGER.warning("Failed to prune the recorder database: %s", err)
+            return
+        if cursor.rowcount:
+            _LOGGER.debug("Pruned %d readings", cursor.rowcount)
+            self.pruned += cursor.rowcount
+
+    def _query(
+        self, station: str, sensor: str, start: float, end: float
+    ) -> list[tuple[float, float]]:
+        """Read a sensor's range on a read-only connection.
+
+        No schema is created here, so queries never take the write lock;
+        before the writer created the database there is nothing to read.
+        """
+        if not self.path.exists():
+            return []
+        connection = sqlite3.connect(
+            f"{self.path.resolve().as_uri()}?mode=ro", uri=True, timeout=30
+        )
+        try:
+            return connection.execute(
+                "SELECT ts, value FROM readings"
+                " WHERE station = ? AND sensor = ? AND ts >= ? AND ts < ?"
+                " ORDER BY ts",
+                (station, sensor, start, end),
+            ).fetchall()
+        except sqlite3.OperationalError as err:
+            if "no such table" in str(err):
+                return []
+            raise
+        finally:
+            connection.close()
+
+    # Async API
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="cloudweather-recorder", daemon=True
+            )
+            self._thread.start()
+
+    async def record(self, station: WeatherStation) -> None:
+        """Queue the readings of `station`, a new dataset callback.
+
+        Never waits for the database; the readings are dropped if the
+        writer fell `max_pending` datasets behind.
+        """
+        self.start()
+        # The update time is monotonic, store the matching wall-clock time
+        now = time.time()
+        if station.update_time is not None:
+            now -= time.monotonic() - station.update_time
+        rows = readings(station, now)
+        if not rows:
+            return
+        try:
+            self._queue.put_nowait(rows)
+        except queue.Full:
+            self.dropped += len(rows)
+
+    async def flush(self) -> None:
+        """Wait until the readings queued so far are written."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        done: Future[None] = Future()
+        # Blocks only if the queue is full, until the writer catches up
+        await asyncio.get_running_loop().run_in_executor(None, self._queue.put, done)
+        await asyncio.wrap_future(done)
+
+    async def query(
+        self, station: str, sensor: str, start: float, end: float | None = None
+    ) -> list[tuple[float, float]]:
+        """Return the (timestamp, value) readings of a sensor in [start, end).
+
+        Timestamps are wall-clock times; readings that were not flushed yet
+        are not included.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._query, station, sensor, start, math.inf if end is None else end
+        )
+
+    async def stop(self) -> None:
+        """Write the pending readings and stop the writer thread."""
+        if self._thread is None:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._queue.put, _STOP)
+        await loop.run_in_executor(None, self._thread.join)
+        self._thread = None
+
+    def stats(self) -> dict[str, int]:
+        """Return the recorder counters."""
+        return {
+            "pending": self._queue.qsize(),
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "pruned": self.pruned,
+        }
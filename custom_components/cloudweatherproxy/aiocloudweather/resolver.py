@@ -0,0 +1,341 @@
+"""Caching DNS resolver for the upstream connections of the proxy.
+
+The local DNS spoofs the cloud hostnames, so the proxy resolves the real
+upstreams through its own nameservers. Answers are cached for their TTL
+and refreshed in the background before they expire, so forwards almost
+never wait for a lookup. Lookups go to the healthiest nameserver first,
+and the next one is queried in parallel if it has not answered within
+`hedge_delay`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import logging
+import socket
+import time
+from typing import Any
+
+import aiodns
+from aiohttp.abc import AbstractResolver, ResolveResult
+
+from .timing import PercentileSketch
+
+_LOGGER = logging.getLogger(__name__)
+
+_NUMERIC_SOCKET_FLAGS = socket.AI_NUMERICHOST | socket.AI_NUMERICSERV
+# A and AAAA record types
+_ADDRESS_TYPES = (1, 28)
+# Answers without addresses, the nameserver itself is healthy
+_NO_ADDRESS_ERRORS = (aiodns.error.ARES_ENODATA, aiodns.error.ARES_ENOTFOUND)
+# Weight of a new sample in the moving average of the latency
+_EWMA_WEIGHT = 0.2
+
+
+@dataclass
+class NameserverStats:
+    """Health and latency statistics of a nameserver."""
+
+    queries: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    mean_latency: float = 0.0
+    latency: PercentileSketch = field(default_factory=lambda: PercentileSketch(256))
+    last_error: str | None = None
+
+    def score(self, timeout: float) -> float:
+        """Return the expected cost of a query, lower is better.
+
+        Nameservers that have not been used yet score 0 so they are tried,
+        every consecutive failure costs a full timeout.
+        """
+        return self.mean_latency + self.consecutive_failures * timeout
+
+    def record(self, seconds: float) -> None:
+        """Record the latency of an answered query."""
+        self.latency.record(seconds)
+        self.consecutive_failures = 0
+        if self.latency.count == 1:
+            self.mean_latency = seconds
+        else:
+            self.mean_latency += _EWMA_WEIGHT * (seconds - self.mean_latency)
+
+    def as_dict(self, timeout: float) -> dict[str, Any]:
+        """Return the statistics including the latency percentiles."""
+        return {
+            "queries": self.queries,
+            "failures": self.failures,
+            "score": self.score(timeout),
+            "last_error": self.last_error,
+            **self.latency.percentiles(),
+        }
+
+
+@dataclass(frozen=True)
+class _CacheEntry:
+    """Addresses of a host as (address, family) and when to refresh them."""
+
+    addresses: tuple[tuple[str, int], ...]
+    refresh_at: float
+    expires: float
+
+
+class CachingResolver(AbstractResolver):
+    """DNS resolver with a TTL cache, refresh-ahead and nameserver failover."""
+
+    def __init__(
+        self,
+        nameservers: list[str],
+        min_ttl: float = 30.0,
+        max_ttl: float = 3600.0,
+        refresh_ahead: float = 0.8,
+        stale_ttl: float = 300.0,
+        timeout: float = 2.0,
+        hedge_delay: float = 0.25,
+    ) -> None:
+        """Initialize the resolver.
+
+        Args:
+            nameservers: Nameservers to query, optionally with a port as
+                `host:port`.
+            min_ttl: Minimum time in seconds an answer is cached.
+            max_ttl: Maximum time in seconds an answer is cached.
+            refresh_ahead: Fraction of the TTL after which a cached answer is
+                refreshed in the background.
+            stale_ttl: How long in seconds an expired answer is still used
+                when no nameserver answers.
+            timeout: Timeout in seconds of a query to a single nameserver.
+            hedge_delay: Seconds to wait for a nameserver before the next one
+                is queried in parallel, 0 queries all of them at once.
+
+        """
+        self.nameservers = list(nameservers)
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.refresh_ahead = refresh_ahead
+        self.stale_ttl = stale_ttl
+        self.timeout = timeout
+        self.hedge_delay = hedge_delay
+        # One resolver per nameserver, the failover is done here
+        self._resolvers = {
+            nameserver: aiodns.DNSResolver(
+                nameservers=[nameserver], timeout=timeout, tries=1
+            )
+            for nameserver in self.nameservers
+        }
+        self.nameserver_stats = {
+            nameserver: NameserverStats() for nameserver in self.nameservers
+        }
+        self._cache: dict[tuple[str, int], _CacheEntry] = {}
+        self._lookups: dict[tuple[str, int], asyncio.Task[_CacheEntry]] = {}
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.refreshes: int = 0
+        self.stale: int = 0
+        self.lookup_latency = PercentileSketch(256)
+
+    async def resolve(
+        self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET
+    ) -> list[ResolveResult]:
+        """Return the addresses of `host`, from the cache if possible."""
+        key = (host, int(family))
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is not None and now < entry.expires:
+            self.hits += 1
+            if now >= entry.refresh_at and key not in self._lookups:
+                self.refreshes += 1
+                self._lookup(key)
+            return self._results(host, port, entry)
+
+        self.misses += 1
+        try:
+            # Shielded, the lookup is shared with other callers
+            entry = await asyncio.shield(self._lookup(key))
+        except OSError:
+            if entry is None or now >= entry.expires + self.stale_ttl:
+                raise
+            self.stale += 1
+            _LOGGER.debug("Using the expired addresses of %s", host)
+        return self._results(host, port, entry)
+
+    @staticmethod
+    def _results(host: str, port: int, entry: _CacheEntry) -> list[ResolveResult]:
+        """Build the results of a cache entry in the format of aiohttp."""
+        return [
+            ResolveResult(
+                hostname=host,
+                host=address,
+                port=port,
+                family=family,
+                proto=0,
+                flags=_NUMERIC_SOCKET_FLAGS,
+            )
+            for address, family in entry.addresses
+        ]
+
+    def _lookup(self, key: tuple[str, int]) -> asyncio.Task[_CacheEntry]:
+        """Return the lookup of `key`, starting it unless one is running."""
+        task = self._lookups.get(key)
+        if task is None:
+            task = self._lookups[key] = asyncio.create_task(self._query(*key))
+            task.add_done_callback(lambda task: self._lookup_done(key, task))
+        return task
+
+    def _lookup_done(self, key: tuple[str, int], task: asyncio.Task[_CacheEntry]) -> None:
+        """Cache the result of a finished lookup."""
+        self._lookups.pop(key, None)
+        if task.cancelled():
+            return
+        if (err := task.exception()) is not None:
+            _LOGGER.debug("DNS lookup of %s failed: %s", key[0], err)
+            return
+        self._cache[key] = task.result()
+
+    async def _query(self, host: str, family: int) -> _CacheEntry:
+        """Query the A and/or AAAA records of `host`."""
+        start = time.perf_counter()
+        if family == socket.AF_INET:
+            qtypes = [("A", socket.AF_INET)]
+        elif family == socket.AF_INET6:
+            qtypes = [("AAAA", socket.AF_INET6)]
+        else:
+            qtypes = [("A", socket.AF_INET), ("AAAA", socket.AF_INET6)]
+        answers = await asyncio.gather(
+            *(self._race(host, qtype) for qtype, _ in qtypes), return_exceptions=True
+        )
+
+        addresses: list[tuple[str, int]] = []
+        ttls: list[int] = []
+        error: BaseException | None = None
+        for (_, qfamily), answer in zip(qtypes, answers, strict=True):
+            if isinstance(answer, BaseException):
+                error = answer
+                continue
+            for address, ttl in answer:
+                addresses.append((address, qfamily))
+                ttls.append(ttl)
+        self.lookup_latency.record(time.perf_counter() - start)
+        if not addresses:
+            if isinstance(error, asyncio.CancelledError):
+                raise error
+            raise OSError(None, f"DNS lookup of {host} failed: {error or 'no addresses'}")
+
+        ttl = min(max(min(ttls), self.min_ttl), self.max_ttl)
+        now = time.monotonic()
+        return _CacheEntry(
+            addresses=tuple(addresses),
+            refresh_at=now + ttl * self.refresh_ahead,
+            expires=now + ttl,
+        )
+
+    async def _race(self, host: str, qtype: str) -> list[tuple[str, int]]:
+        """Query the nameservers, best first, until one of them answers.
+
+        The next nameserver is queried as soon as the previous ones failed or
+        did not answer within `hedge_delay`; the first answer wins.
+        """
+        order = sorted(
+            self.nameservers,
+            key=lambda nameserver: self.nameserver_stats[nameserver].score(self.timeout),
+        )
+        pending: set[asyncio.Task[list[tuple[str, int]]]] = set()
+        errors: list[BaseException] = []
+        try:
+            for nameserver in order:
+                pending.add(asyncio.create_task(self._query_one(nameserver, host, qtype)))
+                answer = await self._first_answer(pending, errors, self.hedge_delay)
+                if answer is not None:
+                    return answer
+            answer = await self._first_answer(pending, errors, None)
+            if answer is not None:
+                return answer
+        finally:
+            for task in pending:
+                task.cancel()
+        raise errors[-1] if errors else OSError(None, "DNS lookup failed")
+
+    @staticmethod
+    async def _first_answer(
+        pending: set[asyncio.Task[list[tuple[str, int]]]],
+        errors: list[BaseException],
+        timeout: float | None,
+    ) -> list[tuple[str, int]] | None:
+        """Wait for the first answer of the `pending` queries.
+
+        With a `timeout`, gives up after it elapsed or a query failed, so the
+        next nameserver can be tried. Returns None if there is no answer.
+        """
+        while pending:
+            done, _ = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                return None
+            for task in done:
+                pending.discard(task)
+                if (err := task.exception()) is None:
+                    return task.result()
+                errors.append(err)
+            if timeout is not None:
+                return None
+        return None
+
+    async def _query_one(
+        self, nameserver: str, host: str, qtype: str
+    ) -> list[tuple[str, int]]:
+        """Query a single nameserver, returning the addresses and their TTL."""
+        stats = self.nameserver_stats[nameserver]
+        resolver = self._resolvers[nameserver]
+        stats.queries += 1
+        start = time.perf_counter()
+        try:
+            if hasattr(resolver, "query_dns"):
+                result = await resolver.query_dns(host, qtype)
+                answer = [
+                    (record.data.addr, record.ttl)
+                    for record in result.answer
+                    if record.type in _ADDRESS_TYPES
+                ]
+            else:
+                # aiodns < 4
+                answer = [
+                    (record.host, record.ttl)
+                    for record in await resolver.query(host, qtype)
+                ]
+        except aiodns.error.DNSError as err:
+            if err.args and err.args[0] in _NO_ADDRESS_ERRORS:
+                stats.record(time.perf_counter() - start)
+                return []
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            stats.last_error = repr(err)
+            raise OSError(None, f"{nameserver}: {err.args[-1]}") from err
+        stats.record(time.perf_counter() - start)
+        return answer
+
+    def stats(self) -> dict[str, Any]:
+        """Return the cache counters and the latency statistics."""
+        return {
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "stale": self.stale,
+            "lookup": self.lookup_latency.percentiles(),
+            "nameservers": {
+                nameserver: stats.as_dict(self.timeout)
+                for nameserver, stats in self.nameserver_stats.items()
+            },
+        }
+
+    async def close(self) -> None:
+        """Cancel the running lookups and release the resolvers."""
+        lookups = list(self._lookups.values())
+        for task in lookups:
+            task.cancel()
+        await asyncio.gather(*lookups, return_exceptions=True)
+        for resolver in self._resolvers.values():
+            resolver.cancel()
@@ -2,25 +2,78 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
-from typing import Any, get_type_hints
-from collections.abc import Callable, Coroutine
-from copy import deepcopy
-from dataclasses import fields
-
-from aiohttp import web, ClientResponse
-
-from .proxy import CloudWeatherProxy, DataSink
-from .utils import cast_value
+from typing import TYPE_CHECKING, Any
+from collections.abc import Callable, Coroutine, Mapping
+from dataclasses import dataclass, replace
+from functools import partial
+
+from aiohttp import ClientError, web
+
+from .derived import DerivedMetrics
+from .metrics import CONTENT_TYPE, MetricsRegistry
+from .sink import FORWARD_REJECTED, DataSink, ForwardRequest
+from .timing import (
+    STAGE_CALLBACKS,
+    STAGE_CONVERT,
+    STAGE_FORWARD,
+    STAGE_PARSE,
+    STAGE_UPSTREAM_READ,
+    StageTimings,
+)
 from .station import (
+    ECOWITT_PLAN,
+    WEATHERCLOUD_PLAN,
+    WUNDERGROUND_PLAN,
+    EcowittRawSensor,
     WundergroundRawSensor,
     WeathercloudRawSensor,
     WeatherStation,
 )
+from .utils import ChunkedStream, iter_form_pairs
+
+if TYPE_CHECKING:
+    from aiohttp import ClientResponse
+
+    from .forwarder import ForwardQueue
+    from .proxy import CloudWeatherProxy, PoolConfig
+    from .snapshot import SnapshotConfig, StationSnapshot
+    from .spool import ForwardSpool, SpoolConfig
+    from .timeseries import StationHistory
+
+# The forwarding, spooling, snapshot and history modules are imported on first
+# use so a listener without these features does not load them.
+# pylint: disable=import-outside-toplevel
 
 _LOGGER = logging.getLogger(__name__)
 _CLOUDWEATHER_LISTEN_PORT = 49199
+# Ecowitt custom server uploads, Ambient Weather sends the fields as a GET
+ECOWITT_PATH = "/data/report"
+
+
+@dataclass
+class CallbackStats:
+    """Latency and failure statistics of a new dataset callback."""
+
+    calls: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    last_error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics including the mean latency."""
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "mean_time": self.total_time / self.calls if self.calls else 0.0,
+            "max_time": self.max_time,
+            "last_error": self.last_error,
+        }
 
 
 class CloudWeatherListener:
@@ -31,18 +84,62 @@ class CloudWeatherListener:
         port: int = _CLOUDWEATHER_LISTEN_PORT,
         proxy_sinks: list[DataSink] | None = None,
         dns_servers: list[str] | None = None,
+        forward_queue_size: int = 0,
+        forward_workers: int = 2,
+        spool: SpoolConfig | None = None,
+        forward_intervals: dict[DataSink, float] | None = None,
+        callback_timeout: float = 10.0,
+        history_capacity: int = 0,
+        derive_metrics: bool = True,
+        pool: PoolConfig | None = None,
+        reuse_port: bool = False,
+        snapshot: SnapshotConfig | None = None,
     ):
-        """Initialize CloudWeather Server."""
+        """Initialize CloudWeather Server.
+
+        With a `forward_queue_size` above zero, proxied requests are queued and
+        forwarded by `forward_workers` background tasks instead of delaying the
+        response to the station. With a `spool` configuration, forwards that
+        fail are stored on disk and replayed once the sink recovers, also
+        after a restart.
+        `forward_intervals` limits how often each station is forwarded to a
+        sink; only the newest sample inside the interval is sent upstream.
+        New dataset callbacks run concurrently and are cancelled after
+        `callback_timeout` seconds. With a `history_capacity` above zero the
+        last `history_capacity` values of every sensor are kept in memory.
+        With `derive_metrics` the rain rate, wind speed average and gust
+        maximum are derived for stations that do not report them.
+        `pool` tunes the upstream connection pool of the proxy. With
+        `reuse_port` several processes can listen on the same port. With a
+        `snapshot` configuration the latest datasets are written to disk
+        periodically and restored by `restore_snapshot`.
+        """
         # API Constants
         self.port: int = port
+        self.reuse_port: bool = reuse_port
 
         # Proxy functionality
         self.proxy: None | CloudWeatherProxy = None
         self.dns_servers: list[str] = dns_servers or ["9.9.9.9"]
         self.proxy_sinks: list[DataSink] = proxy_sinks or []
         self.proxy_enabled: bool = bool(self.proxy_sinks)
+        self.forward_intervals: dict[DataSink, float] = forward_intervals or {}
+        self.pool_config: None | PoolConfig = pool
         if self.proxy_enabled:
-            self.proxy = CloudWeatherProxy(self.proxy_sinks, self.dns_servers)
+            self.proxy = self._create_proxy()
+        self.forward_queue: None | ForwardQueue = None
+        if forward_queue_size > 0:
+            from .forwarder import ForwardQueue
+
+            self.forward_queue = ForwardQueue(
+                self._forward_or_spool,
+                maxsize=forward_queue_size,
+                workers=forward_workers,
+            )
+        self.spool_config: None | SpoolConfig = spool
+        self.spools: dict[DataSink, ForwardSpool] = {}
+        self._spools_opened: bool = False
+        self._background_tasks: set[asyncio.Task[Any]] = set()
 
         # webserver
         self.server: None | web.Server = None
@@ -52,29 +149,157 @@ class CloudWeatherListener:
         # internal data
         self.last_values: dict[str, WeatherStation] = {}
         self.last_updates: dict[str, float] = {}
+        self.history_capacity: int = history_capacity
+        self.history: dict[str, StationHistory] = {}
+        self.derive_metrics: bool = derive_metrics
+        self.derived: dict[str, DerivedMetrics] = {}
         self.new_dataset_cb: list[
             Callable[[WeatherStation], Coroutine[Any, Any, Any]]
         ] = []
+        self.callback_timeout: float = callback_timeout
+        self.callback_stats: dict[str, CallbackStats] = {}
+        self.snapshot_config: None | SnapshotConfig = snapshot
+        self.snapshot: None | StationSnapshot = None
+        # Restored stations whose dataset is older than the snapshot max age
+        self.stale_stations: set[str] = set()
 
         # storage
         self.stations: list[str] = []
 
+        # instrumentation, stage percentiles are part of the diagnostics
+        self.timings = StageTimings()
+        # and the metrics are served on /metrics by the standalone server
+        self.metrics = MetricsRegistry()
+        self._requests_metric = self.metrics.counter(
+            "cloudweather_requests",
+            "Station updates received",
+            ("vendor", "station"),
+        )
+        self._parse_metric = self.metrics.histogram(
+            "cloudweather_parse_seconds",
+            "Time spent parsing station updates",
+            ("vendor",),
+        )
+        self._callback_metric = self.metrics.histogram(
+            "cloudweather_callback_seconds",
+            "Time spent in new dataset callbacks",
+        )
+        self._forward_metric = self.metrics.histogram(
+            "cloudweather_forward_seconds",
+            "Time spent forwarding station updates upstream",
+            ("sink",),
+        )
+        self._upstream_metric = self.metrics.counter(
+            "cloudweather_upstream_responses",
+            "Upstream responses by HTTP status, error if none was received and"
+            " rejected if the request cannot be sent",
+            ("sink", "status"),
+        )
+        self.metrics.gauge(
+            "cloudweather_forward_queue_depth",
+            "Forwards waiting in the queue",
+            lambda: {(): self.forward_queue.depth} if self.forward_queue else {},
+        )
+        self.metrics.gauge(
+            "cloudweather_forward_coalesced_pending",
+            "Forwards held back by the rate limiter",
+            lambda: (
+                {(): self.proxy.rate_limiter.stats()["pending"]} if self.proxy else {}
+            ),
+        )
+        self.metrics.gauge(
+            "cloudweather_upstream_handshakes",
+            "Upstream connections opened by the current proxy",
+            lambda: self._pool_metric("handshakes"),
+            ("sink",),
+        )
+        self.metrics.gauge(
+            "cloudweather_upstream_reused_connections",
+            "Upstream requests sent over a pooled connection by the current proxy",
+            lambda: self._pool_metric("reused"),
+            ("sink",),
+        )
+
     async def update_config(
         self,
         proxy_sinks: list[DataSink] | None = None,
         dns_servers: list[str] | None = None,
+        forward_intervals: dict[DataSink, float] | None = None,
+        drain_timeout: float = 10.0,
     ) -> None:
-        """Update the proxy configuration."""
-        self.proxy_sinks = proxy_sinks or []
-        self.dns_servers = dns_servers or self.dns_servers or ["9.9.9.9"]
+        """Update the proxy configuration without interrupting forwards.
+
+        The new proxy is created and, with a pre-warmed pool, connected
+        before new forwards switch over to it. Coalesced samples carry over.
+        The old proxy is closed in the background once the forwards it
+        has in flight completed, or after `drain_timeout` seconds.
+        """
+        if forward_intervals is not None:
+            self.forward_intervals = forward_intervals
+        proxy_sinks = proxy_sinks or []
+        dns_servers = dns_servers or self.dns_servers or ["9.9.9.9"]
+        old_proxy = self.proxy
+        if (
+            old_proxy is not None
+            and proxy_sinks == self.proxy_sinks
+            and dns_servers == self.dns_servers
+        ):
+            old_proxy.rate_limiter.min_intervals = self.forward_intervals
+            return
+
+        self.proxy_sinks = proxy_sinks
+        self.dns_servers = dns_servers
         self.proxy_enabled = bool(self.proxy_sinks)
 
-        if self.proxy:
-            await self.proxy.close()
-            self.proxy = None
-
+        new_proxy: None | CloudWeatherProxy = None
         if self.proxy_enabled:
-            self.proxy = CloudWeatherProxy(self.proxy_sinks, self.dns_servers)
+            new_proxy = self._create_proxy()
+            if new_proxy.pool.prewarm:
+                await new_proxy.warm()
+            if old_proxy is not None:
+                from .proxy import ForwardRateLimiter
+
+                new_proxy.rate_limiter = old_proxy.rate_limiter
+                new_proxy.rate_limiter.min_intervals = self.forward_intervals
+                old_proxy.rate_limiter = ForwardRateLimiter()
+            new_proxy.start()
+
+        self.proxy = new_proxy
+        if self._spools_opened:
+            # Newly proxied sinks replay what they spooled before
+            self._open_spools()
+        if old_proxy is not None:
+            task = asyncio.create_task(self._retire_proxy(old_proxy, drain_timeout))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
+    async def _retire_proxy(self, proxy: CloudWeatherProxy, timeout: float) -> None:
+        """Close a replaced proxy once its forwards in flight completed."""
+        if not await proxy.drain(timeout):
+            _LOGGER.warning(
+                "Closing the previous proxy with %d forwards still in flight",
+                proxy.in_flight,
+            )
+        await proxy.close()
+
+    def _create_proxy(self) -> CloudWeatherProxy:
+        """Create the proxy of the enabled sinks."""
+        from .proxy import CloudWeatherProxy
+
+        return CloudWeatherProxy(
+            self.proxy_sinks,
+            self.dns_servers,
+            self.forward_intervals,
+            pool=self.pool_config,
+        )
+
+    def _pool_metric(self, key: str) -> dict[tuple[Any, ...], float]:
+        """Read a connection statistic of every enabled sink for the metrics."""
+        if self.proxy is None:
+            return {}
+        return {
+            (sink,): stats[key] for sink, stats in self.proxy.get_pool_stats().items()
+        }
 
     def get_active_proxies(self) -> list[DataSink]:
         """Get the active proxies."""
@@ -84,159 +309,417 @@ class CloudWeatherListener:
         """Get the DNS servers."""
         return self.dns_servers
 
+    def forward_stats(self) -> dict[str, Any]:
+        """Get the forwarding queue, rate limiter and spool counters."""
+        return {
+            "queue": self.forward_queue.stats() if self.forward_queue else None,
+            "rate_limiter": self.proxy.rate_limiter.stats() if self.proxy else None,
+            "pool": self.proxy.get_pool_stats() if self.proxy else None,
+            "dns": self.proxy.resolver.stats() if self.proxy else None,
+            "spool": {
+                sink.value: spool.stats() for sink, spool in self.spools.items()
+            },
+        }
+
+    def snapshot_stats(self) -> dict[str, Any]:
+        """Get the snapshot counters and the stale stations."""
+        if self.snapshot is None:
+            return {}
+        return {
+            **self.snapshot.stats(),
+            "stale_stations": sorted(self.stale_stations),
+        }
+
+    def get_stage_timings(self) -> dict[str, dict[str, Any]]:
+        """Get the p50/p95/p99 durations in seconds of each handling stage."""
+        return self.timings.summary()
+
+    def get_callback_stats(self) -> dict[str, dict[str, Any]]:
+        """Get the latency and failure statistics per new dataset callback."""
+        return {name: stats.as_dict() for name, stats in self.callback_stats.items()}
+
+    async def _run_callback(
+        self,
+        callback: Callable[[WeatherStation], Coroutine[Any, Any, Any]],
+        dataset: WeatherStation,
+    ) -> None:
+        """Run a single callback with a timeout, isolating its failures."""
+        name = getattr(callback, "__qualname__", repr(callback))
+        stats = self.callback_stats.get(name)
+        if stats is None:
+            stats = self.callback_stats[name] = CallbackStats()
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(callback(dataset), self.callback_timeout)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            stats.last_error = f"Timed out after {self.callback_timeout}s"
+            _LOGGER.warning(
+                "CloudWeather new dataset callback %s timed out", name)
+        except Exception as err:  # pylint: disable=broad-except
+            stats.failures += 1
+            stats.last_error = repr(err)
+            _LOGGER.warning(
+                "CloudWeather new dataset callback %s error: %s", name, err)
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.calls += 1
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+
     async def _new_dataset_cb(self, dataset: WeatherStation) -> None:
-        """Call new dataset callbacks."""
-        for callback in self.new_dataset_cb:
-            await callback(dataset)
+        """Call new dataset callbacks concurrently."""
+        callbacks = list(self.new_dataset_cb)
+        if len(callbacks) == 1:
+            await self._run_callback(callbacks[0], dataset)
+        elif callbacks:
+            await asyncio.gather(
+                *(self._run_callback(callback, dataset) for callback in callbacks)
+            )
+
+    @staticmethod
+    def parse_wunderground(data: Mapping[str, str | float]) -> WundergroundRawSensor:
+        """Parse Wunderground query arguments."""
+        return WundergroundRawSensor(**WUNDERGROUND_PLAN.cast_args(data))
+
+    @staticmethod
+    def parse_weathercloud(segments: list[str]) -> WeathercloudRawSensor:
+        """Parse WeatherCloud path segments."""
+        data = dict(zip(segments[::2], segments[1::2]))
+        return WeathercloudRawSensor(**WEATHERCLOUD_PLAN.cast_args(data))
+
+    @staticmethod
+    def parse_ecowitt(data: Mapping[str, str]) -> EcowittRawSensor:
+        """Parse Ecowitt protocol query arguments."""
+        return EcowittRawSensor(**ECOWITT_PLAN.cast_args(data))
+
+    @staticmethod
+    async def parse_ecowitt_form(stream: ChunkedStream) -> EcowittRawSensor:
+        """Parse an Ecowitt form body while it is received."""
+        data: dict[str, Any] = {}
+        async for arg, value in iter_form_pairs(stream):
+            ECOWITT_PLAN.cast_into(data, arg, value)
+        return EcowittRawSensor(**data)
 
     async def process_wunderground(
         self, data: dict[str, str | float]
     ) -> WeatherStation:
         """Process Wunderground data."""
 
-        dfields = {
-            f.metadata["arg"]: f
-            for f in fields(WundergroundRawSensor)
-            if "arg" in f.metadata
-        }
-        type_hints = get_type_hints(WundergroundRawSensor)
-        instance_data = {}
-
-        for arg, field in dfields.items():
-            if arg in data:
-                value = data[arg]
-                try:
-                    instance_data[field.name] = cast_value(
-                        type_hints[field.name], value)
-                except (ValueError, TypeError) as err:
-                    _LOGGER.warning(
-                        "Failed to cast field %s value '%s': %s", field.name, value, err
-                    )
-
-        return WeatherStation.from_wunderground(WundergroundRawSensor(**instance_data))
+        return WeatherStation.from_wunderground(self.parse_wunderground(data))
 
     async def process_weathercloud(self, segments: list[str]) -> WeatherStation:
         """Process WeatherCloud data."""
 
-        data = dict(zip(segments[::2], segments[1::2]))
-        dfields = {
-            f.metadata["arg"]: f
-            for f in fields(WeathercloudRawSensor)
-            if "arg" in f.metadata
-        }
-        type_hints = get_type_hints(WeathercloudRawSensor)
-        instance_data = {}
-
-        for arg, field in dfields.items():
-            if arg in data:
-                value = data[arg]
-                try:
-                    instance_data[field.name] = cast_value(
-                        type_hints[field.name], value)
-                except (ValueError, TypeError) as err:
-
-                    _LOGGER.warning(
-                        "Failed to cast field %s value '%s': %s", field.name, value, err
-                    )
-
-        return WeatherStation.from_weathercloud(WeathercloudRawSensor(**instance_data))
+        return WeatherStation.from_weathercloud(self.parse_weathercloud(segments))
+
+    async def _forward(self, sink: DataSink, request: ForwardRequest) -> int | None:
+        """Forward a station request upstream.
+
+        Returns the upstream HTTP status, None if it could not be sent this
+        time, or `FORWARD_REJECTED` if it can never be sent.
+        """
+        proxy = self.proxy
+        if proxy is None:
+            return FORWARD_REJECTED
+        if proxy.session.closed:
+            _LOGGER.warning(
+                "CloudWeather proxy session closed for %s; skipping",
+                sink,
+            )
+            return FORWARD_REJECTED
+
+        start = time.perf_counter()
+        try:
+            with proxy.track():
+                response: ClientResponse = await proxy.forward(sink, request)
+                sent = time.perf_counter()
+                self.timings.record(STAGE_FORWARD, sent - start)
+                body = await response.text()
+                self.timings.record(STAGE_UPSTREAM_READ, time.perf_counter() - sent)
+        except (ClientError, OSError, asyncio.TimeoutError) as err:
+            _LOGGER.warning(
+                "CloudWeather proxy error for %s: %s",
+                sink,
+                err,
+            )
+            self._upstream_metric.inc((sink.value, "error"))
+            return None
+        except Exception as err:  # pylint: disable=broad-except
+            # Disabled sink or malformed request, retrying cannot help
+            _LOGGER.warning(
+                "CloudWeather proxy rejected the request for %s: %s",
+                sink,
+                err,
+            )
+            self._upstream_metric.inc((sink.value, "rejected"))
+            return FORWARD_REJECTED
+        finally:
+            self._forward_metric.observe(time.perf_counter() - start, (sink.value,))
+
+        self._upstream_metric.inc((sink.value, response.status))
+
+        _LOGGER.debug(
+            "CloudWeather proxy response[%d]: %s", response.status, body
+        )
+        if response.status >= 400:
+            _LOGGER.warning(
+                "CloudWeather proxy error for %s: Upstream returned %d",
+                sink,
+                response.status,
+            )
+        return response.status
+
+    def _get_spool(self, sink: DataSink) -> ForwardSpool | None:
+        """Return the spool of `sink` with its replay running, if spooling is enabled."""
+        if self.spool_config is None:
+            return None
+        spool = self.spools.get(sink)
+        if spool is None:
+            from .spool import ForwardSpool
+
+            spool = self.spools[sink] = ForwardSpool(self.spool_config, sink.value)
+        spool.start(partial(self._forward, sink))
+        return spool
+
+    def _open_spools(self) -> None:
+        """Start replaying the spools of the proxied sinks.
+
+        Requests spooled before a restart drain right away instead of
+        waiting for a live forward to fail first.
+        """
+        self._spools_opened = True
+        for sink in self.proxy_sinks:
+            self._get_spool(sink)
+
+    async def _forward_or_spool(self, sink: DataSink, request: ForwardRequest) -> bool:
+        """Forward a station request, spooling it if the upstream is unavailable."""
+        status = await self._forward(sink, request)
+        if status == FORWARD_REJECTED:
+            return False
+        spool = self._get_spool(sink)
+        if status is not None and status < 400:
+            if spool is not None:
+                spool.notify_healthy()
+            return True
+
+        if spool is None:
+            return False
+
+        from .spool import is_retryable
+
+        if is_retryable(status):
+            await spool.append(request)
+        return False
+
+    def _release_forward(self, sink: DataSink, request: ForwardRequest) -> None:
+        """Forward a sample released by the rate limiter in the background."""
+        if self.forward_queue is not None:
+            self.forward_queue.put(sink, request)
+            return
+        task = asyncio.create_task(self._forward_or_spool(sink, request))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
 
     async def handler(self, request: web.BaseRequest) -> web.Response:
         """AIOHTTP handler for the API."""
 
-        if not isinstance(request, web.Request):
+        if request.path is None:
             raise web.HTTPBadRequest()
-
-        if request.method != "GET" or request.path is None:
+        if not self._spools_opened:
+            self._open_spools()
+        is_ecowitt = request.path.rstrip("/").endswith(ECOWITT_PATH)
+        if request.method != "GET" and not (is_ecowitt and request.method == "POST"):
             raise web.HTTPBadRequest()
 
         station_id: str | None = None
         dataset: WeatherStation | None = None
+        # Ecowitt has no upstream to forward to
         sink: DataSink | None = None
+        start = time.perf_counter()
+        # Parsed once, shared by the station parsers and the forwarder
+        station_request = ForwardRequest.from_request(request)
         if request.path.endswith("/weatherstation/updateweatherstation.php"):
-            dataset = await self.process_wunderground(dict(request.query))
+            wunderground = self.parse_wunderground(station_request.query)
+            parsed = time.perf_counter()
+            dataset = WeatherStation.from_wunderground(wunderground)
             station_id = dataset.station_id
             sink = DataSink.WUNDERGROUND
-        elif "/v01/set" in request.path:
-            dataset_path = request.path.split("/v01/set/", 1)[1]
-            path_segments = dataset_path.split("/")
-            dataset = await self.process_weathercloud(path_segments)
+            vendor = sink.value
+        elif station_request.weathercloud_path:
+            weathercloud = self.parse_weathercloud(station_request.segments)
+            parsed = time.perf_counter()
+            dataset = WeatherStation.from_weathercloud(weathercloud)
             station_id = dataset.station_id
             sink = DataSink.WEATHERCLOUD
+            vendor = sink.value
+        elif is_ecowitt:
+            try:
+                if request.method == "POST":
+                    ecowitt = await self.parse_ecowitt_form(request.content)
+                else:
+                    ecowitt = self.parse_ecowitt(station_request.query)
+            except (TypeError, ValueError) as err:
+                _LOGGER.debug("Invalid Ecowitt upload: %s", err)
+                raise web.HTTPBadRequest() from err
+            parsed = time.perf_counter()
+            dataset = WeatherStation.from_ecowitt(ecowitt)
+            station_id = dataset.station_id
+            vendor = "ecowitt"
         else:
             return web.Response(status=404, text="Not Found")
 
         assert dataset is not None
         assert station_id is not None
+        converted = time.perf_counter()
+        self.timings.record(STAGE_PARSE, parsed - start)
+        self.timings.record(STAGE_CONVERT, converted - parsed)
+        self._parse_metric.observe(converted - start, (vendor,))
+        self._requests_metric.inc((vendor, station_id))
 
         if station_id not in self.stations:
             _LOGGER.debug("Found new station: %s", station_id)
             self.stations.append(station_id)
 
         self.last_updates[station_id] = time.monotonic()
-        dataset.update_time = self.last_updates[station_id]
 
         # The User-Agent is the only recognizable information we have aside from the IP
         # In case of the station at hand it just shows lwIP/2.1.2 of their IP stack
         user_agent = request.headers.get("User-Agent")
-        if user_agent:
-            dataset.station_sw_version = user_agent
 
         # Extract client IP from request just in case
         if "X-Real-IP" in request.headers:
-            dataset.station_client_ip = request.headers["X-Real-IP"]
+            client_ip = request.headers["X-Real-IP"]
         else:
-            dataset.station_client_ip = request.remote or ""
-
-        try:
-            await self._new_dataset_cb(dataset)
-        except Exception as err:  # pylint: disable=broad-except
-            _LOGGER.warning("CloudWeather new dataset callback error: %s", err)
+            client_ip = request.remote or ""
+
+        derived: dict[str, Any] = {}
+        if self.derive_metrics:
+            metrics = self.derived.get(station_id)
+            if metrics is None:
+                metrics = self.derived[station_id] = DerivedMetrics()
+            derived = metrics.update(dataset, self.last_updates[station_id])
+
+        dataset = replace(
+            dataset,
+            update_time=self.last_updates[station_id],
+            station_sw_version=user_agent or dataset.station_sw_version,
+            station_client_ip=client_ip,
+            **derived,
+        )
+
+        start = time.perf_counter()
+        await self._new_dataset_cb(dataset)
+        elapsed = time.perf_counter() - start
+        self.timings.record(STAGE_CALLBACKS, elapsed)
+        self._callback_metric.observe(elapsed)
 
         if self.proxy and sink is not None:
             if sink not in self.proxy.proxied_sinks:
                 _LOGGER.debug(
                     "Skipping proxy for sink %s because it is not enabled", sink
                 )
-            elif self.proxy.session.closed:
-                _LOGGER.warning(
-                    "CloudWeather proxy session closed for %s; skipping",
+            elif not self.proxy.rate_limiter.admit(
+                sink, station_id, station_request, self._release_forward
+            ):
+                _LOGGER.debug(
+                    "Coalescing %s forward of %s until its interval elapses",
                     sink,
+                    station_id,
                 )
+            elif self.forward_queue is not None:
+                self.forward_queue.put(sink, station_request)
             else:
-                try:
-                    response: ClientResponse = await self.proxy.forward(sink, request)
-                    body = await response.text()
-                    _LOGGER.debug(
-                        "CloudWeather proxy response[%d]: %s", response.status, body
-                    )
-
-                    if response.status >= 400:
-                        raise RuntimeError(
-                            f"Upstream returned {response.status} for {sink}"
-                        )
-                except Exception as err:  # pylint: disable=broad-except
-                    _LOGGER.warning(
-                        "CloudWeather proxy error for %s: %s",
-                        sink,
-                        err,
-                    )
-
-        self.last_values[station_id] = deepcopy(dataset)
+                await self._forward_or_spool(sink, station_request)
+
+        # Datasets are immutable, the latest one can be kept by reference
+        self.last_values[station_id] = dataset
+        self.stale_stations.discard(station_id)
+        if self.snapshot is not None:
+            self.snapshot.mark_dirty()
+        if self.history_capacity:
+            history = self.history.get(station_id)
+            if history is None:
+                from .timeseries import StationHistory
+
+                history = self.history[station_id] = StationHistory(
+                    self.history_capacity
+                )
+            history.record(dataset)
         return web.Response(text="OK")
 
+    async def metrics_handler(self, request: web.BaseRequest) -> web.Response:
+        """Serve the metrics in the OpenMetrics text format."""
+        return web.Response(
+            text=self.metrics.render(), headers={"Content-Type": CONTENT_TYPE}
+        )
+
+    async def _dispatch(self, request: web.BaseRequest) -> web.Response:
+        """Route requests of the standalone server."""
+        if request.method == "GET" and request.path == "/metrics":
+            return await self.metrics_handler(request)
+        return await self.handler(request)
+
+    async def restore_snapshot(self) -> None:
+        """Restore the datasets of the snapshot and start writing it.
+
+        Stations that reported since are kept. Does nothing without a
+        snapshot configuration or if the snapshot was already restored.
+        """
+        if self.snapshot_config is None or self.snapshot is not None:
+            return
+        from .snapshot import StationSnapshot
+
+        self.snapshot = StationSnapshot(self.snapshot_config, lambda: self.last_values)
+        now = time.monotonic()
+        for restored in await self.snapshot.load():
+            station_id = restored.dataset.station_id
+            if station_id in self.last_values:
+                continue
+            # Map the age onto the monotonic clock, like a live update
+            update_time = now - restored.age
+            self.last_values[station_id] = replace(
+                restored.dataset, update_time=update_time
+            )
+            self.last_updates[station_id] = update_time
+            if station_id not in self.stations:
+                self.stations.append(station_id)
+            if restored.age > self.snapshot_config.max_age:
+                self.stale_stations.add(station_id)
+        _LOGGER.debug(
+            "Restored %d stations from the snapshot, %d of them stale",
+            self.snapshot.restored,
+            len(self.stale_stations),
+        )
+        self.snapshot.start()
+
     async def start(self) -> None:
         """Listen and process."""
+        await self.restore_snapshot()
 
-        self.server = web.Server(self.handler)
+        self.server = web.Server(self._dispatch)
         self.runner = web.ServerRunner(self.server)
         await self.runner.setup()
-        self.site = web.TCPSite(self.runner, port=self.port)
+        self.site = web.TCPSite(self.runner, port=self.port, reuse_port=self.reuse_port)
         await self.site.start()
+        if self.proxy:
+            self.proxy.start()
+        if self.forward_queue:
+            self.forward_queue.start()
+        self._open_spools()
 
     async def stop(self) -> None:
         """Stop listening."""
         if self.site:
             await self.site.stop()
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        if self.forward_queue:
+            await self.forward_queue.stop()
+        for spool in self.spools.values():
+            await spool.stop()
+        if self.snapshot:
+            await self.snapshot.stop()
         if self.proxy:
             await self.proxy.close()
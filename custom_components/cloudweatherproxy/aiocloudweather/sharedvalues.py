@@ -0,0 +1,210 @@
+"""Latest station values in shared memory, for multi-process listeners.
+
+The table is a `multiprocessing.shared_memory` region of fixed-size slots,
+one per station, found by hashing the station ID with linear probing.
+A slot holds the station ID, the update time and one float per
+`SENSOR_FIELDS` entry, NaN if the station did not report it.
+
+Writers serialize on a lock shared by the worker processes, because the
+same station may reach any worker. Readers take no lock: every slot
+carries a sequence number (a seqlock) that is odd while the slot is
+written, and a read is retried until it saw the same even number before
+and after copying the slot.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+import math
+from multiprocessing import resource_tracker, shared_memory
+import struct
+import sys
+import time
+from typing import Any
+import zlib
+
+from .station import SENSOR_FIELDS, WeatherStation
+
+MAGIC = b"CWV1"
+STATION_ID_BYTES = 64
+
+_HEADER = struct.Struct("<4sII")
+_SEQUENCE = struct.Struct("<Q")
+# station ID, update time
+_SLOT_KEY = struct.Struct(f"<{STATION_ID_BYTES}sd")
+_SLOT_HEADER_SIZE = _SEQUENCE.size + _SLOT_KEY.size
+_VALUES = struct.Struct(f"<{len(SENSOR_FIELDS)}d")
+SLOT_SIZE = _SLOT_HEADER_SIZE + _VALUES.size
+
+_NAN = math.nan
+_READ_RETRIES = 1000
+
+
+class SharedValuesTable:
+    """Fixed-slot table of the latest values of every station.
+
+    Use `create` in the parent process before forking the workers, and
+    `attach` in unrelated reader processes.
+    """
+
+    def __init__(
+        self, shm: shared_memory.SharedMemory, lock: Any = None, owner: bool = False
+    ) -> None:
+        """Wrap an initialized region; `lock` is required for writing."""
+        self.shm = shm
+        self.lock = lock
+        self.owner = owner
+        magic, slots, slot_size = _HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC or slot_size != SLOT_SIZE:
+            raise ValueError(f"{shm.name} is not a compatible values table")
+        self.slots: int = slots
+
+    @classmethod
+    def create(
+        cls, slots: int, lock: Any, name: str | None = None
+    ) -> SharedValuesTable:
+        """Create a table of `slots` stations.
+
+        Args:
+            slots: Maximum number of stations, keep some headroom as the
+                table is probed linearly.
+            lock: A `multiprocessing.Lock` shared by all writers.
+            name: Name of the shared memory, random if None.
+
+        """
+        shm = shared_memory.SharedMemory(
+            name=name, create=True, size=_HEADER.size + slots * SLOT_SIZE
+        )
+        _HEADER.pack_into(shm.buf, 0, MAGIC, slots, SLOT_SIZE)
+        return cls(shm, lock, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, lock: Any = None) -> SharedValuesTable:
+        """Attach to an existing table, read-only unless a `lock` is given."""
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            # Attaching registers the region, which would unlink it on exit
+            resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]  # noqa: SLF001
+        return cls(shm, lock)
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory region."""
+        return self.shm.name
+
+    def _offset(self, slot: int) -> int:
+        return _HEADER.size + slot * SLOT_SIZE
+
+    def _probe(self, key: bytes) -> Iterator[int]:
+        """Yield the slots `key` may be stored in, in probing order."""
+        start = zlib.crc32(key) % self.slots
+        for step in range(self.slots):
+            yield (start + step) % self.slots
+
+    def _find(self, key: bytes, claim: bool) -> int | None:
+        """Return the slot of `key`, claiming a free one if `claim` is set."""
+        buf = self.shm.buf
+        for slot in self._probe(key):
+            offset = self._offset(slot) + _SEQUENCE.size
+            stored = bytes(buf[offset:offset + STATION_ID_BYTES]).rstrip(b"\0")
+            if stored == key:
+                return slot
+            if not stored:
+                return slot if claim else None
+        return None
+
+    def write(self, station: WeatherStation) -> bool:
+        """Publish the values of `station`.
+
+        Returns False if the station ID is too long or the table is full.
+        """
+        if self.lock is None:
+            raise RuntimeError("The values table was attached read-only")
+        key = station.station_id.encode()
+        if not key or len(key) > STATION_ID_BYTES:
+            return False
+        values = []
+        for name in SENSOR_FIELDS:
+            sensor = getattr(station, name)
+            try:
+                values.append(float(sensor.value) if sensor is not None else _NAN)
+            except (TypeError, ValueError):
+                values.append(_NAN)
+        update_time = station.update_time or time.monotonic()
+
+        buf = self.shm.buf
+        with self.lock:
+            slot = self._find(key, claim=True)
+            if slot is None:
+                return False
+            offset = self._offset(slot)
+            sequence = _SEQUENCE.unpack_from(buf, offset)[0]
+            # Odd while the slot is written
+            _SEQUENCE.pack_into(buf, offset, sequence + 1)
+            _SLOT_KEY.pack_into(buf, offset + _SEQUENCE.size, key, update_time)
+            _VALUES.pack_into(buf, offset + _SLOT_HEADER_SIZE, *values)
+            _SEQUENCE.pack_into(buf, offset, sequence + 2)
+        return True
+
+    def _read_slot(self, slot: int) -> tuple[bytes, float, tuple[float, ...]] | None:
+        """Copy a slot consistently, None if it kept changing."""
+        buf = self.shm.buf
+        offset = self._offset(slot)
+        for _ in range(_READ_RETRIES):
+            before = _SEQUENCE.unpack_from(buf, offset)[0]
+            data = bytes(buf[offset:offset + SLOT_SIZE])
+            if before & 1 or _SEQUENCE.unpack_from(buf, offset)[0] != before:
+                # Let the writer finish
+                time.sleep(0)
+                continue
+            key, update_time = _SLOT_KEY.unpack_from(data, _SEQUENCE.size)
+            return (
+                key.rstrip(b"\0"),
+                update_time,
+                _VALUES.unpack_from(data, _SLOT_HEADER_SIZE),
+            )
+        return None
+
+    @staticmethod
+    def _as_dict(update_time: float, values: tuple[float, ...]) -> dict[str, float]:
+        result = {"update_time": update_time}
+        result.update(
+            (name, value)
+            for name, value in zip(SENSOR_FIELDS, values, strict=True)
+            if not math.isnan(value)
+        )
+        return result
+
+    def read(self, station_id: str) -> dict[str, float] | None:
+        """Return the latest values of a station, None if it is unknown.
+
+        The slot is looked up without the lock, so the lookup may compare a
+        key that is being written. The key of the consistent copy is checked
+        again, a station is never read from a slot it does not own.
+        """
+        key = station_id.encode()
+        slot = self._find(key, claim=False)
+        if slot is None:
+            return None
+        copied = self._read_slot(slot)
+        if copied is None or copied[0] != key:
+            return None
+        return self._as_dict(copied[1], copied[2])
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """Return the latest values of every station."""
+        stations = {}
+        for slot in range(self.slots):
+            copied = self._read_slot(slot)
+            if copied is None or not copied[0]:
+                continue
+            stations[copied[0].decode()] = self._as_dict(copied[1], copied[2])
+        return stations
+
+    def close(self) -> None:
+        """Detach, and remove the region if this process created it."""
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,87 @@
+"""Upstream sinks and the station request passed between the handling stages.
+
+Kept apart from `proxy` so the listener can route and queue requests
+without loading the HTTP client until a sink is enabled.
+"""
+
+from dataclasses import dataclass
+from enum import Enum
+from functools import cached_property
+import re
+from typing import Any
+from urllib.parse import parse_qsl, unquote, urlencode
+
+WEATHERCLOUD_PREFIX = "/v01/set"
+
+# Status of a forward that can never succeed, e.g. because the sink was
+# disabled or the request is malformed; it must not be retried
+FORWARD_REJECTED = -1
+
+# A query that only consists of these characters and well-formed percent
+# escapes is valid as is and can be sent upstream byte for byte
+_VALID_QUERY = re.compile(r"(?:[A-Za-z0-9\-._~!$&'()*+,;=:@/?]|%[0-9A-Fa-f]{2})*")
+
+
+class DataSink(Enum):
+    """Data sinks for the CloudWeather API."""
+
+    WUNDERGROUND = "wunderground"
+    WEATHERCLOUD = "weathercloud"
+
+
+@dataclass(frozen=True)
+class ForwardRequest:
+    """A station request, parsed once for ingestion and forwarding.
+
+    Holds the raw, still encoded path and query string as received, which
+    is all that is needed to forward it after the station has already been
+    answered. The parsed views are computed on first use and cached.
+    """
+
+    path: str
+    query_string: str
+
+    @classmethod
+    def from_request(cls, request: Any) -> "ForwardRequest":
+        """Create from an aiohttp request, keeping the target exactly as sent."""
+        raw_path: str = request.raw_path
+        if not raw_path.startswith("/"):
+            # An absolute-form target, only the path and query are kept
+            url = request.rel_url
+            return cls(url.raw_path, url.raw_query_string)
+        path, _, query_string = raw_path.partition("?")
+        return cls(path, query_string)
+
+    @cached_property
+    def query(self) -> dict[str, str]:
+        """The decoded query arguments, the first one wins like `dict(request.query)`."""
+        query: dict[str, str] = {}
+        for key, value in parse_qsl(self.query_string, keep_blank_values=True):
+            query.setdefault(key, value)
+        return query
+
+    @cached_property
+    def weathercloud_path(self) -> str:
+        """The path from `/v01/set` on, empty if it is not a Weathercloud request."""
+        index = self.path.find(WEATHERCLOUD_PREFIX)
+        return self.path[index:] if index >= 0 else ""
+
+    @cached_property
+    def segments(self) -> list[str]:
+        """The decoded Weathercloud path segments, alternating keys and values."""
+        segments = self.weathercloud_path[len(WEATHERCLOUD_PREFIX) + 1:].split("/")
+        if "%" in self.weathercloud_path:
+            segments = [unquote(segment) for segment in segments]
+        return segments
+
+    @cached_property
+    def upstream_query(self) -> str:
+        """The query string to send upstream.
+
+        The original string if it is validly encoded, otherwise it is
+        re-encoded from its arguments.
+        """
+        if _VALID_QUERY.fullmatch(self.query_string):
+            return self.query_string
+        pairs = parse_qsl(self.query_string, keep_blank_values=True)
+        return urlencode(pairs, doseq=True)
@@ -0,0 +1,252 @@
+"""Persist the latest dataset of every station across restarts.
+
+The snapshot is a single zlib-compressed JSON document. It is rewritten
+periodically, and only if a station reported since the last write, by
+writing a temporary file next to it, syncing it and renaming it over the
+previous snapshot, so a crash leaves either the old or the new snapshot.
+Station keys are never written. Update times are stored as wall-clock
+times, the monotonic clock does not survive a reboot.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Mapping
+import contextlib
+from dataclasses import dataclass, fields
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any
+import zlib
+
+from .station import Sensor, WeatherStation, WeatherstationVendor
+
+_LOGGER = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# Stored separately or not at all
+_IDENTITY_FIELDS = frozenset({"station_id", "station_key", "vendor", "update_time"})
+_STATION_FIELDS = frozenset(field.name for field in fields(WeatherStation))
+
+
+@dataclass(frozen=True)
+class SnapshotConfig:
+    """Configuration of the station snapshot."""
+
+    path: str
+    interval: float = 60.0
+    # Restored datasets older than this are marked stale
+    max_age: float = 3600.0
+
+
+@dataclass(frozen=True)
+class RestoredStation:
+    """A dataset read from the snapshot and its age in seconds."""
+
+    dataset: WeatherStation
+    age: float
+
+
+def encode_station(station: WeatherStation, updated: float) -> dict[str, Any]:
+    """Encode `station`, last updated at wall-clock time `updated`."""
+    sensors: dict[str, list[Any]] = {}
+    values: dict[str, Any] = {}
+    for name in _STATION_FIELDS - _IDENTITY_FIELDS:
+        value = getattr(station, name)
+        if value is None:
+            continue
+        if isinstance(value, Sensor):
+            sensors[name] = [value.name, value.value, value.unit]
+        else:
+            values[name] = value
+    return {
+        "i": station.station_id,
+        "v": station.vendor.value,
+        "t": updated,
+        "s": sensors,
+        "f": values,
+    }
+
+
+def decode_station(data: Mapping[str, Any]) -> tuple[WeatherStation, float]:
+    """Decode a station written by `encode_station` and its update time.
+
+    Fields the station no longer has are ignored.
+    """
+    kwargs: dict[str, Any] = {
+        name: value
+        for name, value in data.get("f", {}).items()
+        if name in _STATION_FIELDS and name not in _IDENTITY_FIELDS
+    }
+    for name, (sensor_name, value, unit) in data.get("s", {}).items():
+        if name in _STATION_FIELDS and name not in _IDENTITY_FIELDS:
+            kwargs[name] = Sensor(sensor_name, value, unit)
+    station = WeatherStation(
+        station_id=str(data["i"]),
+        station_key="",
+        vendor=WeatherstationVendor(data["v"]),
+        **kwargs,
+    )
+    return station, float(data["t"])
+
+
+class StationSnapshot:
+    """Periodic, atomic snapshot of the latest dataset of every station.
+
+    The file operations are blocking and run in the default executor; they
+    are serialized by a lock so a final write never interleaves with a
+    periodic one.
+    """
+
+    def __init__(
+        self,
+        config: SnapshotConfig,
+        source: Callable[[], Mapping[str, WeatherStation]],
+    ) -> None:
+        """Initialize the snapshot of the datasets returned by `source`."""
+        self.config = config
+        self.path = Path(config.path)
+        self.source = source
+
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._task: asyncio.Task[None] | None = None
+
+        self.saves: int = 0
+        self.failures: int = 0
+        self.restored: int = 0
+
+    # Blocking file operations, always called through the executor
+
+    def _read(self) -> list[RestoredStation]:
+        """Read the snapshot, returning nothing if it is missing or corrupt."""
+        with self._lock:
+            try:
+                raw = self.path.read_bytes()
+            except FileNotFoundError:
+                return []
+        try:
+            document = json.loads(zlib.decompress(raw))
+            if document.get("version") != SNAPSHOT_VERSION:
+                _LOGGER.warning(
+                    "Ignoring snapshot %s of version %s",
+                    self.path,
+                    document.get("version"),
+                )
+                return []
+            encoded = document["stations"]
+        except (zlib.error, ValueError, KeyError, AttributeError) as err:
+            _LOGGER.warning("Ignoring corrupt snapshot %s: %s", self.path, err)
+            return []
+
+        now = time.time()
+        restored = []
+        for data in encoded:
+            try:
+                dataset, updated = decode_station(data)
+            except (TypeError, ValueError, KeyError) as err:
+                _LOGGER.debug("Skipping a station of snapshot %s: %s", self.path, err)
+                continue
+            restored.append(RestoredStation(dataset, max(now - updated, 0.0)))
+        return restored
+
+    def _write(
+        self, stations: list[WeatherStation], now: float, now_monotonic: float
+    ) -> None:
+        """Replace the snapshot with `stations`, converting their update times."""
+        document = {
+            "version": SNAPSHOT_VERSION,
+            "stations": [
+                encode_station(
+                    station,
+                    now - (now_monotonic - (station.update_time or now_monotonic)),
+                )
+                for station in stations
+            ],
+        }
+        payload = zlib.compress(
+            json.dumps(document, separators=(",", ":")).encode()
+        )
+        temporary = self.path.with_name(f"{self.path.name}.tmp")
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temporary, "wb") as snapshot:
+                snapshot.write(payload)
+                snapshot.flush()
+                os.fsync(snapshot.fileno())
+            os.replace(temporary, self.path)
+            # Make the rename itself durable
+            with contextlib.suppress(OSError):
+                directory = os.open(self.path.parent, os.O_RDONLY)
+                try:
+                    os.fsync(directory)
+                finally:
+                    os.close(directory)
+
+    # Async API
+
+    async def load(self) -> list[RestoredStation]:
+        """Return the stations of the snapshot."""
+        restored = await asyncio.get_running_loop().run_in_executor(None, self._read)
+        self.restored = len(restored)
+        return restored
+
+    def mark_dirty(self) -> None:
+        """Note that a station reported, so the next interval writes the snapshot."""
+        self._dirty = True
+
+    async def save(self) -> None:
+        """Write the snapshot now if a station reported since the last write."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        # Datasets are immutable, copying the mapping is enough
+        stations = list(self.source().values())
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._write, stations, time.time(), time.monotonic()
+            )
+        except asyncio.CancelledError:
+            # The write may not have happened, retry on stop
+            self._dirty = True
+            raise
+        except OSError as err:
+            self._dirty = True
+            self.failures += 1
+            _LOGGER.warning("Failed to write snapshot %s: %s", self.path, err)
+            return
+        self.saves += 1
+
+    def start(self) -> None:
+        """Start writing the snapshot every `interval` seconds."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(
+                self._run(), name="cloudweather-snapshot"
+            )
+
+    async def stop(self) -> None:
+        """Stop the periodic writes and write the final snapshot."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.save()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.interval)
+            await self.save()
+
+    def stats(self) -> dict[str, int]:
+        """Return the snapshot counters."""
+        return {
+            "saves": self.saves,
+            "failures": self.failures,
+            "restored": self.restored,
+        }
@@ -0,0 +1,382 @@
+"""Durable on-disk spool for forwards that failed to reach their upstream sink.
+
+Failed requests are appended as JSON lines to segment files inside the
+spool directory. Segments are rotated by size, writes are fsynced in
+batches, and a background task replays the oldest segment once the sink
+accepts data again. Delivery is at-least-once: a record may be sent twice
+if the process stops while its segment is being replayed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import contextlib
+from dataclasses import dataclass
+import json
+import logging
+import os
+from pathlib import Path
+import random
+import threading
+import time
+from typing import IO
+
+from .sink import FORWARD_REJECTED, ForwardRequest
+
+_LOGGER = logging.getLogger(__name__)
+
+_SEGMENT_PREFIX = "spool-"
+_SEGMENT_SUFFIX = ".log"
+
+
+def is_retryable(status: int | None) -> bool:
+    """Return whether a forward with upstream `status` should be retried.
+
+    None means the request never reached the upstream, `FORWARD_REJECTED`
+    that it can never be sent.
+    """
+    return status is None or status >= 500 or status == 429
+
+
+@dataclass(frozen=True)
+class SpoolConfig:
+    """Configuration of the forward spool."""
+
+    directory: str
+    segment_bytes: int = 1024 * 1024
+    max_bytes: int = 50 * 1024 * 1024
+    max_age: float = 7 * 24 * 3600
+    fsync_interval: float = 5.0
+    fsync_batch: int = 50
+    replay_interval: float = 1.0
+    backoff_initial: float = 5.0
+    backoff_max: float = 300.0
+    # Attempts after which a record the sink keeps failing is discarded
+    max_attempts: int = 100
+
+
+@dataclass(frozen=True)
+class SpoolRecord:
+    """A spooled forward request."""
+
+    created: float
+    request: ForwardRequest
+
+    def encode(self) -> bytes:
+        """Encode the record as a single JSON line."""
+        return (
+            json.dumps(
+                {
+                    "t": self.created,
+                    "p": self.request.path,
+                    "q": self.request.query_string,
+                },
+                separators=(",", ":"),
+            )
+            + "\n"
+        ).encode()
+
+    @staticmethod
+    def decode(line: bytes) -> SpoolRecord:
+        """Decode a JSON line written by `encode`."""
+        data = json.loads(line)
+        return SpoolRecord(
+            created=float(data["t"]),
+            request=ForwardRequest(path=data["p"], query_string=data["q"]),
+        )
+
+
+class ForwardSpool:
+    """Append-only, segmented spool of failed forwards for a single sink.
+
+    The file operations are blocking and run in the default executor; they
+    are serialized by a lock so appends and replay reads can interleave.
+    """
+
+    def __init__(self, config: SpoolConfig, name: str) -> None:
+        """Initialize the spool in `config.directory`/`name`."""
+        self.config = config
+        self.name = name
+        self.directory = Path(config.directory) / name
+
+        self._lock = threading.Lock()
+        self._file: IO[bytes] | None = None
+        self._file_path: Path | None = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._next_segment = 0
+
+        self._replay_task: asyncio.Task[None] | None = None
+        self._new_data = asyncio.Event()
+        self._healthy = asyncio.Event()
+
+        self.spooled: int = 0
+        self.replayed: int = 0
+        self.expired: int = 0
+        self.discarded: int = 0
+
+    # Blocking file operations, always called through the executor
+
+    def _segments(self) -> list[Path]:
+        """Return the segment files, oldest first."""
+        if not self.directory.is_dir():
+            return []
+        return sorted(
+            path
+            for path in self.directory.iterdir()
+            if path.name.startswith(_SEGMENT_PREFIX)
+            and path.name.endswith(_SEGMENT_SUFFIX)
+        )
+
+    def _open_segment(self) -> IO[bytes]:
+        """Return the active segment, creating a new one if needed."""
+        if self._file is not None:
+            return self._file
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if not self._next_segment:
+            segments = self._segments()
+            if segments:
+                self._next_segment = int(
+                    segments[-1].name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)]
+                ) + 1
+        self._file_path = (
+            self.directory
+            / f"{_SEGMENT_PREFIX}{self._next_segment:012d}{_SEGMENT_SUFFIX}"
+        )
+        self._next_segment += 1
+        self._file = open(self._file_path, "ab")
+        return self._file
+
+    def _sync(self) -> None:
+        """Flush and fsync the active segment."""
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _close_segment(self) -> None:
+        """Sync and close the active segment."""
+        if self._file is None:
+            return
+        self._sync()
+        self._file.close()
+        self._file = None
+        self._file_path = None
+
+    def _enforce_limits(self) -> None:
+        """Remove expired segments and the oldest ones above the size cap."""
+        now = time.time()
+        segments = [path for path in self._segments() if path != self._file_path]
+        sizes = {path: path.stat().st_size for path in segments}
+        total = sum(sizes.values())
+        if self._file_path is not None:
+            total += self._file_path.stat().st_size
+
+        for path in segments:
+            expired = path.stat().st_mtime + self.config.max_age < now
+            if not expired and total <= self.config.max_bytes:
+                break
+            if expired:
+                _LOGGER.debug("Removing expired spool segment %s", path.name)
+            else:
+                _LOGGER.warning(
+                    "Spool %s exceeds %d bytes, dropping %s",
+                    self.name,
+                    self.config.max_bytes,
+                    path.name,
+                )
+            path.unlink(missing_ok=True)
+            total -= sizes[path]
+            self.discarded += 1
+
+    def _append(self, record: SpoolRecord) -> None:
+        """Append `record` to the active segment."""
+        with self._lock:
+            segment = self._open_segment()
+            segment.write(record.encode())
+            self._unsynced += 1
+            self.spooled += 1
+            if (
+                self._unsynced >= self.config.fsync_batch
+                or time.monotonic() - self._last_sync >= self.config.fsync_interval
+            ):
+                self._sync()
+            if segment.tell() >= self.config.segment_bytes:
+                self._close_segment()
+                self._enforce_limits()
+
+    def _read_oldest(self) -> tuple[Path, list[SpoolRecord]] | None:
+        """Return the oldest segment and its unexpired records.
+
+        The active segment is closed first so it is never read while it is
+        being appended to.
+        """
+        with self._lock:
+            segments = self._segments()
+            if not segments:
+                return None
+            if segments[0] == self._file_path:
+                self._close_segment()
+            self._enforce_limits()
+            segments = self._segments()
+            if not segments:
+                return None
+
+            oldest = segments[0]
+            min_created = time.time() - self.config.max_age
+            records = []
+            with open(oldest, "rb") as segment:
+                for line in segment:
+                    try:
+                        record = SpoolRecord.decode(line)
+                    except (ValueError, KeyError):
+                        # A torn write at the end of a segment after a crash
+                        _LOGGER.debug("Skipping corrupt spool line in %s", oldest)
+                        continue
+                    if record.created < min_created:
+                        self.expired += 1
+                        continue
+                    records.append(record)
+            return oldest, records
+
+    def _remove(self, segment: Path) -> None:
+        """Remove a fully replayed segment."""
+        with self._lock:
+            segment.unlink(missing_ok=True)
+
+    def _flush(self) -> None:
+        """Sync pending writes if the fsync interval elapsed."""
+        with self._lock:
+            if self._unsynced:
+                self._sync()
+
+    def _shutdown(self) -> None:
+        """Close the active segment."""
+        with self._lock:
+            self._close_segment()
+
+    # Async API
+
+    async def append(self, request: ForwardRequest) -> None:
+        """Spool a request that could not be forwarded."""
+        record = SpoolRecord(created=time.time(), request=request)
+        await asyncio.get_running_loop().run_in_executor(None, self._append, record)
+        self._new_data.set()
+
+    def notify_healthy(self) -> None:
+        """Signal that the sink accepted data, cutting a replay backoff short."""
+        self._healthy.set()
+
+    def start(
+        self, forward: Callable[[ForwardRequest], Awaitable[int | None]]
+    ) -> None:
+        """Start replaying the spool through `forward`.
+
+        `forward` returns the upstream HTTP status, or None if the request
+        could not be sent at all.
+        """
+        if self._replay_task is None or self._replay_task.done():
+            self._replay_task = asyncio.create_task(
+                self._replay(forward), name=f"cloudweather-spool-{self.name}"
+            )
+
+    async def stop(self) -> None:
+        """Stop replaying and sync the spool to disk."""
+        if self._replay_task is not None:
+            self._replay_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._replay_task
+            self._replay_task = None
+        await asyncio.get_running_loop().run_in_executor(None, self._shutdown)
+
+    @staticmethod
+    async def _wait(event: asyncio.Event, timeout: float) -> None:
+        """Wait for `event` or `timeout` seconds, whichever comes first."""
+        event.clear()
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(event.wait(), timeout)
+
+    async def _replay(
+        self, forward: Callable[[ForwardRequest], Awaitable[int | None]]
+    ) -> None:
+        """Replay spooled requests oldest first with backoff and throttling."""
+        loop = asyncio.get_running_loop()
+        config = self.config
+        attempt = 0
+        while True:
+            oldest = await loop.run_in_executor(None, self._read_oldest)
+            if oldest is None:
+                # Nothing spooled, sync pending writes periodically meanwhile
+                await self._wait(self._new_data, config.fsync_interval)
+                await loop.run_in_executor(None, self._flush)
+                continue
+
+            segment, records = oldest
+            index = 0
+            while index < len(records):
+                record = records[index]
+                if record.created < time.time() - config.max_age:
+                    self.expired += 1
+                    attempt = 0
+                    index += 1
+                    continue
+                if attempt >= config.max_attempts:
+                    _LOGGER.warning(
+                        "Spool %s discarding request after %d attempts",
+                        self.name,
+                        attempt,
+                    )
+                    self.discarded += 1
+                    attempt = 0
+                    index += 1
+                    continue
+
+                status = await forward(record.request)
+                if is_retryable(status):
+                    # Exponential backoff with jitter until the sink recovers
+                    backoff = min(
+                        config.backoff_max, config.backoff_initial * 2**attempt
+                    )
+                    attempt += 1
+                    delay = backoff / 2 + random.uniform(0, backoff / 2)
+                    _LOGGER.debug(
+                        "Spool %s replay failed (%s), retrying in %.1fs",
+                        self.name,
+                        status,
+                        delay,
+                    )
+                    await self._wait(self._healthy, delay)
+                    continue
+
+                if status == FORWARD_REJECTED:
+                    _LOGGER.warning(
+                        "Spool %s discarding request that cannot be forwarded",
+                        self.name,
+                    )
+                    self.discarded += 1
+                elif status is not None and status >= 400:
+                    _LOGGER.warning(
+                        "Spool %s discarding request rejected with %d",
+                        self.name,
+                        status,
+                    )
+                    self.discarded += 1
+                else:
+                    self.replayed += 1
+                attempt = 0
+                index += 1
+                await asyncio.sleep(config.replay_interval)
+
+            await loop.run_in_executor(None, self._remove, segment)
+
+    def stats(self) -> dict[str, int]:
+        """Return the spool counters."""
+        return {
+            "spooled": self.spooled,
+            "replayed": self.replayed,
+            "expired": self.expired,
+            "discarded": self.discarded,
+        }
@@ -1,16 +1,12 @@
 """The module parses incoming weather data from various sources into a common format."""
 
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass, field, fields
 from enum import Enum
 import logging
-from typing import Final
+from typing import Any, Final, cast, get_type_hints
 
-from .conversion import (
-    fahrenheit_to_celsius,
-    in_to_mm,
-    inhg_to_hpa,
-    mph_to_ms,
-)
+from .conversion import to_metric
 from .const import (
     DEGREE,
     LIGHT_LUX,
@@ -23,6 +19,7 @@ from .const import (
     UnitOfTemperature,
     UnitOfVolumetricFlux,
 )
+from .utils import resolve_caster
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,9 +29,10 @@ class WeatherstationVendor(Enum):
 
     WUNDERGROUND = "Weather Underground"
     WEATHERCLOUD = "Weathercloud.net"
+    ECOWITT = "Ecowitt"
 
 
-@dataclass
+@dataclass(slots=True)
 class WundergroundRawSensor:
     """Wunderground sensor parsed from query string."""
 
@@ -136,7 +134,7 @@ class WundergroundRawSensor:
     )
 
 
-@dataclass
+@dataclass(slots=True)
 class WeathercloudRawSensor:
     """WeatherCloud API sensor parsed from the query path."""
 
@@ -217,15 +215,253 @@ class WeathercloudRawSensor:
         "unit": "km", "arg": "vis"})
 
 
+@dataclass(slots=True)
+class EcowittRawSensor:
+    """Ecowitt protocol sensor parsed from a custom server form POST.
+
+    Ambient Weather stations send the same fields as a GET query string.
+    """
+
+    # PASSKEY=ABCDEF0123456789&stationtype=GW1100A_V2.1.4&dateutc=2024-05-18+16:42:43&tempinf=72.1&humidityin=45&baromrelin=29.920&baromabsin=29.800&tempf=72.5&humidity=44&winddir=249&windspeedmph=2.01&windgustmph=2.68&maxdailygust=8.05&solarradiation=289.20&uv=2&rainratein=0.000&dailyrainin=0.000&weeklyrainin=0.110&monthlyrainin=1.220&yearlyrainin=9.410&model=GW1100A
+    station_id: str = field(metadata={"arg": "PASSKEY"})
+    station_key: str = field(default="")
+    station_type: str | None = field(default=None, metadata={"arg": "stationtype"})
+
+    date_utc: str | None = field(default=None, metadata={"arg": "dateutc"})
+
+    barometer: float | None = field(
+        default=None, metadata={"unit": UnitOfPressure.INHG, "arg": "baromrelin"}
+    )
+    absbarometer: float | None = field(
+        default=None, metadata={"unit": UnitOfPressure.INHG, "arg": "baromabsin"}
+    )
+    temperature: float | None = field(
+        default=None, metadata={"unit": UnitOfTemperature.FAHRENHEIT, "arg": "tempf"}
+    )
+    humidity: float | None = field(
+        default=None, metadata={"unit": PERCENTAGE, "arg": "humidity"}
+    )
+    temperature2: float | None = field(
+        default=None, metadata={"unit": UnitOfTemperature.FAHRENHEIT, "arg": "temp1f"}
+    )
+    humidity2: float | None = field(
+        default=None, metadata={"unit": PERCENTAGE, "arg": "humidity1"}
+    )
+    indoortemperature: float | None = field(
+        default=None,
+        metadata={"unit": UnitOfTemperature.FAHRENHEIT, "arg": "tempinf"},
+    )
+    indoorhumidity: float | None = field(
+        default=None, metadata={"unit": PERCENTAGE, "arg": "humidityin"}
+    )
+    dewpoint: float | None = field(
+        default=None, metadata={"unit": UnitOfTemperature.FAHRENHEIT, "arg": "dewptf"}
+    )
+    windchill: float | None = field(
+        default=None, metadata={"unit": UnitOfTemperature.FAHRENHEIT, "arg": "windchillf"}
+    )
+    rain: float | None = field(
+        default=None,
+        metadata={"unit": UnitOfVolumetricFlux.INCHES_PER_HOUR, "arg": "rainratein"},
+    )
+    dailyrain: float | None = field(
+        default=None,
+        metadata={"unit": UnitOfPrecipitationDepth.INCHES, "arg": "dailyrainin"},
+    )
+    weeklyrain: float | None = field(
+        default=None,
+        metadata={"unit": UnitOfPrecipitationDepth.INCHES, "arg": "weeklyrainin"},
+    )
+    monthlyrain: float | None = field(
+        default=None,
+        metadata={"unit": UnitOfPrecipitationDepth.INCHES, "arg": "monthlyrainin"},
+    )
+    winddirection: float | None = field(
+        default=None, metadata={"unit": DEGREE, "arg": "winddir"}
+    )
+    windspeed: float | None = field(
+        default=None,
+        metadata={"unit": UnitOfSpeed.MILES_PER_HOUR, "arg": "windspeedmph"},
+    )
+    windgustspeed: float | None = field(
+        default=None,
+        metadata={"unit": UnitOfSpeed.MILES_PER_HOUR, "arg": "windgustmph"},
+    )
+    windspeedavg: float | None = field(
+        default=None,
+        metadata={"unit": UnitOfSpeed.MILES_PER_HOUR, "arg": "windspdmph_avg10m"},
+    )
+    winddirectionavg: float | None = field(
+        default=None, metadata={"unit": DEGREE, "arg": "winddir_avg10m"}
+    )
+    uv: int | None = field(default=None, metadata={"unit": UV_INDEX, "arg": "uv"})
+    solarradiation: float | None = field(
+        default=None,
+        metadata={
+            "unit": UnitOfIrradiance.WATTS_PER_SQUARE_METER,
+            "arg": "solarradiation",
+        },
+    )
+
+
 IMPERIAL_TO_METRIC: Final = {
-    UnitOfPressure.INHG: inhg_to_hpa,
-    UnitOfTemperature.FAHRENHEIT: fahrenheit_to_celsius,
-    UnitOfPrecipitationDepth.INCHES: in_to_mm,
-    UnitOfSpeed.MILES_PER_HOUR: mph_to_ms,
+    unit: to_metric(unit)
+    for unit in (
+        UnitOfPressure.INHG,
+        UnitOfTemperature.FAHRENHEIT,
+        UnitOfPrecipitationDepth.INCHES,
+        UnitOfSpeed.MILES_PER_HOUR,
+    )
 }
 
 
-@dataclass
+def _from_tenths(value: float) -> float:
+    """Scale a Weathercloud value, which is transmitted in tenths of its unit."""
+    return float(value) / 10
+
+
+@dataclass(frozen=True)
+class ParsePlanEntry:
+    """A precompiled parse step for a single raw sensor argument."""
+
+    arg: str
+    attribute: str
+    caster: Callable[[Any], Any] | None
+    sensor_name: str
+    unit: str
+    factor: float
+    conversion: Callable[[Any], Any] | None
+    source_unit: str | None
+
+
+@dataclass(frozen=True)
+class ParsePlan:
+    """Precompiled mapping from request arguments to `WeatherStation` sensors.
+
+    Built once per vendor at import time so the hot path does not need to
+    reflect over the raw sensor dataclass or resolve type hints per request.
+    """
+
+    entries: tuple[ParsePlanEntry, ...]
+    by_arg: Mapping[str, ParsePlanEntry]
+    sensors: tuple[ParsePlanEntry, ...]
+
+    def cast_args(self, data: Mapping[str, Any]) -> dict[str, Any]:
+        """Cast the known arguments in `data` into raw sensor keyword arguments.
+
+        Values that fail to cast are passed through unchanged, matching
+        `utils.cast_value`.
+        """
+        instance_data: dict[str, Any] = {}
+        for arg, value in data.items():
+            self.cast_into(instance_data, arg, value)
+        return instance_data
+
+    def cast_into(self, instance_data: dict[str, Any], arg: str, value: Any) -> None:
+        """Cast a single argument into `instance_data`, ignoring unknown ones."""
+        entry = self.by_arg.get(arg)
+        if entry is None:
+            return
+        caster = entry.caster
+        if caster is None:
+            instance_data[entry.attribute] = value
+            return
+        try:
+            instance_data[entry.attribute] = caster(value)
+        except Exception:  # pylint: disable=broad-except
+            instance_data[entry.attribute] = value
+
+    def parse_sensors(self, data: Any) -> dict[str, "Sensor"]:
+        """Scale and convert the sensors of the raw sensor dataclass `data`.
+
+        Values that fail to convert are logged and left out.
+        """
+        sensor_data = {}
+        for entry in self.sensors:
+            value = getattr(data, entry.attribute)
+            if value is None:
+                continue
+
+            value = value * entry.factor
+            conversion_func = entry.conversion
+            if conversion_func:
+                try:
+                    value = conversion_func(value)
+                except TypeError as e:
+                    _LOGGER.error(
+                        "Failed to convert %s from %s to %s: %s[%s] -> %s",
+                        entry.attribute,
+                        entry.source_unit,
+                        entry.unit,
+                        value,
+                        type(value),
+                        e,
+                    )
+                    continue
+            sensor_data[entry.sensor_name] = Sensor(
+                name=entry.sensor_name,
+                value=value,
+                unit=entry.unit,
+            )
+        return sensor_data
+
+
+def build_parse_plan(
+    raw_cls: type,
+    conversion_for: Callable[[Any], Callable[[Any], Any] | None],
+) -> ParsePlan:
+    """Build the parse plan for a raw sensor dataclass.
+
+    Args:
+        raw_cls: The raw sensor dataclass, e.g. `WundergroundRawSensor`.
+        conversion_for: Returns the conversion function for a source unit,
+            or None if the value is used as is.
+
+    """
+    type_hints = get_type_hints(raw_cls)
+    entries: list[ParsePlanEntry] = []
+    for sensor_field in fields(raw_cls):
+        if "arg" not in sensor_field.metadata:
+            continue
+        caster = resolve_caster(type_hints[sensor_field.name])
+        source_unit = sensor_field.metadata.get("unit")
+        conversion = conversion_for(source_unit)
+        output_unit = getattr(conversion, "unit", source_unit)
+        entries.append(
+            ParsePlanEntry(
+                arg=sensor_field.metadata["arg"],
+                attribute=sensor_field.name,
+                caster=caster if callable(caster) else None,
+                sensor_name=sensor_field.metadata.get(
+                    "alternative_for", sensor_field.name),
+                unit=str(output_unit) if output_unit else "",
+                factor=sensor_field.metadata.get("factor", 1),
+                conversion=conversion,
+                source_unit=source_unit,
+            )
+        )
+
+    return ParsePlan(
+        entries=tuple(entries),
+        by_arg={entry.arg: entry for entry in entries},
+        sensors=tuple(
+            entry
+            for entry in entries
+            if entry.attribute not in ("station_id", "station_key", "station_type")
+        ),
+    )
+
+
+# Any unit of a known family is normalized to its metric unit in one step
+WUNDERGROUND_PLAN: Final = build_parse_plan(WundergroundRawSensor, to_metric)
+WEATHERCLOUD_PLAN: Final = build_parse_plan(
+    WeathercloudRawSensor,
+    lambda unit: None if unit in (PERCENTAGE, DEGREE) else _from_tenths,
+)
+ECOWITT_PLAN: Final = build_parse_plan(EcowittRawSensor, to_metric)
+
+
+@dataclass(frozen=True, slots=True)
 class Sensor:
     """Represents a weather sensor."""
 
@@ -235,9 +471,15 @@ class Sensor:
     unit: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class WeatherStation:
-    """Represents a weather station with various sensor readings."""
+    """Represents a weather station with various sensor readings.
+
+    Instances are immutable snapshots, so they can be shared between the
+    listener and its subscribers without copying. Use `dataclasses.replace`
+    to derive an updated station. Both this class and `Sensor` use slots
+    instead of a per-instance `__dict__` to keep retained snapshots small.
+    """
 
     station_id: str
     station_key: str
@@ -274,6 +516,8 @@ class WeatherStation:
     dewpointindoor: Sensor | None = field(default=None, metadata={
         "name": "Indoor Dewpoint"})
     rain: Sensor | None = field(default=None, metadata={"name": "Rain Rate"})
+    rainrate: Sensor | None = field(default=None, metadata={
+        "name": "Derived Rain Rate"})
     dailyrain: Sensor | None = field(default=None, metadata={
         "name": "Daily Rain Rate"})
     winddirection: Sensor | None = field(default=None, metadata={
@@ -326,49 +570,7 @@ class WeatherStation:
             TypeError: If there is an error converting the sensor data.
 
         """
-        sensor_data = {}
-        for sensor_field in fields(data):
-            if sensor_field.name in ("station_id", "station_key"):
-                continue
-            value = getattr(data, sensor_field.name)
-            if value is None:
-                continue
-
-            value = value * sensor_field.metadata.get("factor", 1)
-            unit = sensor_field.metadata.get("unit")
-            # metadata.get returns Any; mypy may complain when using it as a dict key
-            conversion_func = IMPERIAL_TO_METRIC.get(
-                unit)  # type: ignore[arg-type]
-            sensor_name = sensor_field.metadata.get(
-                "alternative_for", sensor_field.name
-            )
-            if conversion_func:
-                try:
-                    converted_value = conversion_func(value)
-                except TypeError as e:
-                    _LOGGER.error(
-                        "Failed to convert %s from %s to %s: %s[%s] -> %s",
-                        sensor_field,
-                        unit,
-                        conversion_func.unit,
-                        value,
-                        type(value),
-                        e,
-                    )
-                    continue
-                sensor_data[sensor_name] = Sensor(
-                    name=sensor_name,
-                    value=converted_value,
-                    unit=str(conversion_func.unit),
-                )
-            else:
-                sensor_data[sensor_name] = Sensor(
-                    name=sensor_name,
-                    value=value,
-                    unit=str(unit) if unit else "",
-                )
-        from typing import Any, cast
-
+        sensor_data = WUNDERGROUND_PLAN.parse_sensors(data)
         return WeatherStation(
             station_id=data.station_id,
             station_key=data.station_key,
@@ -391,30 +593,51 @@ class WeatherStation:
 
         """
         sensor_data = {}
-        for sensor_field in fields(data):
-            if sensor_field.name in ("station_id", "station_key"):
-                continue
-            value = getattr(data, sensor_field.name)
+        for entry in WEATHERCLOUD_PLAN.sensors:
+            value = getattr(data, entry.attribute)
             if value is None:
                 continue
 
-            # value = sensor_field.type(value)  # No idea why this is needed
-            unit = sensor_field.metadata.get("unit")
-            if unit not in [PERCENTAGE, DEGREE]:
-                # All values are shifted by 10
-                value = float(value) / 10
+            if entry.conversion:
+                value = entry.conversion(value)
 
-            sensor_data[sensor_field.name] = Sensor(
-                name=sensor_field.name,
+            sensor_data[entry.sensor_name] = Sensor(
+                name=entry.sensor_name,
                 value=value,
-                unit=str(unit) if unit else "",
+                unit=entry.unit,
             )
 
-        from typing import Any, cast
-
         return WeatherStation(
             station_id=str(data.station_id),
             station_key=str(data.station_key),
             vendor=WeatherstationVendor.WEATHERCLOUD,
             **cast(dict[str, Any], sensor_data),
         )
+
+    @staticmethod
+    def from_ecowitt(data: EcowittRawSensor) -> "WeatherStation":
+        """Convert raw sensor data of the Ecowitt protocol into a WeatherStation object.
+
+        Args:
+            data (EcowittRawSensor): The raw sensor data of an Ecowitt or Ambient station.
+
+        Returns:
+            WeatherStation: The converted WeatherStation object.
+
+        """
+        sensor_data = ECOWITT_PLAN.parse_sensors(data)
+        return WeatherStation(
+            station_id=data.station_id,
+            station_key=data.station_key,
+            vendor=WeatherstationVendor.ECOWITT,
+            station_sw_version=data.station_type,
+            **cast(dict[str, Any], sensor_data),
+        )
+
+
+# Names of the `WeatherStation` fields holding a `Sensor`, in declaration order
+SENSOR_FIELDS: Final = tuple(
+    name
+    for name, type_hint in get_type_hints(WeatherStation).items()
+    if resolve_caster(type_hint) is Sensor
+)
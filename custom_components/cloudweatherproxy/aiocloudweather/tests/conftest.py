@@ -0,0 +1,42 @@
+from collections.abc import Callable
+
+import pytest  # type: ignore[import-not-found]
+from cloudweatherproxy.aiocloudweather.station import (
+    Sensor,
+    WeatherStation,
+    WeatherstationVendor,
+)
+
+_UNITS = {
+    "barometer": "hPa",
+    "dailyrain": "mm",
+    "humidity": "%",
+    "temperature": "°C",
+    "windgustspeed": "m/s",
+    "windgustspeed10m": "m/s",
+    "windspeed": "m/s",
+    "windspeedavg": "m/s",
+}
+
+
+def _make_station(
+    station_id: str = "abc",
+    update_time: float | None = None,
+    vendor: WeatherstationVendor = WeatherstationVendor.WUNDERGROUND,
+    **values: float | str,
+) -> WeatherStation:
+    return WeatherStation(
+        station_id=station_id,
+        station_key="secret",
+        vendor=vendor,
+        update_time=update_time,
+        **{
+            name: Sensor(name=name, value=value, unit=_UNITS.get(name, ""))
+            for name, value in values.items()
+        },
+    )
+
+
+@pytest.fixture
+def make_station() -> Callable[..., WeatherStation]:
+    return _make_station
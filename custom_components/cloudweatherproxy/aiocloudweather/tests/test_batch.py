@@ -0,0 +1,102 @@
+from array import array
+from pathlib import Path
+import random
+from urllib.parse import parse_qsl
+
+import pytest  # type: ignore[import-not-found]
+from cloudweatherproxy.aiocloudweather import batch
+from cloudweatherproxy.aiocloudweather.conversion import (
+    fahrenheit_to_celsius,
+    in_to_mm,
+    inhg_to_hpa,
+    mph_to_ms,
+)
+from cloudweatherproxy.aiocloudweather.station import (
+    WEATHERCLOUD_PLAN,
+    WUNDERGROUND_PLAN,
+    WeatherStation,
+    WeathercloudRawSensor,
+    WundergroundRawSensor,
+)
+
+DATA_DIR = Path(__file__).parent / "data"
+
+SCALAR_AND_BATCH = [
+    (fahrenheit_to_celsius, batch.fahrenheit_to_celsius_batch),
+    (inhg_to_hpa, batch.inhg_to_hpa_batch),
+    (in_to_mm, batch.in_to_mm_batch),
+    (mph_to_ms, batch.mph_to_ms_batch),
+]
+
+
+def _values() -> list[float]:
+    rng = random.Random(0)
+    return [round(rng.uniform(-40, 120), rng.randrange(4)) for _ in range(1000)]
+
+
+@pytest.mark.parametrize(("scalar", "batched"), SCALAR_AND_BATCH)
+def test_batch_matches_scalar(scalar, batched):
+    values = _values()
+    expected = [scalar(value) for value in values]
+
+    assert list(batched(values)) == expected
+    assert list(batched(array("d", values))) == expected
+
+
+@pytest.mark.parametrize(("scalar", "batched"), SCALAR_AND_BATCH)
+def test_numpy_batch_matches_scalar(scalar, batched):
+    np = pytest.importorskip("numpy")
+    values = _values()
+    kernel = batch._KERNELS[scalar]
+    result = batch._numpy_batch(kernel)(np.array(values))
+
+    assert result.tolist() == [scalar(value) for value in values]
+
+
+def _columns(records: list[dict[str, str]]) -> dict[str, list[float]]:
+    args = {arg for record in records for arg in record}
+    return {
+        arg: [float(record[arg]) for record in records]
+        for arg in args
+        if all(arg in record for record in records)
+        and all(record[arg].lstrip("-").replace(".", "", 1).isdigit() for record in records)
+    }
+
+
+def test_convert_columns_matches_stations():
+    lines = (DATA_DIR / "wunderground").read_text().splitlines()
+    records = [dict(parse_qsl(line.split("?", 1)[1])) for line in lines]
+    columns = _columns(records)
+    converted = batch.convert_columns(WUNDERGROUND_PLAN, columns)
+
+    assert {"barometer", "temperature", "windspeed", "dailyrain"} <= set(converted)
+    for index, record in enumerate(records):
+        station = WeatherStation.from_wunderground(
+            WundergroundRawSensor(**WUNDERGROUND_PLAN.cast_args(record))
+        )
+        for name, column in converted.items():
+            assert getattr(station, name).value == column[index]
+
+    # The whole-record batch also matches the scalar and kernel conversions
+    pressures = columns["baromin"]
+    assert list(converted["barometer"]) == [inhg_to_hpa(value) for value in pressures]
+    assert list(converted["barometer"]) == list(batch.inhg_to_hpa_batch(pressures))
+    assert list(converted["dailyrain"]) == [in_to_mm(value) for value in columns["dailyrainin"]]
+    assert list(converted["windspeed"]) == [
+        mph_to_ms(value) for value in columns["windspeedmph"]
+    ]
+
+
+def test_convert_weathercloud_columns():
+    lines = (DATA_DIR / "weathercloud").read_text().splitlines()
+    records = []
+    for line in lines:
+        segments = line.split("/v01/set/", 1)[1].split("/")
+        records.append(dict(zip(segments[::2], segments[1::2])))
+    converted = batch.convert_columns(WEATHERCLOUD_PLAN, _columns(records))
+
+    station = WeatherStation.from_weathercloud(
+        WeathercloudRawSensor(**WEATHERCLOUD_PLAN.cast_args(records[0]))
+    )
+    assert converted["temperature"][0] == station.temperature.value
+    assert converted["humidity"][0] == station.humidity.value
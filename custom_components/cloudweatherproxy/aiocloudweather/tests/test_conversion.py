@@ -1,9 +1,22 @@
+import pytest  # type: ignore[import-not-found]
+from cloudweatherproxy.aiocloudweather.const import (
+    UnitOfIrradiance,
+    UnitOfPrecipitationDepth,
+    UnitOfPressure,
+    UnitOfSpeed,
+    UnitOfTemperature,
+    UnitOfVolumetricFlux,
+)
 from cloudweatherproxy.aiocloudweather.conversion import (
+    convert,
+    converter,
     fahrenheit_to_celsius,
     in_to_mm,
     inhg_to_hpa,
     mph_to_ms,
+    to_metric,
 )
+from cloudweatherproxy.aiocloudweather.station import IMPERIAL_TO_METRIC
 
 
 def test_fahrenheit_to_celsius():
@@ -28,3 +41,73 @@ def test_mph_to_ms():
     assert round(mph_to_ms(10), 4) == 4.4704
     assert round(mph_to_ms(30), 4) == 13.4112
     assert round(mph_to_ms(5), 4) == 2.2352
+
+
+def test_conversion_graph_covers_every_pair():
+    families = [
+        UnitOfTemperature,
+        UnitOfPressure,
+        UnitOfSpeed,
+        UnitOfPrecipitationDepth,
+        UnitOfVolumetricFlux,
+        UnitOfIrradiance,
+    ]
+    for family in families:
+        for source in family:
+            for target in family:
+                if UnitOfSpeed.BEAUFORT in (source, target):
+                    continue
+                there_and_back = converter(target, source)(converter(source, target)(12.5))
+                assert abs(there_and_back - 12.5) < 1e-9
+
+
+def test_conversion_graph_values():
+    assert convert(100, UnitOfTemperature.CELSIUS, UnitOfTemperature.FAHRENHEIT) == 212
+    assert convert(0, UnitOfTemperature.CELSIUS, UnitOfTemperature.KELVIN) == 273.15
+    assert convert(10, UnitOfSpeed.KNOTS, UnitOfSpeed.KILOMETERS_PER_HOUR) == 18.52
+    assert round(convert(760, UnitOfPressure.MMHG, UnitOfPressure.HPA), 2) == 1013.25
+    assert convert(
+        1,
+        UnitOfIrradiance.BTUS_PER_HOUR_SQUARE_FOOT,
+        UnitOfIrradiance.WATTS_PER_SQUARE_METER,
+    ) == 3.15459075
+    assert convert(1, UnitOfVolumetricFlux.INCHES_PER_HOUR, UnitOfVolumetricFlux.MILLIMETERS_PER_HOUR) == 25.4
+
+
+def test_beaufort():
+    assert convert(10, UnitOfSpeed.METERS_PER_SECOND, UnitOfSpeed.BEAUFORT) == 5
+    assert convert(0.2, UnitOfSpeed.METERS_PER_SECOND, UnitOfSpeed.BEAUFORT) == 0
+    assert convert(33, UnitOfSpeed.METERS_PER_SECOND, UnitOfSpeed.BEAUFORT) == 12
+    assert round(convert(5, UnitOfSpeed.BEAUFORT, UnitOfSpeed.METERS_PER_SECOND), 2) == 9.35
+
+
+def test_converter_is_cached_and_checked():
+    assert converter(UnitOfPressure.PSI, UnitOfPressure.KPA) is converter(
+        UnitOfPressure.PSI, UnitOfPressure.KPA
+    )
+    assert to_metric(UnitOfPressure.HPA) is None
+    assert to_metric("lx") is None
+    assert to_metric(UnitOfSpeed.MILES_PER_HOUR).unit == UnitOfSpeed.METERS_PER_SECOND
+    with pytest.raises(ValueError):
+        converter(UnitOfPressure.PSI, UnitOfSpeed.KNOTS)
+
+
+SCALARS = {
+    UnitOfPressure.INHG: inhg_to_hpa,
+    UnitOfTemperature.FAHRENHEIT: fahrenheit_to_celsius,
+    UnitOfPrecipitationDepth.INCHES: in_to_mm,
+    UnitOfSpeed.MILES_PER_HOUR: mph_to_ms,
+}
+
+
+@pytest.mark.parametrize("source", list(IMPERIAL_TO_METRIC))
+def test_conversion_graph_matches_scalar(source):
+    conversion = IMPERIAL_TO_METRIC[source]
+    scalar = SCALARS[source]
+    assert conversion.unit == scalar.unit
+    for value in (-40.0, 0.0, 0.5, 29.92, 30.05, 53.2, 212.0):
+        if source == UnitOfTemperature.FAHRENHEIT:
+            # The offset is applied after scaling, not before
+            assert conversion(value) == pytest.approx(scalar(value), rel=1e-12, abs=1e-12)
+        else:
+            assert conversion(value) == scalar(value)
@@ -0,0 +1,56 @@
+import pytest  # type: ignore[import-not-found]
+
+from cloudweatherproxy.aiocloudweather.derived import DerivedMetrics
+from cloudweatherproxy.aiocloudweather.server import CloudWeatherListener
+from cloudweatherproxy.aiocloudweather.station import WeatherStation
+
+
+def test_rain_rate_survives_midnight_reset(make_station):
+    metrics = DerivedMetrics(rain_window=600)
+
+    assert metrics.update(make_station(dailyrain=10.0), 0)["rainrate"].value == 0
+    derived = metrics.update(make_station(dailyrain=11.0), 300)
+    assert derived["rainrate"].value == pytest.approx(6.0)
+    assert derived["rainrate"].unit == "mm/h"
+
+    # Counter reset at midnight: 0.5 mm fell since the reset
+    derived = metrics.update(make_station(dailyrain=0.5), 600)
+    assert derived["rainrate"].value == pytest.approx(9.0)
+
+    # The first samples left the window
+    derived = metrics.update(make_station(dailyrain=0.5), 1500)
+    assert derived["rainrate"].value == 0
+
+
+def test_wind_average_and_gust_maximum(make_station):
+    metrics = DerivedMetrics(wind_average_window=120, gust_window=600)
+
+    metrics.update(make_station(windspeed=2.0, windgustspeed=8.0), 0)
+    metrics.update(make_station(windspeed=4.0, windgustspeed=3.0), 60)
+    derived = metrics.update(make_station(windspeed=6.0, windgustspeed=5.0), 150)
+
+    assert derived["windspeedavg"].value == pytest.approx(5.0)
+    assert derived["windspeedavg"].unit == "m/s"
+    assert derived["windgustspeed10m"].value == 8.0
+
+    derived = metrics.update(make_station(windspeed=1.0, windgustspeed=2.0), 620)
+    assert derived["windgustspeed10m"].value == 5.0
+
+
+def test_reported_values_are_not_replaced(make_station):
+    metrics = DerivedMetrics()
+    station = make_station(windspeed=2.0, windspeedavg=3.0, windgustspeed10m=4.0)
+
+    assert metrics.update(station, 0) == {}
+
+
+def test_reported_rain_rate_is_not_derived():
+    metrics = DerivedMetrics()
+    segments = "wid/abc/key/x/rain/6/rainrate/12".split("/")
+    station = WeatherStation.from_weathercloud(
+        CloudWeatherListener.parse_weathercloud(segments)
+    )
+    assert station.rain is not None
+    assert station.dailyrain is not None
+
+    assert "rainrate" not in metrics.update(station, 0)
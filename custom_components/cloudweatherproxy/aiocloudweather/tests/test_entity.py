@@ -0,0 +1,82 @@
+import time
+
+from cloudweatherproxy.const import STATE_MAX_STALENESS, STATE_MIN_WRITE_INTERVAL
+from cloudweatherproxy.entity import CloudWeatherEntity
+
+
+def make_entity(station, name):
+    entity = CloudWeatherEntity(getattr(station, name), station, name)
+    entity.writes = []
+    entity.async_write_ha_state = lambda: entity.writes.append(
+        entity._attr_native_value
+    )
+    return entity
+
+
+async def test_unchanged_and_small_changes_are_suppressed(make_station):
+    entity = make_entity(
+        make_station(update_time=time.monotonic(), temperature=10.0), "temperature"
+    )
+    await entity.update_sensor(
+        make_station(update_time=time.monotonic(), temperature=10.0)
+    )
+    await entity.update_sensor(
+        make_station(update_time=time.monotonic(), temperature=10.05)
+    )
+    assert entity.writes == []
+    assert entity.writes_suppressed == 2
+
+    # A small change is written once the minimum interval passed
+    entity._written_at -= STATE_MIN_WRITE_INTERVAL
+    await entity.update_sensor(
+        make_station(update_time=time.monotonic(), temperature=10.05)
+    )
+    assert entity.writes == [10.05]
+
+
+async def test_changes_past_the_deadband_are_written_at_once(make_station):
+    entity = make_entity(
+        make_station(update_time=time.monotonic(), temperature=10.0), "temperature"
+    )
+    await entity.update_sensor(
+        make_station(update_time=time.monotonic(), temperature=10.2)
+    )
+    await entity.update_sensor(
+        make_station(update_time=time.monotonic(), temperature=10.4)
+    )
+    assert entity.writes == [10.2, 10.4]
+    assert entity.writes_emitted == 2
+
+
+async def test_changes_without_deadband_are_not_delayed(make_station):
+    entity = make_entity(
+        make_station(update_time=time.monotonic(), winddirection=180),
+        "winddirection",
+    )
+    await entity.update_sensor(
+        make_station(update_time=time.monotonic(), winddirection=181)
+    )
+    assert entity.writes == [181]
+
+
+async def test_availability_flip_is_written(make_station):
+    entity = make_entity(
+        make_station(update_time=time.monotonic(), temperature=10.0), "temperature"
+    )
+    await entity.update_sensor(
+        make_station(update_time=time.monotonic() - 600, temperature=10.0)
+    )
+    assert entity.writes == [10.0]
+    assert not entity.available
+
+
+async def test_stale_state_is_refreshed(make_station):
+    entity = make_entity(
+        make_station(update_time=time.monotonic(), temperature=10.0), "temperature"
+    )
+    entity._written_at -= STATE_MAX_STALENESS
+    await entity.update_sensor(
+        make_station(update_time=time.monotonic(), temperature=10.0)
+    )
+    assert entity.writes == [10.0]
+    assert entity.writes_suppressed == 0
@@ -0,0 +1,57 @@
+import asyncio
+
+from cloudweatherproxy.aiocloudweather.forwarder import ForwardQueue
+from cloudweatherproxy.aiocloudweather.proxy import DataSink, ForwardRequest
+
+
+async def test_forward_queue_forwards_in_background():
+    forwarded: list[ForwardRequest] = []
+    release = asyncio.Event()
+
+    async def forward(sink: DataSink, request: ForwardRequest) -> bool:
+        await release.wait()
+        forwarded.append(request)
+        return request.query_string != "fail"
+
+    queue = ForwardQueue(forward, maxsize=10, workers=2)
+    queue.put(DataSink.WUNDERGROUND, ForwardRequest("/a", "ok"))
+    queue.put(DataSink.WUNDERGROUND, ForwardRequest("/b", "fail"))
+    await asyncio.sleep(0)
+    assert queue.stats()["workers"] == 2
+    assert not forwarded
+
+    release.set()
+    await queue.stop()
+
+    assert sorted(request.path for request in forwarded) == ["/a", "/b"]
+    assert queue.stats() == {
+        "depth": 0,
+        "dropped": 0,
+        "forwarded": 1,
+        "failed": 1,
+        "workers": 0,
+    }
+
+
+async def test_forward_queue_drops_oldest():
+    forwarded: list[str] = []
+    release = asyncio.Event()
+
+    async def forward(sink: DataSink, request: ForwardRequest) -> bool:
+        await release.wait()
+        forwarded.append(request.path)
+        return True
+
+    queue = ForwardQueue(forward, maxsize=2, workers=1)
+    queue.put(DataSink.WEATHERCLOUD, ForwardRequest("/1", ""))
+    # Let the worker pick up the first request
+    await asyncio.sleep(0)
+    for path in ("/2", "/3", "/4"):
+        queue.put(DataSink.WEATHERCLOUD, ForwardRequest(path, ""))
+
+    assert queue.depth == 2
+    assert queue.dropped == 1
+
+    release.set()
+    await queue.stop()
+    assert forwarded == ["/1", "/3", "/4"]
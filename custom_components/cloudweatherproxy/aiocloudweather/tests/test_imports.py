@@ -0,0 +1,51 @@
+from pathlib import Path
+import subprocess
+import sys
+
+ROOT = Path(__file__).parent.parent.parent
+
+
+def test_optional_modules_are_imported_lazily():
+    code = (
+        "import sys, aiocloudweather\n"
+        "aiocloudweather.CloudWeatherListener()\n"
+        "print(' '.join(sorted(sys.modules)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = set(result.stdout.split())
+
+    assert "aiocloudweather.server" in modules
+    for lazy in (
+        "aiocloudweather.proxy",
+        "aiocloudweather.forwarder",
+        "aiocloudweather.spool",
+        "aiocloudweather.timeseries",
+        "numpy",
+        "homeassistant",
+    ):
+        assert lazy not in modules
+
+
+def test_proxy_is_imported_with_a_sink():
+    code = (
+        "import asyncio, sys, aiocloudweather\n"
+        "from aiocloudweather.sink import DataSink\n"
+        "async def main():\n"
+        "    aiocloudweather.CloudWeatherListener(proxy_sinks=[DataSink.WUNDERGROUND])\n"
+        "asyncio.run(main())\n"
+        "print('aiocloudweather.proxy' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "True"
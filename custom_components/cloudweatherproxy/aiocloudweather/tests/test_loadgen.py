@@ -0,0 +1,48 @@
+import random
+
+from aiohttp.test_utils import RawTestServer, make_mocked_request
+from cloudweatherproxy.aiocloudweather.loadgen import (
+    WEATHERCLOUD,
+    WUNDERGROUND,
+    VirtualStation,
+    make_stations,
+    run_loadgen,
+)
+from cloudweatherproxy.aiocloudweather.server import CloudWeatherListener
+
+
+def test_stations_mix_formats():
+    stations = make_stations(100, interval=16)
+    formats = {station.format for station in stations}
+    assert formats == {WUNDERGROUND, WEATHERCLOUD}
+    assert len({station.station_id for station in stations}) == 100
+
+
+async def test_readings_parse_consistently():
+    listener = CloudWeatherListener()
+    for station_format in (WUNDERGROUND, WEATHERCLOUD):
+        station = VirtualStation(
+            "virtual", station_format, 16, random.Random(1), temperature=20.0
+        )
+        station.step(0)
+        await listener.handler(make_mocked_request("GET", station.path()))
+        dataset = listener.last_values["virtual"]
+        assert dataset.temperature is not None
+        assert abs(dataset.temperature.value - station.temperature) < 0.1
+        assert abs(dataset.barometer.value - station.pressure) < 0.5
+
+
+async def test_run_against_listener():
+    listener = CloudWeatherListener()
+    server = RawTestServer(listener.handler)
+    await server.start_server()
+    try:
+        stats = await run_loadgen(
+            str(server.make_url("/")), make_stations(4, interval=0.05), duration=0.3
+        )
+    finally:
+        await server.close()
+
+    assert stats.sent > 4
+    assert stats.ok == stats.sent
+    assert len(listener.stations) == 4
@@ -0,0 +1,14 @@
+import asyncio
+import os
+import signal
+
+from cloudweatherproxy.aiocloudweather.__main__ import run_server
+
+
+async def test_run_server_stops_on_sigterm(tmp_path):
+    server = asyncio.create_task(run_server(0, record=str(tmp_path / "readings.db")))
+    # The signal handlers are installed before the first await
+    await asyncio.sleep(0)
+    os.kill(os.getpid(), signal.SIGTERM)
+    await asyncio.wait_for(server, 5)
+    assert not asyncio.get_running_loop().remove_signal_handler(signal.SIGTERM)
@@ -0,0 +1,44 @@
+from aiohttp.test_utils import make_mocked_request
+from cloudweatherproxy.aiocloudweather.metrics import CONTENT_TYPE, MetricsRegistry
+from cloudweatherproxy.aiocloudweather.server import CloudWeatherListener
+
+
+def test_render():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests", "Requests", ("station",))
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    registry.gauge("depth", "Depth", lambda: {(): 3})
+
+    counter.inc(("a\"b",))
+    counter.inc(("a\"b",))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    lines = registry.render().splitlines()
+    assert 'requests_total{station="a\\"b"} 2' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_count 3" in lines
+    assert "latency_seconds_sum 5.55" in lines
+    assert "depth 3" in lines
+    assert lines[-1] == "# EOF"
+
+
+async def test_metrics_endpoint():
+    listener = CloudWeatherListener()
+    await listener._dispatch(
+        make_mocked_request(
+            "GET", "/weatherstation/updateweatherstation.php?ID=abc&PASSWORD=x"
+        )
+    )
+    response = await listener._dispatch(make_mocked_request("GET", "/metrics"))
+
+    assert response.headers["Content-Type"] == CONTENT_TYPE
+    assert 'cloudweather_requests_total{vendor="wunderground",station="abc"} 1' in (
+        response.text or ""
+    )
+    assert 'cloudweather_parse_seconds_count{vendor="wunderground"} 1' in (
+        response.text or ""
+    )
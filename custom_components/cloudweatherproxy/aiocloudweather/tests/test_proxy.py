@@ -0,0 +1,133 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import RawTestServer, make_mocked_request
+from cloudweatherproxy.aiocloudweather.proxy import (
+    CloudWeatherProxy,
+    DataSink,
+    ForwardRateLimiter,
+    ForwardRequest,
+    PoolConfig,
+)
+
+
+async def test_rate_limiter_coalesces_latest_sample():
+    released: list[tuple[DataSink, ForwardRequest]] = []
+
+    def release(sink: DataSink, request: ForwardRequest) -> None:
+        released.append((sink, request))
+
+    limiter = ForwardRateLimiter({DataSink.WEATHERCLOUD: 0.05})
+    sample = [ForwardRequest(f"/v01/set/{idx}", "") for idx in range(4)]
+
+    assert limiter.admit(DataSink.WEATHERCLOUD, "a", sample[0], release)
+    assert not limiter.admit(DataSink.WEATHERCLOUD, "a", sample[1], release)
+    assert not limiter.admit(DataSink.WEATHERCLOUD, "a", sample[2], release)
+    # Other stations and sinks without an interval are not limited
+    assert limiter.admit(DataSink.WEATHERCLOUD, "b", sample[3], release)
+    assert limiter.admit(DataSink.WUNDERGROUND, "a", sample[3], release)
+    assert limiter.stats() == {"coalesced": 1, "pending": 1}
+
+    while not released:
+        await asyncio.sleep(0.01)
+    assert released == [(DataSink.WEATHERCLOUD, sample[2])]
+
+    # The release opened a new window
+    assert not limiter.admit(DataSink.WEATHERCLOUD, "a", sample[3], release)
+    limiter.cancel()
+    assert limiter.stats() == {"coalesced": 1, "pending": 0}
+
+
+def test_forward_request_parses_once():
+    request = make_mocked_request(
+        "GET",
+        "/weatherstation/updateweatherstation.php"
+        "?ID=a%26b&dateutc=2024-05-18+16%3A42%3A43&ID=second&rain=",
+    )
+    parsed = ForwardRequest.from_request(request)
+
+    assert parsed.query_string == "ID=a%26b&dateutc=2024-05-18+16%3A42%3A43&ID=second&rain="
+    assert parsed.query == {"ID": "a&b", "dateutc": "2024-05-18 16:42:43", "rain": ""}
+    assert parsed.query is parsed.query
+    assert parsed.upstream_query is parsed.query_string
+    assert parsed.weathercloud_path == ""
+
+    weathercloud = ForwardRequest("/weathercloud/v01/set/wid/a%20b/temp/150", "")
+    assert weathercloud.weathercloud_path == "/v01/set/wid/a%20b/temp/150"
+    assert weathercloud.segments == ["wid", "a b", "temp", "150"]
+
+
+def test_forward_request_rewrites_invalid_query():
+    assert ForwardRequest("/", "a=b c&d=%zz").upstream_query == "a=b+c&d=%25zz"
+
+
+async def test_forward_passes_query_verbatim():
+    received: list[str] = []
+
+    async def upstream(request: web.BaseRequest) -> web.Response:
+        received.append(request.rel_url.raw_path_qs)
+        return web.Response(text="OK")
+
+    server = RawTestServer(upstream)
+    await server.start_server()
+    base = str(server.make_url("")).rstrip("/")
+    proxy = CloudWeatherProxy(
+        [DataSink.WUNDERGROUND, DataSink.WEATHERCLOUD],
+        ["127.0.0.1"],
+        upstream_urls={DataSink.WUNDERGROUND: base, DataSink.WEATHERCLOUD: base},
+    )
+    try:
+        query = "ID=a%26b&dateutc=2024-05-18+16%3A42%3A43&tempf=50"
+        await proxy.forward(
+            DataSink.WUNDERGROUND, ForwardRequest("/weatherstation/x", query)
+        )
+        await proxy.forward(
+            DataSink.WEATHERCLOUD, ForwardRequest("/weathercloud/v01/set/wid/a%2Fb", "")
+        )
+    finally:
+        await proxy.close()
+        await server.close()
+
+    assert received == [
+        f"/weatherstation/updateweatherstation.php?{query}",
+        "/v01/set/wid/a%2Fb",
+    ]
+
+
+async def test_prewarm_reuses_connections():
+    methods: list[str] = []
+
+    async def upstream(request: web.BaseRequest) -> web.Response:
+        methods.append(request.method)
+        return web.Response(text="OK")
+
+    server = RawTestServer(upstream)
+    await server.start_server()
+    base = str(server.make_url("")).rstrip("/")
+    proxy = CloudWeatherProxy(
+        [DataSink.WUNDERGROUND],
+        ["127.0.0.1"],
+        upstream_urls={DataSink.WUNDERGROUND: base},
+        pool=PoolConfig(prewarm=True, prewarm_connections=2, prewarm_interval=0.05),
+    )
+    try:
+        proxy.start()
+        while proxy.pool_stats[DataSink.WUNDERGROUND].probes < 4:
+            await asyncio.sleep(0.01)
+        response = await proxy.forward(
+            DataSink.WUNDERGROUND, ForwardRequest("/x", "ID=a")
+        )
+        await response.read()
+        stats = proxy.get_pool_stats()["wunderground"]
+    finally:
+        await proxy.close()
+        await server.close()
+
+    assert methods[:2] == ["HEAD", "HEAD"]
+    assert "GET" in methods
+    assert stats["handshakes"] == 2
+    assert stats["reused"] >= 3
+    assert stats["probe_failures"] == 0
+    assert 0 < stats["reuse_ratio"] < 1
+    assert stats["mean_handshake_time"] > 0
+    assert proxy._prewarm_task is None
@@ -0,0 +1,113 @@
+import sqlite3
+import time
+
+from cloudweatherproxy.aiocloudweather.__main__ import worker_database
+from cloudweatherproxy.aiocloudweather.recorder import RecorderConfig, SQLiteRecorder
+from cloudweatherproxy.aiocloudweather.server import CloudWeatherListener
+
+
+async def test_records_in_batches(tmp_path, make_station):
+    path = tmp_path / "readings.db"
+    recorder = SQLiteRecorder(
+        RecorderConfig(path=str(path), batch_size=4, flush_interval=3600)
+    )
+    listener = CloudWeatherListener()
+    listener.new_dataset_cb.append(recorder.record)
+    start = time.time()
+    try:
+        # The date is a string, it is not recorded
+        stations = [
+            make_station(date_utc="now", temperature=value, humidity=50)
+            for value in (10.0, 11.0, 12.0)
+        ]
+        await listener._new_dataset_cb(stations[0])
+        for station in stations[1:]:
+            await recorder.record(station)
+        # The first two datasets filled a batch, the last one is pending
+        await recorder.flush()
+        assert recorder.stats()["flushes"] == 2
+        rows = await recorder.query("abc", "temperature", start - 1)
+        assert [value for _, value in rows] == [10.0, 11.0, 12.0]
+        assert all(start - 1 <= ts <= time.time() for ts, _ in rows)
+        assert await recorder.query("abc", "temperature", start - 1, rows[1][0]) == rows[:1]
+        assert await recorder.query("abc", "date_utc", 0) == []
+    finally:
+        await recorder.stop()
+    assert recorder.stats()["recorded"] == 6
+
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    connection.close()
+
+
+async def test_flushes_after_interval_and_prunes(tmp_path, make_station):
+    recorder = SQLiteRecorder(
+        RecorderConfig(
+            path=str(tmp_path / "readings.db"),
+            flush_interval=0.05,
+            retention=3600,
+            prune_interval=0.05,
+        )
+    )
+    try:
+        # Reported two hours ago, pruned by the next retention pass
+        for age, value in ((7200, 1.0), (0, 2.0)):
+            await recorder.record(
+                make_station(
+                    update_time=time.monotonic() - age, temperature=value, humidity=50
+                )
+            )
+        await recorder.flush()
+        assert len(await recorder.query("abc", "temperature", 0)) == 2
+
+        await recorder.record(
+            make_station(update_time=time.monotonic(), temperature=3.0, humidity=50)
+        )
+        start = time.monotonic()
+        while recorder.stats()["recorded"] < 6 or not recorder.stats()["pruned"]:
+            assert time.monotonic() - start < 2
+            time.sleep(0.01)
+        rows = await recorder.query("abc", "temperature", 0)
+        assert [value for _, value in rows] == [2.0, 3.0]
+    finally:
+        await recorder.stop()
+
+
+async def test_drops_when_writer_falls_behind(tmp_path, make_station):
+    recorder = SQLiteRecorder(
+        RecorderConfig(path=str(tmp_path / "readings.db"), max_pending=1)
+    )
+    # Not started, nothing drains the queue
+    recorder.start = lambda: None
+    await recorder.record(make_station(temperature=1.0, humidity=50))
+    await recorder.record(make_station(temperature=2.0, humidity=50))
+    assert recorder.stats() == {
+        "pending": 1,
+        "recorded": 0,
+        "dropped": 2,
+        "flushes": 0,
+        "failures": 0,
+        "pruned": 0,
+    }
+
+
+async def test_query_is_read_only(tmp_path):
+    path = tmp_path / "readings.db"
+    recorder = SQLiteRecorder(RecorderConfig(path=str(path)))
+    assert await recorder.query("abc", "temperature", 0) == []
+    assert not path.exists()
+
+    # A database without the schema yet is not modified either
+    sqlite3.connect(path).close()
+    assert await recorder.query("abc", "temperature", 0) == []
+    connection = sqlite3.connect(path)
+    try:
+        assert connection.execute("SELECT name FROM sqlite_master").fetchall() == []
+    finally:
+        connection.close()
+
+
+def test_workers_record_to_their_own_database():
+    assert worker_database("/data/readings.db", 0) == "/data/readings-0.db"
+    assert worker_database("/data/readings.db", 1) == "/data/readings-1.db"
+    assert worker_database("readings", 2) == "readings-2"
@@ -0,0 +1,131 @@
+import asyncio
+import socket
+import struct
+
+import pytest  # type: ignore[import-not-found]
+from cloudweatherproxy.aiocloudweather.resolver import CachingResolver
+
+
+class StubDNS(asyncio.DatagramProtocol):
+    def __init__(self, records: dict[str, str], ttl: int) -> None:
+        self.records = records
+        self.ttl = ttl
+        self.delay = 0.0
+        self.servfail = False
+        self.queries: list[tuple[str, int]] = []
+        self.transport: asyncio.DatagramTransport | None = None
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        labels, offset = [], 12
+        while data[offset]:
+            length = data[offset]
+            labels.append(data[offset + 1:offset + 1 + length].decode())
+            offset += 1 + length
+        qtype, _ = struct.unpack("!HH", data[offset + 1:offset + 5])
+        question = data[12:offset + 5]
+        name = ".".join(labels)
+        self.queries.append((name, qtype))
+
+        answers = b""
+        count = 0
+        rcode = 2 if self.servfail else 0
+        if not self.servfail:
+            if name not in self.records:
+                rcode = 3
+            elif qtype == 1:
+                answers = struct.pack("!HHHIH", 0xC00C, 1, 1, self.ttl, 4)
+                answers += socket.inet_aton(self.records[name])
+                count = 1
+        header = struct.pack("!HHHHHH", struct.unpack("!H", data[:2])[0],
+                             0x8180 | rcode, 1, count, 0, 0)
+        response = header + question + answers
+        assert self.transport is not None
+        asyncio.get_running_loop().call_later(
+            self.delay, self.transport.sendto, response, addr
+        )
+
+
+async def _start(records: dict[str, str], ttl: int = 0) -> tuple[StubDNS, str]:
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        lambda: StubDNS(records, ttl), local_addr=("127.0.0.1", 0)
+    )
+    port = transport.get_extra_info("sockname")[1]
+    return protocol, f"127.0.0.1:{port}"
+
+
+async def test_caches_and_refreshes_ahead():
+    stub, nameserver = await _start({"rtupdate.example": "192.0.2.10"})
+    resolver = CachingResolver([nameserver], min_ttl=0.2, refresh_ahead=0.5)
+    try:
+        results = await resolver.resolve("rtupdate.example", 80)
+        assert [(r["host"], r["port"]) for r in results] == [("192.0.2.10", 80)]
+        await resolver.resolve("rtupdate.example", 80)
+        assert len(stub.queries) == 1
+
+        # Past the refresh point the cached answer is returned and renewed
+        stub.records["rtupdate.example"] = "192.0.2.11"
+        await asyncio.sleep(0.15)
+        results = await resolver.resolve("rtupdate.example", 80)
+        assert results[0]["host"] == "192.0.2.10"
+        await asyncio.sleep(0.05)
+        results = await resolver.resolve("rtupdate.example", 80)
+        assert results[0]["host"] == "192.0.2.11"
+
+        stats = resolver.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 3
+        assert stats["refreshes"] == 1
+        assert "p50" in stats["lookup"]
+        assert stats["nameservers"][nameserver]["queries"] == 2
+    finally:
+        await resolver.close()
+        stub.transport.close()
+
+
+async def test_fails_over_to_healthy_nameserver():
+    broken, broken_ns = await _start({"a.example": "192.0.2.1"})
+    slow, slow_ns = await _start({"a.example": "192.0.2.1"})
+    good, good_ns = await _start({"a.example": "192.0.2.2"})
+    broken.servfail = True
+    slow.delay = 0.5
+    resolver = CachingResolver(
+        [broken_ns, slow_ns, good_ns], min_ttl=0, hedge_delay=0.05
+    )
+    try:
+        results = await resolver.resolve("a.example")
+        assert results[0]["host"] == "192.0.2.2"
+        stats = resolver.stats()["nameservers"]
+        assert stats[broken_ns]["failures"] == 1
+        assert stats[good_ns]["score"] < stats[broken_ns]["score"]
+
+        # The healthy nameserver is asked first from now on
+        good.queries.clear()
+        broken.queries.clear()
+        await resolver.resolve("a.example")
+        assert good.queries and not broken.queries
+    finally:
+        await resolver.close()
+        for stub in (broken, slow, good):
+            stub.transport.close()
+
+
+async def test_unknown_host_and_stale_answers():
+    stub, nameserver = await _start({"a.example": "192.0.2.1"})
+    resolver = CachingResolver([nameserver], min_ttl=0.05, timeout=0.2)
+    try:
+        with pytest.raises(OSError):
+            await resolver.resolve("missing.example")
+
+        await resolver.resolve("a.example")
+        stub.servfail = True
+        await asyncio.sleep(0.06)
+        results = await resolver.resolve("a.example")
+        assert results[0]["host"] == "192.0.2.1"
+        assert resolver.stats()["stale"] == 1
+    finally:
+        await resolver.close()
+        stub.transport.close()
@@ -1,4 +1,6 @@
 from cloudweatherproxy.aiocloudweather.station import (
+    WEATHERCLOUD_PLAN,
+    WUNDERGROUND_PLAN,
     WeatherStation,
     WundergroundRawSensor,
     WeathercloudRawSensor,
@@ -91,3 +93,46 @@ def test_weather_station_from_weathercloud():
     assert weather_station.dailyrain.value == 2.5
     assert weather_station.dailyrain.unit == "mm"
     assert weather_station.winddirection.value == 288
+
+
+def test_wunderground_parse_plan():
+    instance_data = WUNDERGROUND_PLAN.cast_args(
+        {
+            "ID": "12345",
+            "PASSWORD": "12345",
+            "tempf": "72.5",
+            "UV": "2",
+            "baromin": "invalid",
+            "unknown": "1",
+        }
+    )
+
+    assert instance_data == {
+        "station_id": "12345",
+        "station_key": "12345",
+        "temperature": 72.5,
+        "uv": 2,
+        "barometer": "invalid",
+    }
+
+    solarradiation = WUNDERGROUND_PLAN.by_arg["solarRadiation"]
+    assert solarradiation.factor == 1000
+    assert solarradiation.unit == "lx"
+    assert WUNDERGROUND_PLAN.by_arg["solarradiation"].sensor_name == "solarradiation"
+    assert WUNDERGROUND_PLAN.by_arg["tempf"].unit == "°C"
+
+
+def test_weathercloud_parse_plan():
+    instance_data = WEATHERCLOUD_PLAN.cast_args(
+        {"wid": "12345", "key": "12345", "temp": "164", "hum": "80"}
+    )
+    weather_station = WeatherStation.from_weathercloud(
+        WeathercloudRawSensor(**instance_data)
+    )
+
+    assert weather_station.temperature.value == 16.4
+    assert weather_station.humidity.value == 80
+    assert all(
+        entry.attribute not in ("station_id", "station_key")
+        for entry in WEATHERCLOUD_PLAN.sensors
+    )
@@ -1,8 +1,17 @@
+import asyncio
+from dataclasses import FrozenInstanceError
+
 import pytest  # type: ignore[import-not-found]
 from aiohttp import web
+from aiohttp import ClientSession
+from aiohttp.test_utils import RawTestServer, make_mocked_request
+from cloudweatherproxy.aiocloudweather.proxy import CloudWeatherProxy
 from cloudweatherproxy.aiocloudweather.server import (
     CloudWeatherListener,
 )
+from cloudweatherproxy.aiocloudweather.sink import DataSink, ForwardRequest
+from cloudweatherproxy.aiocloudweather.station import WeatherStation, WeatherstationVendor
+from cloudweatherproxy.aiocloudweather.utils import iter_form_pairs
 
 
 @pytest.fixture
@@ -36,3 +45,184 @@ async def test_handler(client):
             for line in file:
                 request_url = line.strip()
                 await test_request(c, request_url)
+
+
+async def test_handler_stores_snapshot():
+    listener = CloudWeatherListener()
+    received: list[WeatherStation] = []
+
+    async def callback(station: WeatherStation) -> None:
+        received.append(station)
+
+    listener.new_dataset_cb.append(callback)
+    request = make_mocked_request(
+        "GET",
+        "/weatherstation/updateweatherstation.php?ID=abc&PASSWORD=x&tempf=50",
+        headers={"User-Agent": "lwIP/2.1.2", "X-Real-IP": "192.0.2.1"},
+    )
+    response = await listener.handler(request)
+
+    assert response.text == "OK"
+    assert listener.last_values["abc"] is received[0]
+    assert received[0].station_sw_version == "lwIP/2.1.2"
+    assert received[0].station_client_ip == "192.0.2.1"
+    assert received[0].update_time == listener.last_updates["abc"]
+    with pytest.raises(FrozenInstanceError):
+        received[0].update_time = 0  # type: ignore[misc]
+
+
+async def test_callbacks_are_isolated():
+    listener = CloudWeatherListener(callback_timeout=0.05)
+    received: list[WeatherStation] = []
+
+    async def failing(station: WeatherStation) -> None:
+        raise RuntimeError("boom")
+
+    async def slow(station: WeatherStation) -> None:
+        await asyncio.sleep(1)
+
+    async def working(station: WeatherStation) -> None:
+        received.append(station)
+
+    listener.new_dataset_cb.extend([failing, slow, working])
+    request = make_mocked_request(
+        "GET", "/v01/set/wid/abc/key/x/temp/150/hum/80"
+    )
+    response = await listener.handler(request)
+
+    assert response.text == "OK"
+    assert len(received) == 1
+    stats = {
+        name.rsplit(".", 1)[-1]: value
+        for name, value in listener.get_callback_stats().items()
+    }
+    assert stats["failing"]["failures"] == 1
+    assert stats["failing"]["last_error"] == "RuntimeError('boom')"
+    assert stats["slow"]["timeouts"] == 1
+    assert stats["working"]["calls"] == 1
+    assert stats["working"]["failures"] == 0
+
+
+ECOWITT_BODY = (
+    "PASSKEY=ABCDEF0123456789&stationtype=GW1100A_V2.1.4"
+    "&dateutc=2024-05-18+16%3A42%3A43&tempinf=72.1&humidityin=45"
+    "&baromrelin=29.920&baromabsin=29.800&tempf=50&humidity=44&winddir=249"
+    "&windspeedmph=2.01&windgustmph=2.68&solarradiation=289.20&uv=2"
+    "&rainratein=0.000&dailyrainin=0.100&model=GW1100A"
+)
+
+
+class _Chunks:
+    def __init__(self, body: bytes, size: int) -> None:
+        self.parts = [body[i:i + size] for i in range(0, len(body), size)]
+
+    async def iter_chunked(self, n: int):
+        for part in self.parts:
+            yield part
+
+
+@pytest.mark.parametrize("size", [1, 7, 4096])
+async def test_iter_form_pairs_across_chunks(size):
+    body = b"a=1&&b=x+y%26z&flag&c="
+    pairs = [pair async for pair in iter_form_pairs(_Chunks(body, size))]
+    assert pairs == [("a", "1"), ("b", "x y&z"), ("flag", ""), ("c", "")]
+
+
+async def test_iter_form_pairs_limits():
+    with pytest.raises(ValueError):
+        _ = [pair async for pair in iter_form_pairs(_Chunks(b"a=" + b"1" * 64, 8), max_pair=16)]
+    with pytest.raises(ValueError):
+        _ = [pair async for pair in iter_form_pairs(_Chunks(b"a=1&" * 64, 8), max_size=64)]
+
+
+async def test_ecowitt_post():
+    listener = CloudWeatherListener()
+    server = RawTestServer(listener.handler)
+    await server.start_server()
+    try:
+        async with ClientSession() as session:
+            response = await session.post(
+                server.make_url("/ecowitt/data/report/"),
+                data=ECOWITT_BODY,
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+            )
+            assert response.status == 200
+            invalid = await session.post(
+                server.make_url("/ecowitt/data/report"), data="tempf=50"
+            )
+            assert invalid.status == 400
+            other = await session.post(
+                server.make_url("/weatherstation/updateweatherstation.php"), data=""
+            )
+            assert other.status == 400
+    finally:
+        await server.close()
+
+    station = listener.last_values["ABCDEF0123456789"]
+    assert station.vendor is WeatherstationVendor.ECOWITT
+    assert station.temperature.value == 10.0
+    assert station.dailyrain.value == pytest.approx(2.54)
+    assert station.uv.value == 2
+    assert station.date_utc.value == "2024-05-18 16:42:43"
+    assert 'vendor="ecowitt"' in listener.metrics.render()
+
+
+async def test_ambient_get():
+    listener = CloudWeatherListener()
+    request = make_mocked_request("GET", f"/data/report?{ECOWITT_BODY}")
+    response = await listener.handler(request)
+
+    assert response.text == "OK"
+    assert listener.last_values["ABCDEF0123456789"].humidity.value == 44
+
+
+async def test_update_config_drains_old_proxy():
+    release = asyncio.Event()
+
+    async def upstream(request: web.BaseRequest) -> web.Response:
+        await release.wait()
+        return web.Response(text="OK")
+
+    server = RawTestServer(upstream)
+    await server.start_server()
+    base = str(server.make_url("")).rstrip("/")
+    listener = CloudWeatherListener()
+    listener._create_proxy = lambda: CloudWeatherProxy(  # type: ignore[method-assign]
+        listener.proxy_sinks,
+        listener.dns_servers,
+        listener.forward_intervals,
+        upstream_urls={DataSink.WUNDERGROUND: base},
+    )
+    try:
+        await listener.update_config(proxy_sinks=[DataSink.WUNDERGROUND])
+        old = listener.proxy
+        assert old is not None
+        forward = asyncio.create_task(
+            listener._forward(DataSink.WUNDERGROUND, ForwardRequest("/x", "ID=a"))
+        )
+        while not old.in_flight:
+            await asyncio.sleep(0.01)
+
+        await listener.update_config(
+            proxy_sinks=[DataSink.WUNDERGROUND], dns_servers=["127.0.0.2"]
+        )
+        assert listener.proxy is not old
+        assert not old.session.closed
+
+        release.set()
+        assert await forward == 200
+        await asyncio.gather(*listener._background_tasks)
+        assert old.session.closed
+
+        # An unchanged configuration keeps the proxy and its connections
+        current = listener.proxy
+        await listener.update_config(
+            proxy_sinks=[DataSink.WUNDERGROUND],
+            dns_servers=["127.0.0.2"],
+            forward_intervals={DataSink.WUNDERGROUND: 60},
+        )
+        assert listener.proxy is current
+        assert current.rate_limiter.min_intervals == {DataSink.WUNDERGROUND: 60}
+    finally:
+        await listener.stop()
+        await server.close()
@@ -0,0 +1,79 @@
+import multiprocessing
+import socket
+
+from cloudweatherproxy.aiocloudweather.server import CloudWeatherListener
+from cloudweatherproxy.aiocloudweather.sharedvalues import SharedValuesTable
+
+
+def test_write_read_and_snapshot(make_station):
+    context = multiprocessing.get_context("fork")
+    table = SharedValuesTable.create(4, context.Lock())
+    try:
+        assert table.write(make_station("a", 1.0, temperature=10.0))
+        assert table.write(make_station("b", 1.0, temperature=20.0))
+        assert table.write(make_station("a", 2.0, temperature=11.0, humidity=50))
+
+        assert table.read("a") == {
+            "update_time": 2.0,
+            "temperature": 11.0,
+            "humidity": 50.0,
+        }
+        assert table.read("missing") is None
+        assert set(table.snapshot()) == {"a", "b"}
+
+        assert not table.write(make_station("x" * 65, 1.0))
+        assert table.write(make_station("c", 1.0))
+        assert table.write(make_station("d", 1.0))
+        assert not table.write(make_station("e", 1.0))
+    finally:
+        table.close()
+
+
+def _writer(name: str, lock, rounds: int, make_station) -> None:
+    table = SharedValuesTable.attach(name, lock)
+    for value in range(rounds):
+        table.write(
+            make_station(
+                "fleet", 1.0, temperature=value, humidity=value, barometer=value
+            )
+        )
+    table.close()
+
+
+def test_readers_never_see_torn_writes(make_station):
+    context = multiprocessing.get_context("fork")
+    lock = context.Lock()
+    table = SharedValuesTable.create(8, lock)
+    table.write(make_station("fleet", 1.0, temperature=0, humidity=0, barometer=0))
+    writers = [
+        context.Process(target=_writer, args=(table.name, lock, 3000, make_station))
+        for _ in range(2)
+    ]
+    for writer in writers:
+        writer.start()
+    reader = SharedValuesTable.attach(table.name)
+    try:
+        while any(writer.is_alive() for writer in writers):
+            values = reader.read("fleet")
+            assert values is not None
+            assert values["temperature"] == values["humidity"] == values["barometer"]
+        for writer in writers:
+            writer.join()
+            assert writer.exitcode == 0
+        assert reader.read("fleet")["temperature"] == 2999.0
+    finally:
+        reader.close()
+        table.close()
+
+
+async def test_listeners_share_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    listeners = [CloudWeatherListener(port=port, reuse_port=True) for _ in range(2)]
+    try:
+        for listener in listeners:
+            await listener.start()
+    finally:
+        for listener in listeners:
+            await listener.stop()
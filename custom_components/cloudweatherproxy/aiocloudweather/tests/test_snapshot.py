@@ -0,0 +1,83 @@
+import json
+import time
+import zlib
+
+from aiohttp.test_utils import make_mocked_request
+from cloudweatherproxy.aiocloudweather.server import CloudWeatherListener
+from cloudweatherproxy.aiocloudweather.snapshot import (
+    SNAPSHOT_VERSION,
+    SnapshotConfig,
+    StationSnapshot,
+    encode_station,
+)
+from cloudweatherproxy.aiocloudweather.station import (
+    Sensor,
+    WeatherStation,
+    WeatherstationVendor,
+)
+
+
+async def test_snapshot_survives_restart(tmp_path):
+    config = SnapshotConfig(path=str(tmp_path / "snapshot"), interval=3600)
+    listener = CloudWeatherListener(snapshot=config)
+    await listener.restore_snapshot()
+    request = make_mocked_request(
+        "GET",
+        "/weatherstation/updateweatherstation.php?ID=abc&PASSWORD=secret&tempf=50",
+        headers={"User-Agent": "lwIP/2.1.2"},
+    )
+    await listener.handler(request)
+    await listener.stop()
+
+    raw = (tmp_path / "snapshot").read_bytes()
+    assert b"secret" not in zlib.decompress(raw)
+    assert not (tmp_path / "snapshot.tmp").exists()
+
+    restarted = CloudWeatherListener(snapshot=config)
+    await restarted.restore_snapshot()
+    try:
+        restored = restarted.last_values["abc"]
+        original = listener.last_values["abc"]
+        assert restored.station_key == ""
+        assert restored.temperature == original.temperature
+        assert restored.station_sw_version == "lwIP/2.1.2"
+        assert restored.update_time == restarted.last_updates["abc"]
+        assert time.monotonic() - restored.update_time < 5
+        assert restarted.stations == ["abc"]
+        assert restarted.snapshot_stats()["restored"] == 1
+        assert not restarted.stale_stations
+    finally:
+        await restarted.stop()
+
+
+async def test_old_datasets_are_stale(tmp_path):
+    path = tmp_path / "snapshot"
+    station = WeatherStation(
+        station_id="old",
+        station_key="secret",
+        vendor=WeatherstationVendor.WEATHERCLOUD,
+        temperature=Sensor("temperature", 10.0, "°C"),
+    )
+    document = {
+        "version": SNAPSHOT_VERSION,
+        "stations": [encode_station(station, time.time() - 7200)],
+    }
+    path.write_bytes(zlib.compress(json.dumps(document).encode()))
+
+    listener = CloudWeatherListener(
+        snapshot=SnapshotConfig(path=str(path), max_age=3600)
+    )
+    await listener.restore_snapshot()
+    assert listener.stale_stations == {"old"}
+    assert time.monotonic() - listener.last_updates["old"] > 7000
+    assert listener.last_values["old"].temperature == station.temperature
+    # Nothing changed, the snapshot is not rewritten
+    await listener.stop()
+    assert listener.snapshot_stats()["saves"] == 0
+
+
+async def test_corrupt_snapshot_is_ignored(tmp_path):
+    path = tmp_path / "snapshot"
+    path.write_bytes(b"not a snapshot")
+    snapshot = StationSnapshot(SnapshotConfig(path=str(path)), dict)
+    assert await snapshot.load() == []
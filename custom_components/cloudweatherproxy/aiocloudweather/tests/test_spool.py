@@ -0,0 +1,162 @@
+import asyncio
+
+from aiohttp.test_utils import make_mocked_request
+
+from cloudweatherproxy.aiocloudweather.proxy import ForwardRequest
+from cloudweatherproxy.aiocloudweather.server import CloudWeatherListener
+from cloudweatherproxy.aiocloudweather.sink import FORWARD_REJECTED, DataSink
+from cloudweatherproxy.aiocloudweather.spool import ForwardSpool, SpoolConfig
+
+
+def _config(tmp_path, **kwargs) -> SpoolConfig:
+    defaults = {
+        "replay_interval": 0,
+        "backoff_initial": 0.01,
+        "backoff_max": 0.02,
+        "fsync_interval": 0.01,
+    }
+    defaults.update(kwargs)
+    return SpoolConfig(directory=str(tmp_path), **defaults)
+
+
+async def _wait_for(predicate, timeout: float = 2.0) -> None:
+    async def poll() -> None:
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def test_spool_replays_with_backoff(tmp_path):
+    statuses = [None, 503, 200, 200, 400]
+    replayed: list[ForwardRequest] = []
+
+    async def forward(request: ForwardRequest) -> int | None:
+        status = statuses.pop(0)
+        if status == 200:
+            replayed.append(request)
+        return status
+
+    spool = ForwardSpool(_config(tmp_path), "wunderground")
+    for idx in range(3):
+        await spool.append(ForwardRequest("/path", f"ID={idx}"))
+    assert len(list((tmp_path / "wunderground").iterdir())) == 1
+
+    spool.start(forward)
+    await _wait_for(lambda: not statuses)
+    await spool.stop()
+
+    assert [request.query_string for request in replayed] == ["ID=0", "ID=1"]
+    assert spool.stats() == {
+        "spooled": 3,
+        "replayed": 2,
+        "expired": 0,
+        "discarded": 1,
+    }
+    assert not list((tmp_path / "wunderground").iterdir())
+
+
+async def test_spool_expires_old_records(tmp_path):
+    forwarded: list[ForwardRequest] = []
+
+    async def forward(request: ForwardRequest) -> int | None:
+        forwarded.append(request)
+        return 200
+
+    spool = ForwardSpool(_config(tmp_path, max_age=0.05), "weathercloud")
+    await spool.append(ForwardRequest("/v01/set/old", ""))
+    await asyncio.sleep(0.1)
+    # Reading the segment keeps its unexpired records only
+    await spool.append(ForwardRequest("/v01/set/new", ""))
+    spool.start(forward)
+    await _wait_for(lambda: spool.expired + len(forwarded) >= 2)
+    await spool.stop()
+
+    assert [request.path for request in forwarded] == ["/v01/set/new"]
+    assert spool.expired == 1
+
+
+async def test_spool_discards_poison_records(tmp_path):
+    statuses = [FORWARD_REJECTED, None, None, None, 200]
+
+    async def forward(request: ForwardRequest) -> int | None:
+        return statuses.pop(0)
+
+    spool = ForwardSpool(_config(tmp_path, max_attempts=2), "wunderground")
+    for idx in range(3):
+        await spool.append(ForwardRequest("/path", f"ID={idx}"))
+    spool.start(forward)
+    await _wait_for(lambda: not statuses)
+    await spool.stop()
+
+    # Rejected at once, given up after two attempts, then delivered
+    assert spool.stats() == {
+        "spooled": 3,
+        "replayed": 1,
+        "expired": 0,
+        "discarded": 2,
+    }
+
+
+async def test_spool_expires_records_while_retrying(tmp_path):
+    attempts = 0
+
+    async def forward(request: ForwardRequest) -> int | None:
+        nonlocal attempts
+        attempts += 1
+        return None
+
+    spool = ForwardSpool(
+        _config(tmp_path, max_age=0.1, backoff_initial=0.02, backoff_max=0.02),
+        "wunderground",
+    )
+    await spool.append(ForwardRequest("/path", "ID=0"))
+    spool.start(forward)
+    await _wait_for(lambda: spool.expired == 1)
+    await spool.stop()
+    assert attempts > 1
+
+
+async def test_disabled_sink_is_rejected(tmp_path):
+    listener = CloudWeatherListener(spool=_config(tmp_path))
+    request = ForwardRequest("/weatherstation/updateweatherstation.php", "ID=a")
+    assert await listener._forward(DataSink.WUNDERGROUND, request) == FORWARD_REJECTED
+    assert not await listener._forward_or_spool(DataSink.WUNDERGROUND, request)
+    assert not listener.spools
+    await listener.stop()
+
+
+async def test_spool_drains_after_restart(tmp_path):
+    spool = ForwardSpool(_config(tmp_path), DataSink.WUNDERGROUND.value)
+    await spool.append(ForwardRequest("/path", "ID=0"))
+    await spool.stop()
+
+    listener = CloudWeatherListener(
+        proxy_sinks=[DataSink.WUNDERGROUND], spool=_config(tmp_path)
+    )
+    forwarded: list[str] = []
+
+    async def forward(sink: DataSink, request: ForwardRequest) -> int | None:
+        forwarded.append(request.query_string)
+        return 200
+
+    listener._forward = forward  # type: ignore[method-assign]
+    try:
+        # No live forward has to fail before the spooled requests are replayed
+        await listener.handler(make_mocked_request("GET", "/unknown"))
+        await _wait_for(lambda: forwarded == ["ID=0"])
+    finally:
+        await listener.stop()
+
+
+async def test_spool_size_cap(tmp_path):
+    spool = ForwardSpool(
+        _config(tmp_path, segment_bytes=100, max_bytes=250), "wunderground"
+    )
+    for idx in range(20):
+        await spool.append(ForwardRequest("/path", f"ID={idx:04d}&tempf=50"))
+    await spool.stop()
+
+    segments = list((tmp_path / "wunderground").iterdir())
+    assert sum(path.stat().st_size for path in segments) <= 250 + 100
+    assert spool.discarded > 0
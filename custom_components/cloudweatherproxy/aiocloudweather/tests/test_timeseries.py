@@ -0,0 +1,34 @@
+import pytest  # type: ignore[import-not-found]
+
+from cloudweatherproxy.aiocloudweather.timeseries import RingBuffer, StationHistory
+
+
+def test_ring_buffer_windows_wrap_around():
+    buffer = RingBuffer(4)
+    assert buffer.stats(10, now=0) is None
+
+    for timestamp in range(6):
+        buffer.append(timestamp, timestamp * 10)
+
+    assert len(buffer) == 4
+    times, values = buffer.window(100, now=5)
+    assert list(times) == [2, 3, 4, 5]
+    assert list(values) == [20, 30, 40, 50]
+
+    stats = buffer.stats(2, now=5)
+    assert stats is not None
+    assert (stats.count, stats.min, stats.max, stats.sum) == (3, 30, 50, 120)
+    assert stats.mean == pytest.approx(40)
+    assert buffer.stats(1, now=100) is None
+
+
+def test_station_history_records_sensors(make_station):
+    history = StationHistory(capacity=8)
+    for timestamp, value in enumerate((10.0, 12.0, 11.0)):
+        history.record(make_station(update_time=timestamp, temperature=value))
+
+    stats = history.stats("temperature", 10, now=2)
+    assert stats is not None
+    assert (stats.count, stats.min, stats.max) == (3, 10.0, 12.0)
+    assert history.stats("humidity", 10, now=2) is None
+    assert history.nbytes == 8 * 8 * 2
@@ -0,0 +1,36 @@
+from aiohttp.test_utils import make_mocked_request
+from cloudweatherproxy.aiocloudweather.server import CloudWeatherListener
+from cloudweatherproxy.aiocloudweather.timing import PercentileSketch, StageTimings
+
+
+def test_percentiles_roll_over():
+    sketch = PercentileSketch(capacity=100)
+    for value in range(1, 101):
+        sketch.record(value)
+
+    assert sketch.percentiles() == {"p50": 50, "p95": 95, "p99": 99}
+
+    for _ in range(100):
+        sketch.record(1000)
+    assert sketch.percentiles() == {"p50": 1000, "p95": 1000, "p99": 1000}
+    assert sketch.count == 200
+
+
+def test_empty_stage_summary():
+    timings = StageTimings()
+    assert timings.summary() == {}
+    timings.record("parse", 0.5)
+    assert timings.summary() == {
+        "parse": {"count": 1, "p50": 0.5, "p95": 0.5, "p99": 0.5}
+    }
+
+
+async def test_handler_records_stages():
+    listener = CloudWeatherListener()
+    await listener.handler(
+        make_mocked_request("GET", "/v01/set/wid/abc/key/x/temp/150/hum/80")
+    )
+
+    timings = listener.get_stage_timings()
+    assert set(timings) == {"parse", "convert", "callbacks"}
+    assert all(stage["count"] == 1 for stage in timings.values())
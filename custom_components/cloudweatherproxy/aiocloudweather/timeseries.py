@@ -0,0 +1,189 @@
+"""Fixed-capacity in-memory time series of station sensor values.
+
+Every sensor of a station gets a ring buffer of (monotonic time, value)
+samples in two preallocated `array("d")` columns, so appending never
+allocates and the memory footprint is bounded by the capacity:
+16 bytes per sample, sensor and station. Window statistics use NumPy views
+on the same memory when NumPy is installed.
+"""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from functools import cache
+import math
+import time
+from typing import Any
+
+from .station import SENSOR_FIELDS, WeatherStation
+
+
+@cache
+def _numpy() -> Any:
+    """Import NumPy on first use, None if it is not installed."""
+    try:
+        import numpy as np  # pylint: disable=import-outside-toplevel
+    except Exception:
+        return None
+    return np
+
+
+@dataclass(frozen=True)
+class WindowStats:
+    """Aggregates of the samples inside a trailing time window."""
+
+    count: int
+    min: float
+    max: float
+    mean: float
+    sum: float
+
+
+class RingBuffer:
+    """Fixed-capacity ring buffer of (monotonic time, value) samples.
+
+    Samples must be appended in time order; the oldest sample is overwritten
+    once the buffer is full.
+    """
+
+    __slots__ = ("_np_times", "_np_values", "_next", "_size", "capacity", "times", "values")
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize an empty buffer holding up to `capacity` samples."""
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self._next = 0
+        self._size = 0
+        self._np_times: Any = None
+        self._np_values: Any = None
+        np = _numpy()
+        if np is not None:
+            self._np_times = np.frombuffer(self.times, dtype=np.float64)
+            self._np_values = np.frombuffer(self.values, dtype=np.float64)
+
+    def __len__(self) -> int:
+        """Return the number of stored samples."""
+        return self._size
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Append a sample in O(1)."""
+        index = self._next
+        self.times[index] = timestamp
+        self.values[index] = value
+        self._next = (index + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def _segments(self, window: float, now: float | None) -> list[tuple[int, int]]:
+        """Return the physical index ranges of the samples inside `window`."""
+        size = self._size
+        if not size:
+            return []
+        capacity = self.capacity
+        oldest = (self._next - size) % capacity
+        since = (time.monotonic() if now is None else now) - window
+
+        # Binary search for the first logical index inside the window
+        times = self.times
+        low, high = 0, size
+        while low < high:
+            mid = (low + high) // 2
+            if times[(oldest + mid) % capacity] < since:
+                low = mid + 1
+            else:
+                high = mid
+        count = size - low
+        if not count:
+            return []
+
+        start = (oldest + low) % capacity
+        if start + count <= capacity:
+            return [(start, start + count)]
+        return [(start, capacity), (0, start + count - capacity)]
+
+    def window(
+        self, window: float, now: float | None = None
+    ) -> tuple[array, array]:
+        """Return copies of the times and values of the trailing `window` seconds."""
+        times = array("d")
+        values = array("d")
+        for start, stop in self._segments(window, now):
+            times.extend(self.times[start:stop])
+            values.extend(self.values[start:stop])
+        return times, values
+
+    def stats(self, window: float, now: float | None = None) -> WindowStats | None:
+        """Return min/max/mean/sum of the trailing `window` seconds.
+
+        Returns None if there are no samples inside the window.
+        """
+        segments = self._segments(window, now)
+        if not segments:
+            return None
+
+        count = sum(stop - start for start, stop in segments)
+        if self._np_values is not None:
+            parts = [self._np_values[start:stop] for start, stop in segments]
+            minimum = min(float(part.min()) for part in parts)
+            maximum = max(float(part.max()) for part in parts)
+            total = math.fsum(float(part.sum()) for part in parts)
+        else:
+            view = memoryview(self.values)
+            parts = [view[start:stop] for start, stop in segments]
+            minimum = min(min(part) for part in parts)
+            maximum = max(max(part) for part in parts)
+            total = math.fsum(math.fsum(part) for part in parts)
+        return WindowStats(
+            count=count, min=minimum, max=maximum, mean=total / count, sum=total
+        )
+
+
+class StationHistory:
+    """Ring buffers of all sensors of a single station."""
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize the history keeping `capacity` samples per sensor."""
+        self.capacity = capacity
+        self.sensors: dict[str, RingBuffer] = {}
+
+    def record(self, station: WeatherStation, timestamp: float | None = None) -> None:
+        """Append every numeric sensor value of `station`.
+
+        The station's `update_time` is used unless `timestamp` is given.
+        """
+        if timestamp is None:
+            timestamp = station.update_time
+            if timestamp is None:
+                timestamp = time.monotonic()
+        for name in SENSOR_FIELDS:
+            sensor = getattr(station, name)
+            if sensor is None:
+                continue
+            value = sensor.value
+            if not isinstance(value, (int, float)):
+                continue
+            buffer = self.sensors.get(name)
+            if buffer is None:
+                buffer = self.sensors[name] = RingBuffer(self.capacity)
+            buffer.append(timestamp, value)
+
+    def stats(
+        self, sensor: str, window: float, now: float | None = None
+    ) -> WindowStats | None:
+        """Return the window statistics of `sensor`, None if it has no samples."""
+        buffer = self.sensors.get(sensor)
+        if buffer is None:
+            return None
+        return buffer.stats(window, now)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the sample columns."""
+        return sum(
+            buffer.times.itemsize * buffer.capacity * 2
+            for buffer in self.sensors.values()
+        )
@@ -0,0 +1,81 @@
+"""Rolling latency percentiles of the request handling stages.
+
+Each stage keeps the durations of its last `capacity` samples in a
+preallocated `array("d")`, so recording is a single store and never
+allocates. Percentiles are computed from a sorted copy only when they are
+read, e.g. for the diagnostics download.
+"""
+
+from __future__ import annotations
+
+from array import array
+import math
+from typing import Any
+
+STAGE_PARSE = "parse"
+STAGE_CONVERT = "convert"
+STAGE_CALLBACKS = "callbacks"
+STAGE_FORWARD = "forward"
+STAGE_UPSTREAM_READ = "upstream_read"
+
+DEFAULT_PERCENTILES: tuple[float, ...] = (50, 95, 99)
+
+
+class PercentileSketch:
+    """Percentiles over the last `capacity` samples."""
+
+    __slots__ = ("_next", "capacity", "count", "samples")
+
+    def __init__(self, capacity: int = 1024) -> None:
+        """Initialize an empty sketch."""
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.samples = array("d", bytes(8 * capacity))
+        self.count = 0
+        self._next = 0
+
+    def record(self, value: float) -> None:
+        """Record a sample, replacing the oldest one once full."""
+        index = self._next
+        self.samples[index] = value
+        self._next = index + 1 if index + 1 < self.capacity else 0
+        self.count += 1
+
+    def percentiles(
+        self, percentiles: tuple[float, ...] = DEFAULT_PERCENTILES
+    ) -> dict[str, float]:
+        """Return the nearest-rank percentiles of the retained samples."""
+        size = min(self.count, self.capacity)
+        if not size:
+            return {}
+        ordered = sorted(self.samples[:size])
+        return {
+            f"p{percentile:g}": ordered[
+                max(0, math.ceil(percentile / 100 * size) - 1)
+            ]
+            for percentile in percentiles
+        }
+
+
+class StageTimings:
+    """Percentile sketches of the durations of each handling stage."""
+
+    def __init__(self, capacity: int = 1024) -> None:
+        """Initialize the sketches keeping `capacity` samples per stage."""
+        self.capacity = capacity
+        self.stages: dict[str, PercentileSketch] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record the duration of a stage."""
+        sketch = self.stages.get(stage)
+        if sketch is None:
+            sketch = self.stages[stage] = PercentileSketch(self.capacity)
+        sketch.record(seconds)
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Return the sample count and p50/p95/p99 in seconds per stage."""
+        return {
+            stage: {"count": sketch.count, **sketch.percentiles()}
+            for stage, sketch in self.stages.items()
+        }
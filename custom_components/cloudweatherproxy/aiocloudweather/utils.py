@@ -2,31 +2,39 @@
 
 This module provides two small helpers used across the package:
 - `LimitedSizeQueue`: a simple asyncio.Queue variant that discards the
-  oldest item when full.
+  oldest item when full and counts what it discarded.
 - `resolve_caster` / `cast_value`: helpers to resolve typing hints
   (including Optional/Union) into a usable caster and cast values
   extracted from incoming requests.
+- `iter_form_pairs`: an incremental parser of url-encoded form bodies.
 """
 
 import asyncio
 import contextlib
 import logging
 import re
-from typing import Any, get_args
-from collections.abc import Callable
+from typing import Any, Protocol, get_args
+from collections.abc import AsyncIterator, Callable
+from urllib.parse import unquote_plus
 
 
 class LimitedSizeQueue(asyncio.Queue):
     """Queue with fixed maximum size that drops oldest items when full.
 
-    This is a tiny convenience used for in-memory log buffering.
+    This is a tiny convenience used for in-memory log buffering and the
+    forwarding queue. The number of discarded items is kept in `dropped`.
     """
 
+    dropped: int = 0
+
     def put_nowait(self, item: Any) -> None:
         """Put `item` without blocking; drop oldest when the queue is full."""
         if self.full():
-            with contextlib.suppress(Exception):
+            with contextlib.suppress(asyncio.QueueEmpty):
                 self.get_nowait()
+                # The dropped item will never be processed, keep join() working
+                self.task_done()
+                self.dropped += 1
         super().put_nowait(item)
 
 
@@ -113,3 +121,53 @@ def cast_value(type_hint: Any, value: Any) -> Any:
         # Caller will log casting/validation failures; fall back to raw value
         pass
     return value
+
+
+class ChunkedStream(Protocol):
+    """A body stream like `aiohttp.StreamReader`."""
+
+    def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        """Iterate over chunks of at most `n` bytes."""
+
+
+def _decode_pair(pair: bytes) -> tuple[str, str]:
+    """Decode a single `key=value` pair of a url-encoded form."""
+    key, _, value = pair.partition(b"=")
+    return (
+        unquote_plus(key.decode("utf-8", "replace")),
+        unquote_plus(value.decode("utf-8", "replace")),
+    )
+
+
+async def iter_form_pairs(
+    stream: ChunkedStream,
+    chunk_size: int = 1024,
+    max_pair: int = 1024,
+    max_size: int = 65536,
+) -> AsyncIterator[tuple[str, str]]:
+    """Yield the `(key, value)` pairs of a url-encoded form body as they arrive.
+
+    Only the incomplete pair at the end of the last chunk is kept, so the
+    body is never buffered as a whole. Empty pairs are skipped and a pair
+    without `=` has an empty value, like `parse_qsl(keep_blank_values=True)`.
+
+    Raises:
+        ValueError: If a single pair exceeds `max_pair` bytes or the body
+            exceeds `max_size` bytes.
+
+    """
+    pending = b""
+    size = 0
+    async for chunk in stream.iter_chunked(chunk_size):
+        size += len(chunk)
+        if size > max_size:
+            raise ValueError(f"Form body exceeds {max_size} bytes")
+        *pairs, pending = (pending + chunk).split(b"&")
+        for pair in (*pairs, pending):
+            if len(pair) > max_pair:
+                raise ValueError(f"Form field exceeds {max_pair} bytes")
+        for pair in pairs:
+            if pair:
+                yield _decode_pair(pair)
+    if pending:
+        yield _decode_pair(pending)
@@ -8,7 +8,7 @@ from typing import Any
 import voluptuous as vol
 
 from .aiocloudweather import CloudWeatherListener
-from .aiocloudweather.proxy import DataSink
+from .aiocloudweather.sink import DataSink
 
 from yarl import URL
 
@@ -81,29 +81,23 @@ class CloudWeatherProxyConfigFlow(ConfigFlow, domain=DOMAIN):
                 proxy_sinks.append(DataSink.WUNDERGROUND)
             if user_input[CONF_WEATHERCLOUD_PROXY]:
                 proxy_sinks.append(DataSink.WEATHERCLOUD)
+            self._abort_if_unique_id_mismatch()
+            # The listener swaps its proxy in place, a reload would drop the
+            # forwards in flight and the warm connections
             await listener.update_config(
                 proxy_sinks=proxy_sinks or None,
                 dns_servers=user_input[CONF_DNS_SERVERS].split(",")
             )
-
-            # Ensure the listener's internal state is consistent (aiocloudweather may not
-            # update all internal fields on reconfiguration).
-            listener.proxy_sinks = proxy_sinks or []
-            listener.dns_servers = user_input[CONF_DNS_SERVERS].split(",")
-            listener.proxy_enabled = bool(proxy_sinks and len(proxy_sinks) > 0)
-            if not proxy_sinks and listener.proxy:
-                await listener.proxy.close()
-                listener.proxy = None
-
-            self._abort_if_unique_id_mismatch()
-            return self.async_update_reload_and_abort(
+            self.hass.config_entries.async_update_entry(
                 config_entry,
-                data_updates={
+                data={
+                    **config_entry.data,
                     CONF_WUNDERGROUND_PROXY: user_input[CONF_WUNDERGROUND_PROXY],
                     CONF_WEATHERCLOUD_PROXY: user_input[CONF_WEATHERCLOUD_PROXY],
                     CONF_DNS_SERVERS: user_input[CONF_DNS_SERVERS],
                 },
             )
+            return self.async_abort(reason="reconfigure_successful")
 
         return self.async_show_form(
             step_id="reconfigure",
@@ -90,6 +90,30 @@ UNIT_DESCRIPTION_MAPPING: Final = {
     ),
 }
 
+# A sensor state is written at once when its value moved by at least the
+# deadband of its device class, smaller changes at most once per
+# STATE_MIN_WRITE_INTERVAL seconds. Availability changes are always written
+# and unchanged states are refreshed after STATE_MAX_STALENESS seconds.
+STATE_DEADBAND: Final[dict[SensorDeviceClass | None, float]] = {
+    SensorDeviceClass.PRESSURE: 0.1,
+    SensorDeviceClass.TEMPERATURE: 0.1,
+    SensorDeviceClass.HUMIDITY: 1,
+    SensorDeviceClass.WIND_SPEED: 0.1,
+    SensorDeviceClass.IRRADIANCE: 1,
+    SensorDeviceClass.ILLUMINANCE: 100,
+}
+STATE_MIN_WRITE_INTERVAL: Final = 10
+STATE_MAX_STALENESS: Final = 300
+
 CONF_WUNDERGROUND_PROXY: Final = "weatherunderground_proxy"
 CONF_WEATHERCLOUD_PROXY: Final = "weathercloud_proxy"
 CONF_DNS_SERVERS: Final = "dns_servers"
+
+# Station requests are answered before being forwarded upstream
+FORWARD_QUEUE_SIZE: Final = 100
+FORWARD_WORKERS: Final = 2
+
+# The latest datasets are written to disk every SNAPSHOT_INTERVAL seconds and
+# restored on startup; datasets older than SNAPSHOT_MAX_AGE are marked stale.
+SNAPSHOT_INTERVAL: Final = 60
+SNAPSHOT_MAX_AGE: Final = 3600
@@ -46,6 +46,8 @@ async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: CloudWe
             "unit": entity.sensor.unit if entity.sensor else None,
             "available": entity.available,
             "enabled": entity.enabled,
+            "writes_emitted": entity.writes_emitted,
+            "writes_suppressed": entity.writes_suppressed,
         }
 
     # Apply masking to logs
@@ -65,6 +67,16 @@ async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: CloudWe
     return {
         "known_sensors": formatted_sensors,
         "entry_data": formatted_entry_data,
+        "state_writes": {
+            "emitted": sum(entity.writes_emitted for entity in known_sensors.values()),
+            "suppressed": sum(
+                entity.writes_suppressed for entity in known_sensors.values()
+            ),
+        },
+        "forwarding": runtime_data.listener.forward_stats(),
+        "callbacks": runtime_data.listener.get_callback_stats(),
+        "stage_timings": runtime_data.listener.get_stage_timings(),
+        "snapshot": runtime_data.listener.snapshot_stats(),
         "logs": {
             "recent": masked_logs,
         },
@@ -11,7 +11,13 @@ from homeassistant.components.sensor import SensorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity import Entity
 
-from .const import DOMAIN, UNIT_DESCRIPTION_MAPPING
+from .const import (
+    DOMAIN,
+    STATE_DEADBAND,
+    STATE_MAX_STALENESS,
+    STATE_MIN_WRITE_INTERVAL,
+    UNIT_DESCRIPTION_MAPPING,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -65,6 +71,41 @@ class CloudWeatherEntity(CloudWeatherBaseEntity, SensorEntity):
                     continue
         if description is not None:
             self.entity_description = description
+        self._deadband: float = STATE_DEADBAND.get(
+            description.device_class if description else None, 0
+        )
+
+        # The initial state is written when the entity is added
+        self._written_value = self._attr_native_value
+        self._written_available = self._attr_available
+        self._written_at = time.monotonic()
+        self.writes_emitted = 0
+        self.writes_suppressed = 0
+
+    def _should_write_state(self, now: float) -> bool:
+        """Return whether the current state differs enough from the written one.
+
+        Changes of at least the deadband are written at once; smaller ones
+        at most every STATE_MIN_WRITE_INTERVAL seconds, so a device class
+        without a deadband never holds back a change.
+        """
+        if self._attr_available != self._written_available:
+            return True
+        if now - self._written_at >= STATE_MAX_STALENESS:
+            return True
+
+        value = self._attr_native_value
+        written = self._written_value
+        if value == written:
+            return False
+        if value is None or written is None:
+            return True
+        try:
+            if abs(value - written) >= self._deadband:  # type: ignore[operator]
+                return True
+        except TypeError:
+            return True
+        return now - self._written_at >= STATE_MIN_WRITE_INTERVAL
 
     async def update_sensor(self, station: WeatherStation) -> None:
         """Update the entity."""
@@ -79,6 +120,15 @@ class CloudWeatherEntity(CloudWeatherBaseEntity, SensorEntity):
         self._attr_available = (station.update_time is not None) and (
             (station.update_time + 5 * 60) > time.monotonic())
 
+        now = time.monotonic()
+        if not self._should_write_state(now):
+            self.writes_suppressed += 1
+            return
+
         _LOGGER.debug("Updating %s [%s] with update time %s",
                       self.unique_id, self.sensor, self.station.update_time)
+        self._written_value = self._attr_native_value
+        self._written_available = self._attr_available
+        self._written_at = now
+        self.writes_emitted += 1
         self.async_write_ha_state()
@@ -27,7 +27,7 @@ async def async_setup_entry(
     async def _new_dataset(station: WeatherStation) -> None:
         known_sensors: dict[str,
                             CloudWeatherEntity] = runtime_data.known_sensors
-        new_sensors: list[CloudWeatherEntity] = []
+        new_sensors: dict[str, CloudWeatherEntity] = {}
 
         for field in fields(station):
             field_type = field.type
@@ -47,15 +47,24 @@ async def async_setup_entry(
                 continue
 
             meta_name = field.metadata.get("name") or sensor.name
-            new_sensor = CloudWeatherEntity(sensor, station, str(meta_name))
-            known_sensors[unique_id] = new_sensor
-            new_sensors.append(new_sensor)
+            new_sensors[unique_id] = CloudWeatherEntity(
+                sensor, station, str(meta_name))
 
         if len(new_sensors) > 0:
             _LOGGER.debug("Adding %d sensors", len(new_sensors))
-            async_add_entities(new_sensors)
-        for nsensor in new_sensors:
-            nsensor.async_write_ha_state()
+            # Registered once all of them were built, the initial state is
+            # written by Home Assistant when they are added
+            known_sensors.update(new_sensors)
+            async_add_entities(list(new_sensors.values()))
+
+    # Datasets restored from the snapshot, their stations do not have to
+    # report again before the sensors are created
+    for station in list(cloudweather.last_values.values()):
+        try:
+            await _new_dataset(station)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception(
+                "Skipping the restored dataset of station %s", station.station_id)
 
     cloudweather.new_dataset_cb.append(_new_dataset)
     entry.async_on_unload(
@@ -66,3 +66,35 @@ class WeathercloudReceiver(HomeAssistantView):
         except HTTPClientError as e:
             _LOGGER.error(e)
             return web.Response(status=HTTPStatus.BAD_REQUEST)
+
+
+class EcowittReceiver(HomeAssistantView):
+    """Ecowitt and Ambient Weather custom server receiver."""
+
+    name = f"api:{DOMAIN}:ecowitt"
+    url = "/ecowitt/data/report"
+    extra_urls = ["/ecowitt/data/report/"]
+
+    def __init__(self, listener: CloudWeatherListener) -> None:
+        """Initialize the Ecowitt receiver."""
+        self.listener = listener
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Handle Ecowitt request."""
+
+        if not request[KEY_AUTHENTICATED]:
+            return web.Response(status=HTTPStatus.UNAUTHORIZED)
+
+        try:
+            return await self.listener.handler(request)
+        except HTTPClientError as e:
+            _LOGGER.error(e)
+            return web.Response(status=HTTPStatus.BAD_REQUEST)
+
+    async def post(self, request: web.Request) -> web.Response:
+        """Handle an Ecowitt form upload."""
+        return await self._handle(request)
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Handle an Ambient Weather query upload."""
+        return await self._handle(request)